@@ -10,12 +10,41 @@
 -------------------------------------------------------------------
 """
 
+import os
+
 # ==================== 포트 설정 ====================
-ARDUINO_PORT = 'COM4'           # 아두이노 USB 포트 (장치 관리자에서 확인)
-LIDAR_PORT = 'COM3'             # 라이다 USB 포트 (장치 관리자에서 확인)
-BAUDRATE = 9600                 # 시리얼 통신 속도 (아두이노와 동일해야 함)
+ARDUINO_PORT = 'auto'           # 아두이노 USB 포트 ('auto' = 자동 검색, 또는 'COM4', '/dev/ttyACM0')
+                                # 에뮬레이터는 modules/vehicle/emulator.py가 출력한 /dev/pts/N
+LIDAR_PORT = 'auto'             # 라이다 USB 포트 ('auto' = 자동 검색, 또는 'COM3', '/dev/ttyUSB0')
+PORT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'ports.json')
+                                # 자동 검색 결과 저장 (다음 실행에서 같은 장치면 확인 생략)
+                                # 확인: python modules/vehicle/ports.py [--rescan]
+BAUDRATE = 115200               # 시리얼 통신 속도 (아두이노와 동일해야 함)
+                                # 구버전 펌웨어(9600)를 쓰면 9600으로 변경
+ARDUINO_PROTOCOL = 'auto'       # 아두이노 통신 방식
+                                # 'auto'   = 바이너리 프레임 시도, 응답 없으면 텍스트
+                                # 'binary' = 바이너리 프레임 필수 (CRC 검사)
+                                # 'text'   = "F:25,..." 줄 + 명령 문자 (구버전 펌웨어)
+COMMAND_HEARTBEAT = 0.2         # 하트비트 주기 (초, 0 = 하트비트 없음, 명령 변화와 관계없이 전송)
+                                # 아두이노 워치독 (WATCHDOG_MS = 500ms)보다 충분히 짧게
+                                # 텍스트 모드는 COMMAND_ACK_TEXT = True일 때만 'H' 전송
+                                # (HELLO에 응답하지 않은 구버전 펌웨어는 'H'를 정지로 처리)
+COMMAND_ACK = True              # 명령 → 모터 동작 지연 측정 (아두이노 ACK, 상태 출력에 p50/p95/최대)
+COMMAND_ACK_TEXT = False        # 텍스트 모드에서도 순번 붙인 명령 줄 / PING / 센서 선택 사용 ("C:F,N:12")
+                                # 바이너리 모드는 항상 순번 있음 / 구버전 펌웨어는 False
+CLOCK_SYNC_ENABLE = True        # 아두이노 시계 동기화 (초음파 값에 실제 측정 시각 사용)
+CLOCK_SYNC_INTERVAL = 1.0       # PING 주기 (초, 텍스트 모드는 COMMAND_ACK_TEXT = True일 때만)
 CAMERA_COUNT = 2                # 카메라 개수 (1개 또는 2개)
 
+# ==================== 초음파 센서 선택 설정 ====================
+ULTRASONIC_SELECT = True        # 주행 방향에 따라 필요한 초음파 센서만 측정 (갱신 주기 향상)
+                                # 텍스트 모드는 COMMAND_ACK_TEXT = True일 때만
+ULTRASONIC_SETS = {             # 방향별 측정 센서 (앞쪽이 먼저 측정 = 우선순위)
+    'forward': ('F', 'FL', 'FR'),                   # 전진/회전
+    'reverse': ('R', 'RL', 'RR'),                   # 후진
+    'stop': ('F', 'FL', 'FR', 'R', 'RL', 'RR'),     # 정지 (주차, 출발 전 주변 확인)
+}
+
 # ==================== 장애물 감지 설정 ====================
 OBSTACLE_ANGLE_MIN = 350        # 전방 감지 각도 시작 (도)
                                 # 350도 = 정면 기준 왼쪽 10도
@@ -29,6 +58,10 @@ OBSTACLE_DISTANCE = 500         # 위험 거리 (mm)
 # ==================== 초음파 센서 설정 ====================
 ULTRASONIC_SAFE_DISTANCE = 200  # 안전 거리 (mm)
                                 # 200mm = 20cm 이내면 정지
+ULTRASONIC_FILTER_WINDOW = 5    # 센서별 중앙값 필터 크기 (측정 횟수)
+                                # 유효 값이 과반이면 중앙값 (튀는 값 무시), 아니면 가장 가까운 값
+                                # 시작/센서 전환 후 (window // 2 + 1)번 측정 전까지는 정지
+ULTRASONIC_MAX_AGE = 0.5        # 이보다 오래된 초음파 값은 판단에 사용하지 않음 (초)
 
 # ==================== 차선 인식 설정 ====================
 LANE_WIDTH = 500                # ROI 최대 가로 크기 (픽셀)
@@ -40,8 +73,168 @@ LANE_HEIGHT = 120               # ROI 최소 세로 크기 (픽셀)
 LANE_GAP = 40                   # 엣지 검증 포인트 간격 (픽셀)
                                 # 차선의 엣지 강도를 검증할 간격
 
-LANE_THRESHOLD = 150            # 엣지 강도 임계값 (0~255)
+LANE_THRESHOLD = 60             # 엣지 강도 임계값 (0~255)
                                 # 이 값보다 강한 엣지만 차선으로 인식
+                                # 직선 양 끝점 위/아래 LANE_GAP 픽셀의 밝기 차 절댓값 평균
+                                # (이전 검증은 uint8 뺄셈이 넘쳐서 150이 실제 밝기 차와 무관했음)
+
+LANE_EDGE_SAMPLES = 2           # 엣지 검증 샘플 개수 (직선 1개당)
+                                # 2 = 양 끝점만 검사, 늘리면 직선 위 점을 추가로 검사
+
+LANE_ENGINE = 'hough'           # 차선 인식 엔진
+                                # 'hough'    = Canny + Hough 직선 (기존 방식)
+                                # 'scanline' = 몇 개의 가로줄만 검사 (CPU 부족 시, 훨씬 빠름)
+
+LANE_SCAN_ROWS = (0.9, 0.8, 0.7, 0.6)  # scanline 엔진이 검사할 가로줄 위치
+                                # 영상 높이 대비 비율 (1.0 = 맨 아래)
+
+LANE_LINE_WIDTH = 50            # 차선 폭 (mm, 대회 규정)
+LANE_SCAN_WIDTH_TOLERANCE = (0.5, 3.0)  # scanline 엔진 차선 폭 허용 범위 (규정 폭 대비 배율)
+                                # 캘리브레이션이 있으면 scanline은 BEV 영상에서 실행
+                                # 픽셀 폭 = LANE_LINE_WIDTH / BEV_MM_PER_PIXEL 가로 값
+
+LANE_SCAN_WIDTH = (3, 40)       # 캘리브레이션이 없을 때 (후방 카메라 포함) 원근 영상 차선 폭 범위 (픽셀)
+                                # 원근 영상은 줄마다 mm 크기가 달라서 규정 폭으로 계산할 수 없음
+                                # 아래쪽 줄일수록 넓게 보이므로 범위를 넓게
+LANE_SCAN_REFERENCE_WIDTH = 640 # LANE_SCAN_WIDTH 기준 영상 가로 크기 (픽셀, 해상도에 비례해서 조정)
+
+LANE_SCAN_THRESHOLD = 40        # scanline 엔진 밝기 변화 임계값 (0~255)
+                                # 차선 경계에서 이 값 이상 밝기가 변해야 인정
+
+# ==================== 차선 상태 필터 설정 ====================
+LANE_FILTER_ENABLE = True       # 차선 칼만 필터 사용 여부
+                                # True = 인식 실패 프레임은 예측값으로 주행 유지
+
+LANE_FILTER_STEP = 10           # 한 프레임 동안 전진 거리 (영상 세로 픽셀)
+                                # 예측 단계에서 방향/곡률을 반영하는 거리
+
+LANE_FILTER_MAX_MISSES = 5      # 연속 인식 실패 허용 프레임 수
+                                # 이보다 오래 실패하면 차선 인식 실패로 정지
+
+LANE_FILTER_ROI = 0.5           # 추적 안정 시 Hough 검색 시작 높이 (영상 높이 대비 비율)
+                                # 0.5 = 아래쪽 절반만 검색, 실패 후에는 전체 영상 검색
+
+LANE_FILTER_COARSE_RHO = 2      # 추적 안정 시 Hough 거리 해상도 (픽셀, 기본 1)
+LANE_FILTER_COARSE_THETA = 2    # 추적 안정 시 Hough 각도 해상도 (도, 기본 1)
+
+# ==================== 버드아이뷰(BEV) 설정 ====================
+BEV_OUTPUT_SIZE = (320, 240)    # BEV 영상 크기 (가로, 세로 픽셀)
+                                # 원본보다 작게 하면 변환/차선 처리 속도 향상
+
+BEV_MM_PER_PIXEL = (4.0, 4.0)   # BEV 픽셀당 실제 거리 (가로 mm, 세로 mm)
+                                # 캘리브레이션 사각형의 실제 크기 / BEV 영상 크기
+
+# ==================== BEV 차선 추적 설정 ====================
+LANE_TRACK_THRESHOLD = 180      # BEV 흰색 차선 이진화 임계값 (0~255)
+
+LANE_TRACK_MARGIN = 40          # 슬라이딩 윈도우 / 이전 차선 주변 검색 폭 (픽셀)
+                                # 다음 프레임은 이전 차선 ±40픽셀 안에서만 검색
+
+LANE_TRACK_MIN_PIXELS = 50      # 차선으로 인정할 최소 픽셀 수
+                                # 이보다 적으면 차선을 놓친 것으로 보고 전체 재검색
+
+LANE_STATE_ENABLE = True        # 주행 중 BEV 차선 추적 (오프셋/방향 오차) 사용 여부
+                                # 캘리브레이션 파일이 있을 때만 동작, 매 프레임 실행
+                                # 연속 조향(DRIVE_MODE = 'continuous')과 정지선 인식에 사용
+
+ROAD_WIDTH = 850                # 도로 폭 (mm, 대회 규정)
+
+# ==================== 횡단보도(정지선) 인식 설정 ====================
+CROSSWALK_MIN_FILL = 0.5        # 한 가로줄에서 흰색이 차지하는 최소 비율
+                                # 차선(50mm x 2)만 있는 줄은 약 0.1 → 횡단보도 줄만 통과
+
+CROSSWALK_DEPTH = 100           # 횡단보도 세로 길이 (mm, 대회 규정 1000mm x 100mm)
+
+BEV_BOTTOM_DISTANCE = 300       # BEV 영상 맨 아래 줄 ~ 차량 앞 범퍼 거리 (mm)
+                                # 정지선까지 거리 = 이 값 + BEV에서 남은 줄 수 x 세로 mm/픽셀
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+                                # BEV 맵, 색상 테이블 등 미리 계산한 값 저장 폴더
+
+CALIBRATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calibration')
+                                # 카메라 캘리브레이션 파일 폴더 (cam0_640x480.json 등)
+                                # utils/start_lib.py로 꼭짓점을 찍으면 자동 저장
+
+# ==================== 신호등 인식 설정 ====================
+TRAFFIC_LIGHT_ENABLE = False    # 신호등 인식 사용 여부
+                                # True면 decide_action_advanced로 신호등까지 고려
+                                # (미션 수행 경기에서 True로 설정)
+
+TRAFFIC_LIGHT_SAMPLE = 16       # 원 중심 색상 검증 영역 크기 (픽셀)
+                                # 16 = 중심 주변 16x16 영역의 절반 이상이 같은 색이면 인정
+
+TRAFFIC_LIGHT_LABEL_MODE = 'lut'  # 색상 분류 방식
+                                # 'hsv' = 매 프레임 HSV 변환 후 분류
+                                # 'lut' = BGR→색상 룩업 테이블 (HSV 변환 생략, 더 빠름)
+                                # 테이블은 cache/ 폴더에 저장되어 다음 실행부터 재사용
+
+TRAFFIC_LIGHT_ENGINE = 'hough'  # 신호등 인식 엔진
+                                # 'hough' = Hough Circle (기존 방식)
+                                # 'blob'  = 연결 요소 + 원형도 필터 (먼 거리/작은 신호등에 강함)
+
+TRAFFIC_LIGHT_VOTE_FRAMES = 5   # 신호등 투표 프레임 수
+                                # 최근 5프레임 중 과반이 같은 색이어야 인정
+
+TRAFFIC_LIGHT_MAX_AGE = 9       # 신호등 결과 최대 나이 (프레임)
+                                # 아직 한 번도 실행 안 됐거나 이보다 오래된 결과면 판단 불가 → 정지
+
+TRAFFIC_LIGHT_MIN_AREA = 100    # blob 엔진 신호등 최소 면적 (픽셀)
+TRAFFIC_LIGHT_MAX_AREA = 40000  # blob 엔진 신호등 최대 면적 (픽셀)
+
+TRAFFIC_LIGHT_REACQUIRE_FRAMES = 30  # 신호등 추적 중 전체 재검색 주기 (프레임)
+                                # 한 번 찾으면 마지막 위치 주변만 검색하다가
+                                # 30프레임마다 또는 놓치면 전체 영상 재검색
+                                # 0 = 추적 사용 안 함 (매 프레임 전체 검색)
+
+TRAFFIC_LIGHT_TRACK_PADDING = 1.0  # 추적 창 여백 (신호등 크기 대비 배수)
+
+# ==================== 연속 속도/조향 설정 ====================
+DRIVE_MODE = 'command'          # 모터 명령 방식
+                                # 'command'    = 명령 문자 (F/L/R/S, 고정 속도/각도)
+                                # 'continuous' = "V:<pwm>,S:<deg>" 연속 속도/조향
+
+SERVO_CENTER = 90               # 서보 중앙 각도 (펌웨어 SERVO_CENTER와 동일)
+DRIVE_STEER_MAX = 30            # 최대 조향 각도 (도, 중앙 기준, 펌웨어 최대 좌/우 각도와 동일)
+DRIVE_STEER_GAIN = 1.0          # 차선 기울기 각도 대비 조향 각도 배율
+DRIVE_OFFSET_GAIN = 0.05        # BEV 차선 중심 오프셋 대비 조향 각도 (도/mm)
+                                # 차선 추적 결과가 있으면 방향 오차 + 오프셋으로 조향
+                                # 예: 오른쪽으로 100mm 벗어나면 왼쪽으로 5도
+
+DRIVE_SPEED_FORWARD = 150       # 직진 속도 (PWM 0~255)
+DRIVE_SPEED_TURN = 100          # 회전 속도 (PWM)
+DRIVE_SPEED_BACKWARD = 120      # 후진 속도 (PWM)
+
+DRIVE_SPEED_STEP = 5            # 속도 양자화 단위 (PWM)
+DRIVE_STEER_STEP = 1            # 조향 양자화 단위 (도)
+DRIVE_SPEED_SLEW = 400          # 초당 최대 가속량 (PWM/s, 감속은 즉시)
+DRIVE_STEER_SLEW = 120          # 초당 최대 조향 변화량 (도/s)
+
+# ==================== 후방 카메라 설정 ====================
+REAR_CAMERA_ENABLE = False      # 후방 카메라(ch1) 차선 인식 사용 여부 (후진/주차용)
+                                # CAMERA_COUNT = 2일 때만 동작
+
+# ==================== 인식 스케줄 설정 ====================
+FRAME_BUDGET_MS = 60            # 프레임당 인식 시간 예산 (ms)
+                                # 넘으면 우선순위 낮은 인식부터 다음 프레임으로 미룸
+                                # 차선 인식은 예산과 관계없이 매 프레임 실행
+
+FRAME_MAX_DEFER = 3             # 예산 부족으로 연속해서 미룰 수 있는 최대 프레임 수
+                                # 넘으면 예산을 넘겨도 실행 (신호등/정지선이 계속 밀리지 않게)
+
+TRAFFIC_LIGHT_PERIOD = 3        # 신호등 인식 주기 (프레임, 투표 프레임 수와 함께 조정)
+CROSSWALK_PERIOD = 2            # 정지선 인식 주기 (프레임)
+REAR_CAMERA_PERIOD = 4          # 후방 카메라 인식 주기 (프레임)
+
+VISION_THREADS = 2              # 카메라별 병렬 인식 스레드 수
+                                # 0 = 메인 스레드에서 순서대로 실행
+                                # 2 = 전방/후방 카메라 인식을 동시에 실행
+
+VISION_PROCESSES = False        # 차선/신호등 인식을 별도 프로세스에서 실행
+                                # True = 프레임은 공유 메모리로 전달, 시리얼 통신이 인식 때문에 멈추지 않음
+
+VISION_RING_SLOTS = 4           # 공유 메모리 프레임 슬롯 개수
+VISION_WORKER_TIMEOUT = 0.1     # 차선 작업 프로세스 결과 최대 대기 시간 (초)
+                                # 넘으면 이번 프레임은 차선 필터 예측값 사용
 
 # ==================== 디버그 설정 ====================
 DEBUG_PRINT_INTERVAL = 10       # 상태 출력 간격 (프레임 수)
@@ -38,14 +38,71 @@ int SERVO_RIGHT_MAX = 120;    // 최대 우회전 각도
 int SERVO_LEFT_SOFT = 75;     // 약한 좌회전
 int SERVO_RIGHT_SOFT = 105;   // 약한 우회전
 
+// ==================== 통신 설정 ====================
+// 바이너리 프레임 (Python modules/vehicle/protocol.py와 동일):
+// [0xAA][0x55][type][seq][len][payload (len 바이트)][CRC16 하위][CRC16 상위]
+// CRC16-CCITT (초기값 0xFFFF, 다항식 0x1021), type ~ payload 범위
+// 시작은 텍스트 모드, PC가 HELLO 프레임을 보내면 바이너리 모드로 전환
+#define BAUDRATE          115200
+#define SYNC0             0xAA
+#define SYNC1             0x55
+#define MAX_PAYLOAD       32
+#define PROTOCOL_VERSION  1
+
+#define MSG_HELLO         0x01   // PC → 아두이노: 바이너리 모드 요청 (버전)
+#define MSG_COMMAND       0x02   // PC → 아두이노: 명령 문자 1바이트
+#define MSG_DRIVE         0x03   // PC → 아두이노: 연속 속도/조향 (int16 PWM, uint8 서보 각도)
+#define MSG_HEARTBEAT     0x04   // PC → 아두이노: 하트비트 (텍스트 모드는 'H')
+#define MSG_PING          0x05   // PC → 아두이노: 시계 동기화 요청 (텍스트 모드는 "P:<seq>")
+#define MSG_SENSOR_SET    0x06   // PC → 아두이노: 측정할 센서 번호 (측정 순서, 텍스트 모드는 "U:012")
+#define MSG_HELLO_ACK     0x81   // 아두이노 → PC: 바이너리 모드 확인 (버전)
+#define MSG_SENSORS       0x82   // 아두이노 → PC: 초음파 6개 (uint16, cm, 리틀 엔디언, 측정 안 함 = 0xFFFF)
+#define MSG_ACK           0x83   // 아두이노 → PC: 명령 ACK (seq, 수신 millis, 동작 millis)
+#define MSG_PONG          0x84   // 아두이노 → PC: 시계 동기화 응답 (seq, 수신 millis, 전송 millis)
+
+// 워치독: 하트비트를 한 번 받은 뒤로 WATCHDOG_MS 동안 수신이 없으면 정지
+// (하트비트를 보내지 않는 수동 테스트 프로그램에서는 동작하지 않음)
+#define WATCHDOG_MS       500
+
+#define NOT_MEASURED      0xFFFF // 측정 센서 선택에서 빠진 센서 (SENSORS 프레임 값)
+
 // ==================== 전역 변수 ====================
 char command = 'S';           // 수신한 명령
 long distances[6];            // 6개 초음파 센서 거리값 (cm)
+unsigned long measure_ms = 0; // 센서 측정 시각 (측정 시작~끝 중간, millis)
+const char *SENSOR_LABELS[6] = {"F", "FL", "FR", "R", "RL", "RR"};  // 텍스트 모드 센서 이름
+
+// 측정 센서 선택 (센서 1개당 최대 30ms → 필요한 센서만 측정하면 loop가 짧아짐)
+byte active_sensors[6] = {0, 1, 2, 3, 4, 5};  // 측정할 센서 번호 (앞쪽부터 측정)
+byte active_count = 6;        // 측정할 센서 수
+bool measured[6];             // 이번 loop에 측정한 센서
 int current_steering_angle = 90;  // 현재 조향 각도
 
+bool binary_mode = false;     // true = 바이너리 프레임 통신
+byte tx_seq = 0;              // 보내는 프레임 순번
+byte rx_buf[3 + MAX_PAYLOAD + 2];  // 받는 프레임 (type, seq, len, payload, CRC)
+int rx_state = 0;             // 0: SYNC0 대기, 1: SYNC1 대기, 2: 프레임 본문 수신
+int rx_pos = 0;               // rx_buf에 받은 바이트 수
+
+// 연속 속도/조향 명령 ("V:<pwm>,S:<deg>" 또는 DRIVE 프레임)
+bool drive_mode = false;      // true = drive_pwm/drive_angle로 주행 (명령 문자를 받으면 false)
+int drive_pwm = 0;            // 속도 (-255~255, 음수 = 후진)
+int drive_angle = 90;         // 서보 각도
+char text_buf[24];            // 텍스트 모드 "V:..." / "C:..." / "P:..." / "U:..." 줄
+int text_pos = -1;            // text_buf에 받은 글자 수 (-1 = 줄 수신 중 아님)
+
+bool watchdog_armed = false;  // true = 하트비트를 받음 (워치독 동작)
+unsigned long last_rx_ms = 0; // 마지막 명령/하트비트 수신 시각
+
+// 명령 ACK (바이너리 COMMAND/DRIVE 프레임, 텍스트 ",N:<seq>" 줄)
+// 모터/서보 동작 후 "A:<seq>,<수신 ms>,<동작 ms>" 또는 ACK 프레임 전송
+bool ack_pending = false;     // true = 이번 루프에 ACK 보낼 명령 있음
+byte ack_seq = 0;             // ACK할 명령 순번 (한 루프에 여러 개면 마지막 것)
+unsigned long ack_rx_ms = 0;  // 명령 수신 시각
+
 // ==================== 초기화 ====================
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(BAUDRATE);
 
   // 좌측 바퀴 모터 핀 설정
   pinMode(motorLeft_IN1, OUTPUT);
@@ -75,15 +132,19 @@ void setup() {
 
 // ==================== 메인 루프 ====================
 void loop() {
-  // 1. Python에서 명령 수신
-  if (Serial.available() > 0) {
-    command = Serial.read();
-  }
+  // 1. Python에서 명령 수신 (받은 바이트 모두 처리)
+  receive_commands();
+  check_watchdog();
 
   // 2. 명령에 따라 모터 및 조향 제어
-  executeCommand(command);
+  if (drive_mode) {
+    execute_drive();
+  } else {
+    executeCommand(command);
+  }
+  send_ack();
 
-  // 3. 초음파 센서 6개 거리 측정 및 전송
+  // 3. 초음파 센서 거리 측정 (선택한 센서만) 및 전송
   measure_all_ultrasonic();
   send_sensor_data();
 
@@ -135,6 +196,94 @@ void executeCommand(char cmd) {
   }
 }
 
+// 연속 속도/조향 명령 저장 (범위 제한)
+void set_drive(int pwm, int angle) {
+  drive_pwm = constrain(pwm, -255, 255);
+  drive_angle = constrain(angle, SERVO_LEFT_MAX, SERVO_RIGHT_MAX);
+  drive_mode = true;
+}
+
+// 연속 속도/조향 실행 (각도가 바뀔 때만 서보 구동 → 매 루프 50ms 대기 없음)
+void execute_drive() {
+  if (drive_pwm > 0) {
+    motor_forward(drive_pwm);
+  } else if (drive_pwm < 0) {
+    motor_backward(-drive_pwm);
+  } else {
+    motor_stop();
+  }
+
+  if (drive_angle != current_steering_angle) {
+    setServoAngle(drive_angle);
+  }
+}
+
+// 하트비트가 끊기면 정지 (다음 명령을 받으면 다시 주행)
+void check_watchdog() {
+  if (watchdog_armed && millis() - last_rx_ms > WATCHDOG_MS) {
+    command = 'S';
+    drive_mode = false;
+    watchdog_armed = false;
+  }
+}
+
+// ACK 예약 (동작 후 send_ack에서 전송)
+void request_ack(byte seq) {
+  ack_pending = true;
+  ack_seq = seq;
+  ack_rx_ms = millis();
+}
+
+// 명령 ACK 전송 (수신 시각, 모터/서보 동작이 끝난 시각)
+void send_ack() {
+  if (!ack_pending) return;
+  ack_pending = false;
+  unsigned long act_ms = millis();
+
+  if (binary_mode) {
+    byte payload[9];
+    payload[0] = ack_seq;
+    for (int i = 0; i < 4; i++) {
+      payload[1 + i] = (ack_rx_ms >> (8 * i)) & 0xFF;
+      payload[5 + i] = (act_ms >> (8 * i)) & 0xFF;
+    }
+    send_frame(MSG_ACK, payload, 9);
+    return;
+  }
+
+  Serial.print("A:");  Serial.print(ack_seq);
+  Serial.print(",");   Serial.print(ack_rx_ms);
+  Serial.print(",");   Serial.println(act_ms);
+}
+
+// 시계 동기화 응답 (PING 수신 시각 = 처리 시각, 바로 응답)
+void send_pong(byte seq, unsigned long rx_ms) {
+  unsigned long tx_ms = millis();
+
+  if (binary_mode) {
+    byte payload[9];
+    payload[0] = seq;
+    for (int i = 0; i < 4; i++) {
+      payload[1 + i] = (rx_ms >> (8 * i)) & 0xFF;
+      payload[5 + i] = (tx_ms >> (8 * i)) & 0xFF;
+    }
+    send_frame(MSG_PONG, payload, 9);
+    return;
+  }
+
+  Serial.print("Q:");  Serial.print(seq);
+  Serial.print(",");   Serial.print(rx_ms);
+  Serial.print(",");   Serial.println(tx_ms);
+}
+
+// 명령/하트비트 수신 시각 기록
+void feed_watchdog(bool heartbeat) {
+  last_rx_ms = millis();
+  if (heartbeat) {
+    watchdog_armed = true;
+  }
+}
+
 // ==================== DC 모터 제어 함수 (차동 구동) ====================
 
 // 좌측 바퀴 전진 (반대 방향으로 수정)
@@ -277,26 +426,232 @@ long measure_ultrasonic(int index) {
   return distance;
 }
 
-// 6개 센서 모두 측정
+// 선택한 센서만 선택 순서대로 측정 (기본: 6개 모두)
 void measure_all_ultrasonic() {
+  unsigned long start_ms = millis();
   for (int i = 0; i < 6; i++) {
-    distances[i] = measure_ultrasonic(i);
+    measured[i] = false;
+  }
+  for (int i = 0; i < active_count; i++) {
+    byte index = active_sensors[i];
+    distances[index] = measure_ultrasonic(index);
+    measured[index] = true;
     delayMicroseconds(200);  // 센서 간 간섭 방지
   }
+  measure_ms = start_ms + (millis() - start_ms) / 2;
+}
+
+// 측정 센서 선택 (잘못된 번호/중복은 무시, 남는 게 없으면 6개 모두)
+void set_sensor_set(const byte *indices, int count) {
+  bool used[6] = {false, false, false, false, false, false};
+  active_count = 0;
+  for (int i = 0; i < count; i++) {
+    byte index = indices[i];
+    if (index < 6 && !used[index]) {
+      used[index] = true;
+      active_sensors[active_count++] = index;
+    }
+  }
+  if (active_count == 0) {
+    for (int i = 0; i < 6; i++) {
+      active_sensors[i] = i;
+    }
+    active_count = 6;
+  }
 }
 
 // Python으로 센서 데이터 전송
 void send_sensor_data() {
-  // 형식: "F:25,FL:30,FR:28,R:50,RL:45,RR:48"
-  Serial.print("F:");    Serial.print(distances[FRONT]);
-  Serial.print(",FL:");  Serial.print(distances[FRONT_LEFT]);
-  Serial.print(",FR:");  Serial.print(distances[FRONT_RIGHT]);
-  Serial.print(",R:");   Serial.print(distances[REAR]);
-  Serial.print(",RL:");  Serial.print(distances[REAR_LEFT]);
-  Serial.print(",RR:");  Serial.print(distances[REAR_RIGHT]);
+  if (binary_mode) {
+    // SENSORS 프레임: F, FL, FR, R, RL, RR 순서 uint16 + 측정 millis uint32 (리틀 엔디언)
+    byte payload[16];
+    for (int i = 0; i < 6; i++) {
+      unsigned int value = measured[i] ? distances[i] : NOT_MEASURED;
+      payload[2 * i] = value & 0xFF;
+      payload[2 * i + 1] = (value >> 8) & 0xFF;
+    }
+    for (int i = 0; i < 4; i++) {
+      payload[12 + i] = (measure_ms >> (8 * i)) & 0xFF;
+    }
+    send_frame(MSG_SENSORS, payload, 16);
+    return;
+  }
+
+  // 형식: "F:25,FL:30,FR:28,R:50,RL:45,RR:48,T:123456" (T = 측정 millis, 측정한 센서만)
+  for (int i = 0; i < 6; i++) {
+    if (measured[i]) {
+      Serial.print(SENSOR_LABELS[i]);  Serial.print(":");
+      Serial.print(distances[i]);      Serial.print(",");
+    }
+  }
+  Serial.print("T:");    Serial.print(measure_ms);
   Serial.println();  // 줄바꿈
 }
 
+// ==================== 통신 함수 ====================
+
+// CRC16-CCITT (Python protocol.crc16과 동일)
+unsigned int crc16(const byte *data, int len, unsigned int crc) {
+  for (int i = 0; i < len; i++) {
+    crc ^= (unsigned int)data[i] << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc & 0xFFFF;
+}
+
+// 바이너리 프레임 전송
+void send_frame(byte type, const byte *payload, byte len) {
+  byte header[3] = {type, tx_seq++, len};
+  unsigned int crc = crc16(header, 3, 0xFFFF);
+  crc = crc16(payload, len, crc);
+
+  Serial.write(SYNC0);
+  Serial.write(SYNC1);
+  Serial.write(header, 3);
+  Serial.write(payload, len);
+  Serial.write((byte)(crc & 0xFF));
+  Serial.write((byte)(crc >> 8));
+}
+
+// 수신 바이트 1개 처리 → CRC까지 맞는 프레임이 완성되면 true
+bool receive_byte(byte b) {
+  if (rx_state == 0) {
+    if (b == SYNC0) rx_state = 1;
+    return false;
+  }
+  if (rx_state == 1) {
+    rx_state = (b == SYNC1) ? 2 : ((b == SYNC0) ? 1 : 0);
+    rx_pos = 0;
+    return false;
+  }
+
+  rx_buf[rx_pos++] = b;
+  if (rx_pos == 3 && rx_buf[2] > MAX_PAYLOAD) {
+    rx_state = 0;  // 길이가 잘못됨 → 다시 동기화
+    return false;
+  }
+  if (rx_pos >= 3 && rx_pos == 3 + rx_buf[2] + 2) {
+    rx_state = 0;
+    unsigned int crc = rx_buf[rx_pos - 2] | ((unsigned int)rx_buf[rx_pos - 1] << 8);
+    return crc == crc16(rx_buf, rx_pos - 2, 0xFFFF);
+  }
+  return false;
+}
+
+// 완성된 프레임 처리
+void handle_frame() {
+  byte type = rx_buf[0];
+  byte len = rx_buf[2];
+  byte *payload = rx_buf + 3;
+
+  switch (type) {
+    case MSG_HELLO: {
+      binary_mode = true;
+      byte version = PROTOCOL_VERSION;
+      send_frame(MSG_HELLO_ACK, &version, 1);
+      break;
+    }
+
+    case MSG_COMMAND:
+      if (len >= 1) {
+        command = payload[0];
+        drive_mode = false;
+        feed_watchdog(false);
+        request_ack(rx_buf[1]);
+      }
+      break;
+
+    case MSG_HEARTBEAT:
+      feed_watchdog(true);
+      break;
+
+    case MSG_PING:
+      send_pong(rx_buf[1], millis());
+      break;
+
+    case MSG_DRIVE:
+      if (len >= 3) {
+        int pwm = (int)(payload[0] | ((unsigned int)payload[1] << 8));
+        set_drive(pwm, payload[2]);
+        feed_watchdog(false);
+        request_ack(rx_buf[1]);
+      }
+      break;
+
+    case MSG_SENSOR_SET:
+      set_sensor_set(payload, len);
+      break;
+
+    default:       // 모르는 프레임은 무시
+      break;
+  }
+}
+
+// 텍스트 모드 명령 줄 1개 처리
+// "V:<pwm>,S:<deg>[,N:<seq>]" 연속 속도/조향, "C:<명령>,N:<seq>" 순번 붙인 명령 문자,
+// "P:<seq>" 시계 동기화 PING, "U:<센서 번호들>" 측정 센서 선택
+void handle_text_line() {
+  int pwm, angle, seq;
+  char cmd;
+  text_buf[text_pos] = '\0';
+  int fields = sscanf(text_buf, "V:%d,S:%d,N:%d", &pwm, &angle, &seq);
+  if (fields >= 2) {
+    set_drive(pwm, angle);
+    feed_watchdog(false);
+    if (fields == 3) request_ack(seq);
+  } else if (sscanf(text_buf, "C:%c,N:%d", &cmd, &seq) == 2) {
+    command = cmd;
+    drive_mode = false;
+    feed_watchdog(false);
+    request_ack(seq);
+  } else if (sscanf(text_buf, "P:%d", &seq) == 1) {
+    send_pong(seq, millis());
+  } else if (text_buf[0] == 'U' && text_buf[1] == ':') {
+    byte indices[6];
+    int count = 0;
+    for (char *p = text_buf + 2; *p != '\0' && count < 6; p++) {
+      indices[count++] = *p - '0';
+    }
+    set_sensor_set(indices, count);
+  }
+}
+
+// 받은 바이트 모두 처리
+// 텍스트 모드: 명령 문자 1바이트 (마지막 문자 사용)
+//              'V'/'C'/'P'/'U'로 시작하는 줄은 연속 속도/조향 / 순번 붙인 명령 / PING / 센서 선택,
+//              'H'는 하트비트
+// 0xAA가 오면 프레임으로 처리 (HELLO를 받으면 바이너리 모드 전환)
+void receive_commands() {
+  while (Serial.available() > 0) {
+    byte b = Serial.read();
+    if (binary_mode || rx_state != 0 || b == SYNC0) {
+      if (receive_byte(b)) {
+        handle_frame();
+      }
+    } else if (text_pos >= 0) {
+      if (b == '\n' || b == '\r') {
+        handle_text_line();
+        text_pos = -1;
+      } else if (text_pos < (int)sizeof(text_buf) - 1) {
+        text_buf[text_pos++] = b;
+      } else {
+        text_pos = -1;  // 너무 긴 줄은 버림
+      }
+    } else if (b == 'V' || b == 'C' || b == 'P' || b == 'U') {
+      text_buf[0] = b;
+      text_pos = 1;
+    } else if (b == 'H') {
+      feed_watchdog(true);
+    } else if (b != '\n' && b != '\r') {
+      command = b;
+      drive_mode = false;
+      feed_watchdog(false);
+    }
+  }
+}
+
 // ==================== 디버그용 함수 ====================
 
 // 센서 상태 출력 (시리얼 모니터 확인용)
@@ -22,13 +22,70 @@
 
 import sys
 import os
+import math
 # 현재 디렉토리를 파이썬 경로에 추가
 sys.path.append(os.path.dirname(__file__))
 
 from modules.vehicle import sensors
 from modules.vehicle import control
+from modules.vision.scheduler import DetectorScheduler
+from modules.vision.pipeline import CameraPipeline
+from modules.vision.workers import VisionWorkers
 import config
 
+
+# ==================== 인식 스케줄 ====================
+def build_scheduler():
+    """
+    인식 함수 스케줄러 생성
+
+    Returns:
+        DetectorScheduler: 차선/BEV 차선 추적(매 프레임, 필수) + 정지선/신호등/후방 카메라(주기 실행)
+    """
+    scheduler = DetectorScheduler(budget_ms=config.FRAME_BUDGET_MS, max_defer=config.FRAME_MAX_DEFER)
+
+    # 차선은 예산과 관계없이 매 프레임 실행 (작업 프로세스 사용 시 build_workers에서 처리)
+    if not config.VISION_PROCESSES:
+        scheduler.register('lane', sensors.get_lane_direction, camera=0, required=True)
+
+    # BEV 차선 추적 (캘리브레이션이 있을 때만) - 연속 조향에 사용, BEV 이진 영상은 정지선 인식과 공유
+    if config.LANE_STATE_ENABLE and sensors.bev is not None:
+        scheduler.register('lane_state', sensors.get_lane_state, camera=0, required=True)
+
+    # 느린 인식은 위상을 다르게 해서 같은 프레임에 몰리지 않게 함
+    # (정지선은 같은 카메라 스레드에서 lane_state 다음에 실행 → BEV 이진 영상 재사용)
+    if config.TRAFFIC_LIGHT_ENABLE:
+        scheduler.register('crosswalk', sensors.get_crosswalk_distance, camera=0,
+                           period=config.CROSSWALK_PERIOD, phase=1, priority=2)
+        if not config.VISION_PROCESSES:
+            scheduler.register('traffic_light', sensors.get_traffic_light, camera=0,
+                               period=config.TRAFFIC_LIGHT_PERIOD, phase=0, priority=1)
+    if config.REAR_CAMERA_ENABLE and config.CAMERA_COUNT == 2:
+        scheduler.register('rear_lane', sensors.get_rear_lane_direction, camera=1,
+                           period=config.REAR_CAMERA_PERIOD, phase=2, priority=0)
+
+    return scheduler
+
+
+def build_workers(shape):
+    """
+    비전 작업 프로세스 생성 (config.VISION_PROCESSES = True일 때)
+
+    Args:
+        shape (tuple): 전방 카메라 프레임 크기 (row, col, dim) - 실제로 읽은 프레임 기준
+
+    Returns:
+        VisionWorkers: 차선 + 신호등 작업 프로세스 (프레임은 공유 메모리로 전달)
+    """
+    if 0 in shape:
+        raise RuntimeError(f"전방 카메라 프레임을 읽지 못해 공유 메모리 크기를 정할 수 없습니다 ({shape})")
+    workers = VisionWorkers(shape, slots=config.VISION_RING_SLOTS)
+    workers.add('lane', sensors.new_lane_worker, sensors.detect_lane)
+    if config.TRAFFIC_LIGHT_ENABLE:
+        workers.add('traffic_light', sensors.new_traffic_light_worker, sensors.detect_traffic_light)
+    return workers
+
+
 # ==================== 메인 자율주행 루프 ====================
 def autonomous_driving_loop(ch0, ch1):
     """
@@ -50,6 +107,34 @@ def autonomous_driving_loop(ch0, ch1):
     print("종료: 'q' 키 또는 Ctrl+C")
     print("-" * 50)
 
+    scheduler = build_scheduler()
+
+    # 카메라별 병렬 인식 (config.VISION_THREADS = 0이면 메인 스레드에서 순서대로)
+    pipeline = CameraPipeline(scheduler, config.VISION_THREADS) if config.VISION_THREADS > 0 else None
+
+    # 차선/신호등 작업 프로세스 (config.VISION_PROCESSES)
+    # 공유 메모리 크기는 CAP_PROP 값이 아니라 실제로 읽은 프레임 크기 (get_frame_shape)
+    workers = build_workers(sensors.get_frame_shape(ch0)) if config.VISION_PROCESSES else None
+
+    try:
+        driving_loop(scheduler, pipeline, workers, ch0, ch1)
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+        if workers is not None:
+            workers.close()
+
+
+def driving_loop(scheduler, pipeline, workers, ch0, ch1):
+    """
+    자율주행 루프 본체 (라이다 스캔 1회 = 1 프레임)
+
+    Args:
+        scheduler: DetectorScheduler 객체
+        pipeline: CameraPipeline 객체 (None이면 순차 실행)
+        workers: VisionWorkers 객체 (None이면 차선/신호등도 이 프로세스에서 실행)
+        ch0, ch1: 카메라 채널
+    """
     frame_count = 0
 
     # 라이다 스캔 루프
@@ -60,34 +145,67 @@ def autonomous_driving_loop(ch0, ch1):
         # 카메라 영상 읽기
         ret0, frame0, ret1, frame1 = sensors.read_camera(ch0, ch1)
 
-        # 차선 방향 감지
-        direction = sensors.get_lane_direction(frame0)
+        # 프레임 캐시 (그레이/HSV/색상 라벨/BEV를 인식 함수끼리 공유)
+        ctx0 = sensors.make_frame_context(frame0)
+        ctx1 = sensors.make_frame_context(frame1) if frame1 is not None else None
 
-        # 신호등 감지 (선택 사항 - 주석 해제하면 사용)
-        # traffic_light = sensors.get_traffic_light(frame0)
+        # 인식 실행 (차선은 매 프레임, 정지선/신호등/후방은 주기 + 시간 예산에 따라)
+        frames = {0: ctx0, 1: ctx1}
+        if workers is not None:
+            # 프레임은 공유 메모리로, 작업 지시는 (프레임 번호, 파라미터)만 전달
+            jobs = {'lane': sensors.lane_search_params()}
+            if 'traffic_light' in workers.workers and frame_count % config.TRAFFIC_LIGHT_PERIOD == 0:
+                jobs['traffic_light'] = None
+            workers.submit(frame_count, frame0, jobs)
+        if pipeline is not None:
+            pipeline.submit(frame_count, frames)   # 카메라별 스레드에서 인식 시작
 
         # 장애물 감지 (라이다)
         has_obstacle, nearest_distance = sensors.check_obstacle(scan)
 
         # 초음파 센서 읽기
-        ultrasonic_dist = sensors.read_ultrasonic()
+        ultrasonic = sensors.read_ultrasonic()
+
+        # 인식 결과 (병렬이면 같은 프레임 번호 결과가 모두 끝날 때까지 대기)
+        if pipeline is not None:
+            results = pipeline.collect(frame_count)
+        else:
+            results = scheduler.run(frame_count, frames)
+        if workers is not None:
+            lane = workers.wait('lane', frame_count, config.VISION_WORKER_TIMEOUT)
+            results['lane'] = sensors.filter_lane(*lane) if lane is not None else sensors.filter_lane(None, None)
+            results['traffic_light'] = workers.get('traffic_light')
+        direction = results['lane']
+        traffic_light = results.get('traffic_light')
+        crosswalk_distance = results.get('crosswalk')
+        lane_state = results.get('lane_state')
 
         # ==================== 2. 제어 결정 ====================
-        command = control.decide_action(
-            direction,
-            has_obstacle,
-            nearest_distance,
-            ultrasonic_dist
-        )
-
-        # 신호등 고려 버전 (선택 사항)
-        # command = control.decide_action_advanced(
-        #     direction, has_obstacle, nearest_distance,
-        #     ultrasonic_dist, traffic_light
-        # )
+        if config.TRAFFIC_LIGHT_ENABLE:
+            # 신호등 결과 나이 (시작 직후, 예산 부족, 작업 프로세스 지연이면 없거나 오래됨)
+            traffic_age = (workers if workers is not None else scheduler).age('traffic_light', frame_count)
+            traffic_stale = traffic_age is None or traffic_age > config.TRAFFIC_LIGHT_MAX_AGE
+
+            # 신호등 고려 버전
+            command = control.decide_action_advanced(
+                direction, has_obstacle, nearest_distance,
+                ultrasonic, traffic_light, traffic_stale
+            )
+        else:
+            command = control.decide_action(
+                direction,
+                has_obstacle,
+                nearest_distance,
+                ultrasonic
+            )
 
         # ==================== 3. 모터 명령 전송 ====================
-        control.send_motor_command(command)
+        if config.DRIVE_MODE == 'continuous':
+            # 연속 속도/조향 (변화가 있을 때만 전송)
+            speed, steer = control.command_to_drive(command, sensors.get_lane_heading(), lane_state)
+            control.send_drive(speed, steer)
+        else:
+            control.send_motor_command(command)
 
         # ==================== 4. 영상 표시 (디버깅용) ====================
         sensors.show_camera_image(frame0, frame1)
@@ -96,9 +214,39 @@ def autonomous_driving_loop(ch0, ch1):
         if frame_count % config.DEBUG_PRINT_INTERVAL == 0:
             print(f"\n[프레임 {frame_count}]")
             print(f"  차선: {direction}")
+            if lane_state is not None:
+                print(f"  차선 추적: 오프셋 {lane_state['offset']:.0f}mm, "
+                      f"방향 오차 {math.degrees(lane_state['heading']):.1f}도")
+            if config.TRAFFIC_LIGHT_ENABLE:
+                print(f"  신호등: {traffic_light}")
+                print(f"  정지선: {crosswalk_distance}mm")
+            if 'rear_lane' in results:
+                print(f"  후방 차선: {results['rear_lane']}")
             print(f"  라이다: {nearest_distance}mm")
-            print(f"  초음파: {ultrasonic_dist}mm")
-            print(f"  명령: {command}\n")
+            print(f"  초음파: {ultrasonic.summary()}")
+            print(f"  명령: {command}")
+            tx = control.command_tx.get_stats()
+            print(f"  명령 전송: {tx['sent']}회 (생략 {tx['suppressed']}, 하트비트 {tx['heartbeats']})")
+            if sensors.latency_tracker is not None:
+                print(f"  명령 지연: {sensors.latency_tracker.summary()}")
+            if sensors.clock_sync is not None and sensors.clock_sync.synced():
+                clock = sensors.clock_sync.get_stats()
+                delay = sensors.ultrasonic_reader.get_stats()['delay_ms']
+                print(f"  시계 동기화: offset {clock['offset_ms']:.1f}ms, drift {clock['drift_ppm']:.0f}ppm, "
+                      f"최소 왕복 {clock['min_rtt_ms']:.1f}ms, 초음파 측정 → 수신 {delay or 0:.1f}ms")
+            stats = scheduler.get_stats()
+            forced = sum(detector['forced'] for detector in stats['detectors'].values())
+            print(f"  인식 시간: {scheduler.last_elapsed * 1000:.1f}ms "
+                  f"(예산 초과 {stats['overrun_frames']}/{stats['frames']} 프레임, 강제 실행 {forced}회)")
+            if pipeline is not None:
+                parallel = pipeline.get_stats()
+                print(f"  병렬 처리: 평균 {parallel['vision_ms']:.1f}ms (순차 {parallel['serial_ms']:.1f}ms, "
+                      f"제출~수집 {parallel['wall_ms']:.1f}ms)")
+            if workers is not None:
+                for name, stat in workers.get_stats().items():
+                    print(f"  작업 프로세스 {name}: 평균 {stat['mean_ms']:.1f}ms "
+                          f"(버림 {stat['stale']}, 밀림 {stat['skipped']}, 시간 초과 {stat['timeouts']})")
+            print()
 
         # ==================== 6. 종료 확인 ====================
         if sensors.check_quit_key():
@@ -0,0 +1,167 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: clock_sync.py
+  PC ↔ 아두이노 시계 동기화 모듈 (NTP 방식)
+
+  기능:
+  1) PING/PONG으로 아두이노 millis()와 PC 시각(time.monotonic) 차이 측정
+     - t0: PC PING 전송, t1: 아두이노 수신, t2: 아두이노 PONG 전송, t3: PC PONG 수신
+     - offset = ((t1 - t0) + (t2 - t3)) / 2,  rtt = (t3 - t0) - (t2 - t1)
+  2) 왕복 시간이 가장 짧은 값 근처의 측정값만 사용
+     (아두이노는 loop 시작에서만 수신을 처리하므로 대기 시간이 긴 값은 offset이 한쪽으로 치우침)
+     PING 주기에 무작위 흔들림을 줘서 아두이노 loop 주기와 맞물리지 않게 함
+  3) 최근 측정값으로 offset + drift(시계 속도 차이) 직선 추정
+  4) 아두이노 millis → PC 시각 변환 (센서 측정 시각을 PC 시각으로)
+
+  PING/PONG 형식 (firmware/motor_control/motor_control.ino):
+    텍스트 모드  : "P:<seq>" → "Q:<seq>,<수신 ms>,<전송 ms>"
+    바이너리 모드: PING 프레임 → PONG 프레임 (protocol.py)
+-------------------------------------------------------------------
+"""
+
+import time
+import random
+import threading
+from collections import deque
+
+MILLIS_WRAP = 1 << 32
+
+
+# ==================== 시계 동기화 ====================
+class ClockSync(object):
+    """
+    아두이노 millis ↔ PC 시각 변환
+
+    사용법:
+        clock = ClockSync(interval=1.0)
+        if clock.due():
+            link.send_ping(clock)               # clock.sent 호출
+        ... 수신 스레드에서 clock.pong(seq, rx_ms, tx_ms)
+        host_time = clock.to_host(capture_ms)   # 동기화 전이면 None
+    """
+
+    def __init__(self, interval=1.0, window=32, tolerance=0.005, min_samples=4):
+        """
+        Args:
+            interval (float): 평균 PING 주기 (초)
+            window (int): 보관할 최근 측정값 수
+            tolerance (float): 추정에 쓸 왕복 시간 범위 (초, 최소 왕복 시간 + tolerance 이하)
+            min_samples (int): 동기화 완료로 볼 최소 측정값 수
+        """
+        self.interval = interval
+        self.tolerance = tolerance
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+        self.samples = deque(maxlen=window)     # (PC 기준 시각, offset s, rtt s)
+        self.pending = {}                       # {seq: t0}
+        self.next_ping = None
+
+        # millis 32비트 넘침 처리 (약 49일)
+        self.wraps = 0
+        self.last_ms = None
+
+        # 추정값: offset(t) = offset + drift * (t - ref)  [아두이노 시각 - PC 시각, 초]
+        self.offset = None
+        self.drift = 0.0
+        self.ref = 0.0
+
+        self.pings = 0
+        self.pongs = 0
+
+    # ==================== PING / PONG ====================
+    def due(self, now=None):
+        """PING 보낼 때가 됐는지"""
+        now = time.monotonic() if now is None else now
+        return self.next_ping is None or now >= self.next_ping
+
+    def sent(self, seq, stamp=None):
+        """PING 전송 기록 (t0)"""
+        stamp = time.monotonic() if stamp is None else stamp
+        with self.lock:
+            self.pending = {s: t for s, t in self.pending.items() if stamp - t < 10 * self.interval}
+            self.pending[seq] = stamp
+            self.next_ping = stamp + self.interval * random.uniform(0.5, 1.5)
+            self.pings += 1
+
+    def pong(self, seq, rx_ms, tx_ms, stamp=None):
+        """
+        PONG 수신 처리
+
+        Args:
+            seq (int): PING 순번
+            rx_ms (int): 아두이노 PING 수신 millis (t1)
+            tx_ms (int): 아두이노 PONG 전송 millis (t2)
+            stamp (float): PC PONG 수신 시각 (t3, None이면 time.monotonic)
+        """
+        t3 = time.monotonic() if stamp is None else stamp
+        with self.lock:
+            t0 = self.pending.pop(seq, None)
+            if t0 is None:
+                return
+            t1 = self.unwrap(rx_ms) / 1000.0
+            t2 = t1 + ((tx_ms - rx_ms) % MILLIS_WRAP) / 1000.0
+            offset = ((t1 - t0) + (t2 - t3)) / 2
+            rtt = (t3 - t0) - (t2 - t1)
+            self.samples.append(((t0 + t3) / 2, offset, rtt))
+            self.pongs += 1
+            self.estimate()
+
+    def unwrap(self, ms):
+        """32비트 millis → 넘침을 고려한 연속 값 (ms)"""
+        if self.last_ms is not None and ms < self.last_ms and self.last_ms - ms > MILLIS_WRAP // 2:
+            self.wraps += 1
+        self.last_ms = ms
+        return ms + self.wraps * MILLIS_WRAP
+
+    def estimate(self):
+        """왕복 시간이 짧은 측정값으로 offset/drift 직선 추정 (최소제곱)"""
+        limit = min(sample[2] for sample in self.samples) + self.tolerance
+        best = [sample for sample in self.samples if sample[2] <= limit]
+        n = len(best)
+        mean_t = sum(sample[0] for sample in best) / n
+        mean_o = sum(sample[1] for sample in best) / n
+
+        var_t = sum((sample[0] - mean_t) ** 2 for sample in best)
+        if n >= 3 and var_t > 1e-6:
+            self.drift = sum((sample[0] - mean_t) * (sample[1] - mean_o) for sample in best) / var_t
+        self.offset = mean_o
+        self.ref = mean_t
+
+    # ==================== 변환 ====================
+    def synced(self):
+        """동기화 완료 여부 (측정값 min_samples개 이상)"""
+        return self.offset is not None and len(self.samples) >= self.min_samples
+
+    def to_host(self, ms):
+        """
+        아두이노 millis → PC 시각 (time.monotonic 기준)
+
+        Returns:
+            float: PC 시각 (초), 동기화 전이면 None
+        """
+        with self.lock:
+            if not self.synced():
+                return None
+            arduino = self.unwrap(ms) / 1000.0
+            # arduino = host + offset + drift * (host - ref)
+            return (arduino - self.offset + self.drift * self.ref) / (1 + self.drift)
+
+    def get_stats(self):
+        """
+        동기화 상태
+
+        Returns:
+            dict: {'synced', 'offset_ms', 'drift_ppm', 'min_rtt_ms', 'samples', 'pings', 'pongs'}
+        """
+        with self.lock:
+            rtts = [sample[2] for sample in self.samples]
+            return {
+                'synced': self.synced(),
+                'offset_ms': self.offset * 1000 if self.offset is not None else None,
+                'drift_ppm': self.drift * 1e6,
+                'min_rtt_ms': min(rtts) * 1000 if rtts else None,
+                'samples': len(self.samples),
+                'pings': self.pings,
+                'pongs': self.pongs
+            }
@@ -19,10 +19,74 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 from utils import Function_Library as fl
 from modules.vehicle import sensors
+from modules.vehicle.drive import DriveShaper
+from modules.vehicle.transmitter import CommandTransmitter
+from modules.vehicle.ultrasonic_state import SENSOR_NAMES
+import math
 import config
 
+# 연속 속도/조향 명령 정리 (양자화 + 변화율 제한)
+drive_shaper = DriveShaper(
+    center=config.SERVO_CENTER,
+    steer_limit=config.DRIVE_STEER_MAX,
+    speed_step=config.DRIVE_SPEED_STEP,
+    steer_step=config.DRIVE_STEER_STEP,
+    speed_slew=config.DRIVE_SPEED_SLEW,
+    steer_slew=config.DRIVE_STEER_SLEW
+)
+
+
 # ==================== 모터 명령 전송 ====================
-def send_motor_command(command):
+def transmit(value, resend=False):
+    """
+    명령 값 1개 전송 (명령 문자 또는 (pwm, 서보 각도)) + 방향에 맞는 초음파 센서 선택
+
+    Args:
+        value: 명령 값
+        resend (bool): 센서 선택이 그대로여도 다시 전송 (하트비트)
+    """
+    if isinstance(value, str):
+        sensors.arduino_link.send_command(value)
+    else:
+        sensors.arduino_link.send_drive(*value)
+
+    if config.ULTRASONIC_SELECT:
+        sensors.select_ultrasonic(config.ULTRASONIC_SETS[drive_direction(value)], resend)
+
+
+def drive_direction(value):
+    """
+    명령 값 → 주행 방향
+
+    Returns:
+        str: 'forward', 'reverse', 'stop'
+    """
+    if isinstance(value, str):
+        if value == 'B':
+            return 'reverse'
+        return 'stop' if value == 'S' else 'forward'
+    pwm = value[0]
+    if pwm < 0:
+        return 'reverse'
+    return 'stop' if pwm == 0 else 'forward'
+
+
+def transmit_heartbeat(value):
+    """
+    하트비트 + 현재 명령 / 초음파 센서 선택 재전송
+    (워치독으로 멈췄다가 통신이 돌아오면 다시 주행, SENSOR_SET 유실이나 아두이노 리셋 후 센서 선택 복구)
+
+    하트비트는 바이너리 모드 또는 COMMAND_ACK_TEXT일 때만 (구버전 펌웨어는 명령 재전송만)
+    """
+    sensors.arduino_link.send_heartbeat()
+    transmit(value, resend=True)
+
+
+# 변화 시에만 전송 + 주기 하트비트 (아두이노 워치독)
+command_tx = CommandTransmitter(transmit, transmit_heartbeat, heartbeat=config.COMMAND_HEARTBEAT)
+
+
+def send_motor_command(command, force=False):
     """
     아두이노로 모터 제어 명령 전송
 
@@ -33,12 +97,20 @@ def send_motor_command(command):
             'L' - 좌회전 (Left)
             'R' - 우회전 (Right)
             'S' - 정지 (Stop)
+        force (bool): 이전과 같은 명령이어도 전송
+
+    Returns:
+        bool: 실제로 전송했으면 True
 
     동작:
-        - 시리얼 통신으로 1바이트 전송
+        - 이전 명령과 같으면 전송 생략
+        - 명령 변화와 관계없이 heartbeat 주기마다 하트비트 + 현재 명령 재전송
+        - 바이너리 모드: COMMAND 프레임 전송 (CRC 포함)
+        - 텍스트 모드: 시리얼 통신으로 1바이트 전송
         - 아두이노가 받아서 모터 제어
     """
-    sensors.arduino.write(command.encode())
+    if not command_tx.update(command, force):
+        return False
 
     # 명령에 따른 메시지 출력
     messages = {
@@ -49,10 +121,68 @@ def send_motor_command(command):
         'S': '정지'
     }
     print(messages.get(command, f'[모터 명령] {command}'))
+    return True
+
+
+def send_drive(speed, steer):
+    """
+    연속 속도/조향 명령 전송
+
+    Args:
+        speed (float): 목표 속도 (PWM, -255~255, 음수 = 후진)
+        steer (float): 목표 조향 (도, 중앙 기준, 왼쪽 - / 오른쪽 +)
+
+    Returns:
+        bool: 실제로 전송했으면 True (양자화 후 이전 값과 같으면 생략)
+
+    동작:
+        1) 변화율 제한 (가속/조향은 config.DRIVE_*_SLEW까지, 감속은 즉시)
+        2) 양자화 (config.DRIVE_SPEED_STEP PWM, config.DRIVE_STEER_STEP 도)
+        3) 이전에 보낸 값과 다를 때만 "V:<pwm>,S:<deg>" (또는 DRIVE 프레임) 전송
+           (바뀌든 안 바뀌든 heartbeat 주기마다 하트비트 → 매 루프 조향이 바뀌어도 워치독 동작)
+    """
+    return command_tx.update(drive_shaper.shape(speed, steer))
+
+
+def command_to_drive(command, heading=None, lane_state=None):
+    """
+    모터 명령 문자 → 연속 속도/조향 목표값
+
+    Args:
+        command (str): decide_action 결과 ('F', 'B', 'L', 'R', 'S')
+        heading (float): 차선 기울기 (sensors.get_lane_heading, 없으면 None)
+                         있으면 고정 최대 각도 대신 기울기에 비례해서 조향
+        lane_state (dict): BEV 차선 추적 결과 (sensors.get_lane_state, 없으면 None)
+                           있으면 heading보다 우선 - 방향 오차 + 차선 중심 오프셋으로 조향
+
+    Returns:
+        tuple: (속도 PWM, 조향 도)
+    """
+    if command == 'S':
+        return 0, 0
+    if command == 'B':
+        return -config.DRIVE_SPEED_BACKWARD, 0
+
+    if lane_state is not None:
+        # 오프셋은 오른쪽 + → 왼쪽(-)으로 조향해서 차선 중심으로 복귀
+        steer = (math.degrees(lane_state['heading']) * config.DRIVE_STEER_GAIN
+                 - lane_state['offset'] * config.DRIVE_OFFSET_GAIN)
+        steer = max(-config.DRIVE_STEER_MAX, min(config.DRIVE_STEER_MAX, steer))
+    elif heading is not None:
+        steer = math.degrees(math.atan(heading)) * config.DRIVE_STEER_GAIN
+    elif command == 'L':
+        steer = -config.DRIVE_STEER_MAX
+    elif command == 'R':
+        steer = config.DRIVE_STEER_MAX
+    else:
+        steer = 0
+
+    speed = config.DRIVE_SPEED_FORWARD if command == 'F' else config.DRIVE_SPEED_TURN
+    return speed, steer
 
 
 # ==================== 제어 결정 로직 ====================
-def decide_action(direction, has_obstacle, nearest_distance, ultrasonic_data):
+def decide_action(direction, has_obstacle, nearest_distance, ultrasonic):
     """
     센서 데이터를 분석해서 모터 제어 명령 결정
 
@@ -60,15 +190,14 @@ def decide_action(direction, has_obstacle, nearest_distance, ultrasonic_data):
         direction (int): 차선 방향 (FORWARD=0, LEFT=1, RIGHT=2, None)
         has_obstacle (bool): 라이다 장애물 감지 여부
         nearest_distance (int): 가장 가까운 장애물 거리 (mm)
-        ultrasonic_data (dict): 초음파 6개 센서 거리 딕셔너리 (cm)
-                                {'F': 25, 'FL': 30, 'FR': 28, 'R': 50, 'RL': 45, 'RR': 48}
+        ultrasonic (UltrasonicState): 초음파 6개 센서 상태 (sensors.read_ultrasonic 반환값)
 
     Returns:
         str: 모터 명령 ('F', 'B', 'L', 'R', 'S')
 
     우선순위:
         1. 라이다 장애물 감지 → 정지 ('S')
-        2. 전방 3개 초음파 센서 장애물 감지 → 정지 ('S')
+        2. 전방 3개 초음파 센서 장애물 감지 또는 측정값 없음/오래됨 → 정지 ('S')
         3. 차선 방향 따라가기 → 전진/좌회전/우회전
         4. 차선 못 찾으면 → 정지 ('S')
     """
@@ -81,33 +210,19 @@ def decide_action(direction, has_obstacle, nearest_distance, ultrasonic_data):
     # 안전 거리 변환: config는 mm 단위, Arduino는 cm 단위 전송
     safe_distance_cm = config.ULTRASONIC_SAFE_DISTANCE / 10  # mm → cm
 
-    # 전방 센서 거리 추출 (센서 값이 0이면 999로 간주 = 측정 실패)
-    front_distance = ultrasonic_data.get('F', 999)
-    front_left_distance = ultrasonic_data.get('FL', 999)
-    front_right_distance = ultrasonic_data.get('FR', 999)
-
-    # 0은 측정 실패이므로 999로 대체 (무한대로 간주)
-    if front_distance == 0:
-        front_distance = 999
-    if front_left_distance == 0:
-        front_left_distance = 999
-    if front_right_distance == 0:
-        front_right_distance = 999
+    # 전방 센서 측정이 오래됐거나 필터가 아직 안 채워졌으면
+    # (시작 직후, 수신 스레드 종료, 통신 끊김, 센서 선택 직후) 판단 불가 → 정지
+    if not ultrasonic.covered('front'):
+        print(f"⚠️  초음파 전방 값 없음 - 정지 ({ultrasonic.summary('front')})")
+        return 'S'
 
-    # 전방 3개 센서 중 가장 가까운 거리 찾기
-    min_front_distance = min(front_distance, front_left_distance, front_right_distance)
+    # 전방 3개 센서 중 가장 가까운 거리 (중앙값 필터 결과, 유효 값이 하나도 없을 때만 장애물 없음)
+    min_front_distance, sensor = ultrasonic.group_min('front')
 
     # 안전 거리 이내에 장애물이 있으면 정지
-    if min_front_distance < safe_distance_cm:
-        # 어느 센서가 감지했는지 출력
-        sensor_name = "전방"
-        if min_front_distance == front_left_distance:
-            sensor_name = "좌전방"
-        elif min_front_distance == front_right_distance:
-            sensor_name = "우전방"
-
-        print(f"⚠️  초음파 {sensor_name} 장애물 감지! (거리: {int(min_front_distance)}cm)")
-        print(f"   (전방: {front_distance}cm, 좌전: {front_left_distance}cm, 우전: {front_right_distance}cm)")
+    if min_front_distance is not None and min_front_distance < safe_distance_cm:
+        print(f"⚠️  초음파 {SENSOR_NAMES[sensor]} 장애물 감지! (거리: {int(min_front_distance)}cm)")
+        print(f"   ({ultrasonic.summary('front')})")
         return 'S'
 
     # 우선순위 3: 차선 따라가기
@@ -125,7 +240,7 @@ def decide_action(direction, has_obstacle, nearest_distance, ultrasonic_data):
 
 # ==================== 고급 제어 로직 (선택 사항) ====================
 def decide_action_advanced(direction, has_obstacle, nearest_distance,
-                          ultrasonic_data, traffic_light=None):
+                          ultrasonic, traffic_light=None, traffic_stale=False):
     """
     신호등까지 고려한 고급 제어 로직
 
@@ -133,19 +248,26 @@ def decide_action_advanced(direction, has_obstacle, nearest_distance,
         direction: 차선 방향
         has_obstacle: 장애물 감지 여부
         nearest_distance: 장애물 거리 (mm)
-        ultrasonic_data (dict): 초음파 6개 센서 거리 딕셔너리 (cm)
+        ultrasonic (UltrasonicState): 초음파 6개 센서 상태
         traffic_light: 신호등 색상 ("RED", "GREEN", "YELLOW", "BLUE")
+        traffic_stale (bool): 신호등 결과가 없거나 오래됨 (None을 "신호등 없음"으로 믿을 수 없음)
 
     Returns:
         str: 모터 명령
 
     우선순위:
+        0. 신호등 결과 없음/오래됨 → 정지
         1. 빨간 신호등 → 정지
         2. 노란 신호등 → 정지 (감속)
         3. 라이다 장애물 → 정지
-        4. 초음파 전방 장애물 → 정지
+        4. 초음파 전방 장애물 또는 측정값 없음/오래됨 → 정지
         5. 초록 신호 + 차선 따라가기
     """
+    # 우선순위 0: 신호등 인식이 밀려서 결과가 없거나 오래됨 → 판단 불가, 정지
+    if traffic_stale:
+        print("⚠️  신호등 결과 없음/오래됨 - 정지")
+        return 'S'
+
     # 우선순위 1: 빨간 신호등 → 정지
     if traffic_light == "RED":
         print("🚦 빨간 신호! 정지")
@@ -164,28 +286,14 @@ def decide_action_advanced(direction, has_obstacle, nearest_distance,
     # 우선순위 4: 전방 3개 초음파 센서 체크
     safe_distance_cm = config.ULTRASONIC_SAFE_DISTANCE / 10
 
-    front_distance = ultrasonic_data.get('F', 999)
-    front_left_distance = ultrasonic_data.get('FL', 999)
-    front_right_distance = ultrasonic_data.get('FR', 999)
-
-    # 0은 측정 실패
-    if front_distance == 0:
-        front_distance = 999
-    if front_left_distance == 0:
-        front_left_distance = 999
-    if front_right_distance == 0:
-        front_right_distance = 999
-
-    min_front_distance = min(front_distance, front_left_distance, front_right_distance)
+    if not ultrasonic.covered('front'):
+        print(f"⚠️  초음파 전방 값 없음 - 정지 ({ultrasonic.summary('front')})")
+        return 'S'
 
-    if min_front_distance < safe_distance_cm:
-        sensor_name = "전방"
-        if min_front_distance == front_left_distance:
-            sensor_name = "좌전방"
-        elif min_front_distance == front_right_distance:
-            sensor_name = "우전방"
+    min_front_distance, sensor = ultrasonic.group_min('front')
 
-        print(f"⚠️  초음파 {sensor_name} 장애물 감지! (거리: {int(min_front_distance)}cm)")
+    if min_front_distance is not None and min_front_distance < safe_distance_cm:
+        print(f"⚠️  초음파 {SENSOR_NAMES[sensor]} 장애물 감지! (거리: {int(min_front_distance)}cm)")
         return 'S'
 
     # 우선순위 5: 초록 신호 + 차선 따라가기
@@ -215,7 +323,8 @@ def emergency_stop():
         - 긴급 상황 발생 시
     """
     print("\n긴급 정지!")
-    send_motor_command('S')
+    send_motor_command('S', force=True)   # 연속 명령 모드도 해제됨 (아두이노)
+    drive_shaper.reset()
 
 
 # ==================== 종료 처리 ====================
@@ -0,0 +1,96 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: drive.py
+  연속 속도/조향 명령 정리 모듈
+
+  기능:
+  1) 속도(PWM)와 조향(도) 목표값을 아두이노로 보낼 값으로 변환
+     - 양자화: 속도 speed_step, 조향 steer_step 단위로 반올림
+     - 변화율 제한: 초당 최대 변화량 (가속/조향만 제한, 감속과 방향 전환 시 정지는 즉시)
+  2) 변화 시에만 전송은 transmitter.CommandTransmitter에서 처리
+
+  아두이노 명령 형식:
+    텍스트 모드  : "V:<pwm>,S:<deg>\\n"  (pwm -255~255, 음수 = 후진 / deg = 서보 각도)
+    바이너리 모드: DRIVE 프레임 (protocol.py)
+-------------------------------------------------------------------
+"""
+
+import time
+
+MAX_PWM = 255
+MAX_DT = 0.2        # 변화율 계산 최대 시간 간격 (초, 오래 멈췄다가 다시 호출해도 급변 방지)
+
+
+# ==================== 명령 정리 ====================
+class DriveShaper(object):
+    """
+    속도/조향 목표값 → 양자화 + 변화율 제한
+
+    사용법:
+        shaper = DriveShaper(center=90, steer_limit=30)
+        drive = shaper.shape(150, -12.5)      # (pwm, 서보 각도)
+        transmitter.update(drive)             # 바뀌었을 때만 전송
+    """
+
+    def __init__(self, center=90, steer_limit=30, speed_step=5, steer_step=1,
+                 speed_slew=400, steer_slew=120):
+        """
+        Args:
+            center (int): 서보 중앙 각도 (직진)
+            steer_limit (int): 중앙 기준 최대 조향 각도 (도)
+            speed_step (int): 속도 양자화 단위 (PWM)
+            steer_step (int): 조향 양자화 단위 (도)
+            speed_slew (float): 초당 최대 가속량 (PWM/s)
+            steer_slew (float): 초당 최대 조향 변화량 (도/s)
+        """
+        self.center = center
+        self.steer_limit = steer_limit
+        self.speed_step = speed_step
+        self.steer_step = steer_step
+        self.speed_slew = speed_slew
+        self.steer_slew = steer_slew
+
+        self.speed = 0.0        # 변화율 제한 적용한 현재 속도 (PWM)
+        self.steer = 0.0        # 변화율 제한 적용한 현재 조향 (도, 중앙 기준)
+        self.stamp = None       # 마지막 호출 시각
+
+    def reset(self):
+        """정지 상태로 초기화 (긴급 정지 후)"""
+        self.speed, self.steer = 0.0, 0.0
+        self.stamp = None
+
+    def shape(self, speed, steer, now=None):
+        """
+        목표값에 변화율 제한 + 양자화 적용
+
+        Args:
+            speed (float): 목표 속도 (PWM, -255~255, 음수 = 후진)
+            steer (float): 목표 조향 (도, 중앙 기준, 왼쪽 - / 오른쪽 +)
+            now (float): 현재 시각 (None이면 time.monotonic)
+
+        Returns:
+            tuple: (pwm, 서보 각도)
+        """
+        now = time.monotonic() if now is None else now
+        dt = 0.0 if self.stamp is None else min(now - self.stamp, MAX_DT)
+        self.stamp = now
+
+        speed = max(-MAX_PWM, min(MAX_PWM, speed))
+        steer = max(-self.steer_limit, min(self.steer_limit, steer))
+
+        # 감속(0 쪽으로)은 즉시, 가속은 변화율 제한
+        # 방향 전환은 즉시 0으로 멈춘 뒤 반대 방향으로 가속 (전진 중 후진 명령에 계속 전진하지 않게)
+        if speed * self.speed < 0:
+            self.speed = 0.0
+        if speed * self.speed >= 0 and abs(speed) <= abs(self.speed):
+            self.speed = speed
+        else:
+            step = self.speed_slew * dt
+            self.speed += max(-step, min(step, speed - self.speed))
+
+        step = self.steer_slew * dt
+        self.steer += max(-step, min(step, steer - self.steer))
+
+        pwm = int(round(self.speed / self.speed_step) * self.speed_step)
+        angle = self.center + int(round(self.steer / self.steer_step) * self.steer_step)
+        return max(-MAX_PWM, min(MAX_PWM, pwm)), angle
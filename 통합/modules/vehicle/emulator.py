@@ -0,0 +1,483 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: emulator.py
+  아두이노 펌웨어 에뮬레이터 (Linux 가상 시리얼 포트)
+
+  기능:
+  1) firmware/motor_control/motor_control.ino 동작을 PC에서 흉내냄
+     - 가상 시리얼 포트(pty)를 만들고 config.ARDUINO_PORT처럼 사용
+     - 명령 문자, "V:<pwm>,S:<deg>" 줄, 하트비트 'H', 바이너리 프레임 처리
+     - HELLO → HELLO_ACK (바이너리 모드 전환), 워치독
+     - 순번 붙인 명령은 동작 후 ACK (수신/동작 millis)
+     - PING → PONG, 센서 값에 측정 millis (시계 차이/속도 차이 설정 가능)
+     - 측정 센서 선택 (SENSOR_SET 프레임 / "U:012" 줄)
+  2) 초음파 센서 6개 값 전송 ("F:25,FL:30,..." 줄 또는 SENSORS 프레임)
+     - 센서별 거리 / 잡음(표준편차) / 측정 실패 확률 / 튀는 값 확률 설정
+  3) 실제 보드와 같은 시간 흐름
+     - 매 루프: 명령 수신 → 서보 구동 delay(50) → 선택한 센서 순서대로 pulseIn
+       (거리만큼 에코 시간, 실패하면 30ms 타임아웃) → 전송 (보드레이트만큼) → delay(50)
+  4) 통계: 루프 주기, 보낸 줄/프레임, 받은 명령, 쓰기 막힘 (PC가 안 읽어서 버퍼가 찬 경우)
+
+  실행 방법 (Linux):
+    python modules/vehicle/emulator.py --distance F=30 --noise 1.5
+    → 출력된 /dev/pts/N을 config.ARDUINO_PORT에 설정
+-------------------------------------------------------------------
+"""
+
+import sys
+import os
+# 프로젝트 루트 디렉토리를 파이썬 경로에 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import tty
+import time
+import random
+import select
+import struct
+import threading
+
+from modules.vehicle import protocol
+
+SENSOR_KEYS = protocol.SENSOR_KEYS
+BANNER = b"Arduino Ready!\r\nDC Motor + 6 Ultrasonic Sensors + Servo Steering\r\n"
+
+# 펌웨어와 같은 값
+LOOP_DELAY = 0.05           # loop() 끝 delay(50)
+SERVO_DELAY = 0.05          # setServoAngle 안 delay(50)
+PULSE_TIMEOUT = 0.03        # pulseIn 타임아웃 30ms
+TRIGGER_TIME = 12e-6        # Trig LOW 2us + HIGH 10us
+ECHO_START = 450e-6         # Trig 후 에코 시작까지 (HC-SR04 약 0.45ms)
+SENSOR_GAP = 200e-6         # 센서 간 delayMicroseconds(200)
+US_PER_CM = 2 / 0.034       # 왕복 에코 시간 (us/cm)
+WATCHDOG = 0.5              # WATCHDOG_MS
+SERVO_CENTER, SERVO_LEFT_MAX, SERVO_RIGHT_MAX = 90, 60, 120
+TEXT_LINE_MAX = 23          # text_buf 크기 - 1
+
+WRITE_TIMEOUT = 0.1         # 출력 버퍼가 찼을 때 최대 대기 (초, 넘으면 버림)
+
+
+# ==================== 에뮬레이터 ====================
+class ArduinoEmulator(object):
+    """
+    motor_control.ino 에뮬레이터
+
+    사용법:
+        emulator = ArduinoEmulator(distances={'F': 30}, noise=1.0)
+        emulator.start()
+        arduino = serial.Serial(emulator.port, 115200)
+        ...
+        emulator.stop()
+    """
+
+    def __init__(self, distances=None, noise=0.0, dropout=0.0, spikes=0.0,
+                 baudrate=115200, time_scale=1.0, seed=None, drift_ppm=0.0):
+        """
+        Args:
+            distances (dict): 센서별 실제 거리 (cm, 없는 센서는 100, 0 이하 = 반사 없음)
+            noise (float 또는 dict): 거리 잡음 표준편차 (cm, 센서별 dict 가능)
+            dropout (float): 측정 실패 확률 (0 전송, 30ms 타임아웃)
+            spikes (float): 엉뚱한 값이 나올 확률 (다른 물체/다중 반사)
+            baudrate (int): 전송 시간 계산용 보드레이트
+            time_scale (float): 대기 시간 배율 (1.0 = 실제 시간, 0 = 대기 없이 최대 속도)
+            seed (int): 난수 시드 (재현용)
+            drift_ppm (float): 아두이노 시계 속도 오차 (ppm, 세라믹 공진자는 수백~천 ppm)
+        """
+        self.distances = {key: 100.0 for key in SENSOR_KEYS}
+        self.distances.update(distances or {})
+        self.noise = {key: (noise.get(key, 0.0) if isinstance(noise, dict) else noise)
+                      for key in SENSOR_KEYS}
+        self.dropout = dropout
+        self.spikes = spikes
+        self.baudrate = baudrate
+        self.time_scale = time_scale
+        self.random = random.Random(seed)
+
+        # 가상 시리얼 포트 (에뮬레이터 = master, PC 프로그램 = slave 경로)
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+
+        # 펌웨어 상태
+        self.command = 'S'
+        self.drive_mode = False
+        self.drive_pwm = 0
+        self.drive_angle = SERVO_CENTER
+        self.steering = SERVO_CENTER
+        self.motor_pwm = 0              # 현재 모터 출력 (음수 = 후진)
+        self.binary_mode = False
+        self.tx_seq = 0
+        self.decoder = protocol.FrameDecoder()
+        self.text_line = None           # "V:..." 줄 수신 중이면 bytearray
+        self.watchdog_armed = False
+        self.last_rx = 0.0
+        self.readings = [0] * len(SENSOR_KEYS)
+        self.active = list(range(len(SENSOR_KEYS)))    # 측정할 센서 번호 (측정 순서)
+        self.measured = [False] * len(SENSOR_KEYS)     # 이번 루프에 측정한 센서
+        self.boot = time.monotonic()    # millis() 기준 시각
+        self.drift = drift_ppm * 1e-6
+        self.measure_ms = 0
+        self.ack = None                 # 이번 루프에 보낼 ACK (seq, 수신 ms)
+
+        self.thread = None
+        self.running = False
+
+        # 통계
+        self.loops = 0
+        self.loop_total = 0.0           # 누적 루프 시간 (s)
+        self.lines_sent = 0             # 텍스트 센서 줄
+        self.frames_sent = 0            # 바이너리 프레임
+        self.bytes_tx = 0
+        self.bytes_rx = 0
+        self.commands = 0               # 받은 명령 (문자/연속/프레임, 하트비트 제외)
+        self.heartbeats = 0
+        self.watchdog_trips = 0
+        self.write_stalls = 0           # 출력 버퍼가 차서 버린 전송
+        self.last_command_stamp = None  # 마지막 명령 처리 시각 (time.monotonic)
+
+    # ==================== 실행 ====================
+    def start(self):
+        """에뮬레이터 스레드 시작 (배너 출력 후 루프 반복)"""
+        if self.thread is not None:
+            return
+        self.running = True
+        self.write(BANNER)
+        self.thread = threading.Thread(target=self.run, name="arduino-emulator", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """에뮬레이터 종료 + 가상 포트 닫기"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def run(self):
+        while self.running:
+            self.step()
+
+    def sleep(self, seconds):
+        if self.time_scale > 0 and seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def step(self):
+        """펌웨어 loop() 1회"""
+        start = time.monotonic()
+
+        self.receive_commands()
+        self.check_watchdog()
+        if self.drive_mode:
+            self.execute_drive()
+        else:
+            self.execute_command()
+        self.send_ack()
+
+        self.measure_all()
+        self.send_sensor_data()
+        self.sleep(LOOP_DELAY)
+
+        self.loops += 1
+        self.loop_total += time.monotonic() - start
+
+    # ==================== 명령 수신 ====================
+    def receive_commands(self):
+        """받은 바이트 모두 처리 (펌웨어 receive_commands와 같은 규칙)"""
+        try:
+            data = os.read(self.master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        self.bytes_rx += len(data)
+
+        for b in data:
+            if self.binary_mode or self.decoder.buffer or b == protocol.SYNC[0]:
+                for msg_type, seq, payload in self.decoder.feed(bytes((b,))):
+                    self.handle_frame(msg_type, seq, payload)
+            elif self.text_line is not None:
+                if b in b'\r\n':
+                    self.handle_text_line(self.text_line.decode('ascii', 'replace'))
+                    self.text_line = None
+                elif len(self.text_line) < TEXT_LINE_MAX:
+                    self.text_line.append(b)
+                else:
+                    self.text_line = None   # 너무 긴 줄은 버림
+            elif b in b'VCPU':
+                self.text_line = bytearray((b,))
+            elif b == ord('H'):
+                self.feed_watchdog(True)
+            elif b not in b'\r\n':
+                self.set_command(chr(b))
+
+    def handle_frame(self, msg_type, seq, payload):
+        if msg_type == protocol.MSG_HELLO:
+            self.binary_mode = True
+            self.send_frame(protocol.MSG_HELLO_ACK, bytes((protocol.PROTOCOL_VERSION,)))
+        elif msg_type == protocol.MSG_COMMAND and payload:
+            self.set_command(chr(payload[0]))
+            self.request_ack(seq)
+        elif msg_type == protocol.MSG_DRIVE and len(payload) >= 3:
+            self.set_drive(*struct.unpack(protocol.DRIVE_FORMAT, payload[:3]))
+            self.request_ack(seq)
+        elif msg_type == protocol.MSG_HEARTBEAT:
+            self.feed_watchdog(True)
+        elif msg_type == protocol.MSG_PING:
+            self.send_pong(seq, self.millis())
+        elif msg_type == protocol.MSG_SENSOR_SET:
+            self.set_sensor_set(payload)
+
+    def handle_text_line(self, line):
+        """"V:<pwm>,S:<deg>[,N:<seq>]", "C:<명령>,N:<seq>", "P:<seq>" 또는 "U:<센서 번호들>" """
+        fields = dict(part.partition(':')[::2] for part in line.split(','))
+        try:
+            if 'U' in fields:
+                self.set_sensor_set([ord(c) - ord('0') for c in fields['U'][:len(SENSOR_KEYS)]])
+                return
+            if 'P' in fields:
+                self.send_pong(int(fields['P']), self.millis())
+                return
+            if 'V' in fields and 'S' in fields:
+                self.set_drive(int(fields['V']), int(fields['S']))
+            elif len(fields.get('C', '')) == 1 and 'N' in fields:
+                self.set_command(fields['C'])
+            else:
+                return
+            if 'N' in fields:
+                self.request_ack(int(fields['N']))
+        except ValueError:
+            pass
+
+    def millis(self):
+        return int((time.monotonic() - self.boot) * (1 + self.drift) * 1000) & 0xFFFFFFFF
+
+    def request_ack(self, seq):
+        self.ack = (seq & 0xFF, self.millis())
+
+    def send_pong(self, seq, rx_ms):
+        tx_ms = self.millis()
+        if self.binary_mode:
+            self.send_frame(protocol.MSG_PONG, struct.pack(protocol.PONG_FORMAT, seq & 0xFF, rx_ms, tx_ms))
+        else:
+            self.write(f"Q:{seq},{rx_ms},{tx_ms}\r\n".encode())
+
+    def send_ack(self):
+        """명령 ACK 전송 (모터/서보 동작 후)"""
+        if self.ack is None:
+            return
+        (seq, rx_ms), self.ack = self.ack, None
+        act_ms = self.millis()
+        if self.binary_mode:
+            self.send_frame(protocol.MSG_ACK, struct.pack(protocol.ACK_FORMAT, seq, rx_ms, act_ms))
+        else:
+            self.write(f"A:{seq},{rx_ms},{act_ms}\r\n".encode())
+
+    def set_command(self, command):
+        self.command = command
+        self.drive_mode = False
+        self.feed_watchdog(False)
+
+    def set_drive(self, pwm, angle):
+        self.drive_pwm = max(-255, min(255, pwm))
+        self.drive_angle = max(SERVO_LEFT_MAX, min(SERVO_RIGHT_MAX, angle))
+        self.drive_mode = True
+        self.feed_watchdog(False)
+
+    def feed_watchdog(self, heartbeat):
+        self.last_rx = time.monotonic()
+        if heartbeat:
+            self.watchdog_armed = True
+            self.heartbeats += 1
+        else:
+            self.commands += 1
+            self.last_command_stamp = self.last_rx
+
+    def check_watchdog(self):
+        if self.watchdog_armed and time.monotonic() - self.last_rx > WATCHDOG:
+            self.command = 'S'
+            self.drive_mode = False
+            self.watchdog_armed = False
+            self.watchdog_trips += 1
+
+    # ==================== 모터 / 조향 ====================
+    def execute_command(self):
+        """executeCommand: 매 루프 모터 출력 + setServoAngle (delay 50ms 포함)"""
+        speed, angle = {
+            'F': (150, SERVO_CENTER),
+            'B': (-120, SERVO_CENTER),
+            'L': (100, SERVO_LEFT_MAX),
+            'R': (100, SERVO_RIGHT_MAX),
+            'l': (150, 75),
+            'r': (150, 105),
+        }.get(self.command, (0, SERVO_CENTER))
+        self.motor_pwm = speed
+        self.steering = angle
+        self.sleep(SERVO_DELAY)
+
+    def execute_drive(self):
+        """execute_drive: 각도가 바뀔 때만 서보 구동"""
+        self.motor_pwm = self.drive_pwm
+        if self.drive_angle != self.steering:
+            self.steering = self.drive_angle
+            self.sleep(SERVO_DELAY)
+
+    # ==================== 초음파 센서 ====================
+    def measure(self, key):
+        """
+        센서 1개 측정 (펌웨어 measure_ultrasonic과 같은 계산)
+
+        Returns:
+            tuple: (거리 cm - 실패하면 0, 걸린 시간 s)
+        """
+        distance = self.distances[key]
+        if self.random.random() < self.spikes:
+            distance = self.random.uniform(2, 400)
+        elif self.noise[key] > 0:
+            distance = self.random.gauss(distance, self.noise[key])
+
+        duration = distance * US_PER_CM * 1e-6
+        if distance <= 0 or self.random.random() < self.dropout or ECHO_START + duration > PULSE_TIMEOUT:
+            return 0, TRIGGER_TIME + PULSE_TIMEOUT
+
+        measured = int(duration * 1e6 * 0.034 / 2)
+        if measured < 2 or measured > 400:
+            measured = 0
+        return measured, TRIGGER_TIME + ECHO_START + duration
+
+    def measure_all(self):
+        """선택한 센서만 순서대로 측정 (pulseIn은 에코가 끝날 때까지 대기)"""
+        start_ms = self.millis()
+        elapsed = 0.0
+        self.measured = [False] * len(SENSOR_KEYS)
+        for i in self.active:
+            self.readings[i], duration = self.measure(SENSOR_KEYS[i])
+            self.measured[i] = True
+            elapsed += duration + SENSOR_GAP
+        self.sleep(elapsed)
+        self.measure_ms = (start_ms + ((self.millis() - start_ms) & 0xFFFFFFFF) // 2) & 0xFFFFFFFF
+
+    def set_sensor_set(self, indices):
+        """측정 센서 선택 (잘못된 번호/중복은 무시, 남는 게 없으면 6개 모두)"""
+        active = []
+        for index in indices:
+            if 0 <= index < len(SENSOR_KEYS) and index not in active:
+                active.append(index)
+        self.active = active or list(range(len(SENSOR_KEYS)))
+
+    # ==================== 전송 ====================
+    def send_sensor_data(self):
+        if self.binary_mode:
+            values = [value if measured else protocol.NOT_MEASURED
+                      for value, measured in zip(self.readings, self.measured)]
+            self.send_frame(protocol.MSG_SENSORS,
+                            struct.pack(protocol.SENSOR_TIME_FORMAT, *values, self.measure_ms))
+            return
+        parts = [f"{key}:{value}"
+                 for key, value, measured in zip(SENSOR_KEYS, self.readings, self.measured) if measured]
+        line = ",".join(parts + [f"T:{self.measure_ms}"])
+        if self.write((line + "\r\n").encode()):
+            self.lines_sent += 1
+
+    def send_frame(self, msg_type, payload):
+        frame = protocol.encode(msg_type, self.tx_seq, payload)
+        self.tx_seq = (self.tx_seq + 1) & 0xFF
+        if self.write(frame):
+            self.frames_sent += 1
+
+    def write(self, data):
+        """
+        가상 포트로 전송 (보드레이트만큼 시간 소요)
+
+        Returns:
+            bool: 모두 보냈으면 True (PC가 읽지 않아 버퍼가 계속 차 있으면 버리고 False)
+        """
+        view = memoryview(data)
+        while view:
+            _, writable, _ = select.select([], [self.master], [], WRITE_TIMEOUT)
+            if not writable:
+                self.write_stalls += 1
+                return False
+            try:
+                written = os.write(self.master, view)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return False
+            view = view[written:]
+        self.bytes_tx += len(data)
+        self.sleep(len(data) * 10 / self.baudrate)
+        return True
+
+    # ==================== 설정 / 통계 ====================
+    def set_distance(self, key, cm):
+        """센서 실제 거리 변경 (cm, 0 이하 = 반사 없음)"""
+        self.distances[key] = cm
+
+    def set_noise(self, key, sigma):
+        """센서 잡음 표준편차 변경 (cm)"""
+        self.noise[key] = sigma
+
+    def get_stats(self):
+        """
+        에뮬레이터 통계
+
+        Returns:
+            dict: {'loops', 'loop_ms', 'lines_sent', 'frames_sent', 'bytes_tx', 'bytes_rx',
+                   'commands', 'heartbeats', 'watchdog_trips', 'write_stalls',
+                   'command', 'motor_pwm', 'steering', 'binary_mode', 'active'}
+        """
+        return {
+            'loops': self.loops,
+            'loop_ms': self.loop_total / self.loops * 1000 if self.loops else 0.0,
+            'lines_sent': self.lines_sent,
+            'frames_sent': self.frames_sent,
+            'bytes_tx': self.bytes_tx,
+            'bytes_rx': self.bytes_rx,
+            'commands': self.commands,
+            'heartbeats': self.heartbeats,
+            'watchdog_trips': self.watchdog_trips,
+            'write_stalls': self.write_stalls,
+            'command': self.command,
+            'motor_pwm': self.motor_pwm,
+            'steering': self.steering,
+            'binary_mode': self.binary_mode,
+            'active': tuple(SENSOR_KEYS[i] for i in self.active)
+        }
+
+
+# ==================== 단독 실행 ====================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="motor_control.ino 에뮬레이터 (가상 시리얼 포트)")
+    parser.add_argument('--distance', action='append', default=[], metavar='KEY=CM',
+                        help="센서 거리 (예: --distance F=30 --distance R=0)")
+    parser.add_argument('--noise', type=float, default=0.0, help="거리 잡음 표준편차 (cm)")
+    parser.add_argument('--dropout', type=float, default=0.0, help="측정 실패 확률")
+    parser.add_argument('--spikes', type=float, default=0.0, help="튀는 값 확률")
+    parser.add_argument('--scale', type=float, default=1.0, help="시간 배율 (0 = 대기 없음)")
+    args = parser.parse_args()
+
+    distances = {}
+    for item in args.distance:
+        key, _, cm = item.partition('=')
+        distances[key] = float(cm)
+
+    emulator = ArduinoEmulator(distances, args.noise, args.dropout, args.spikes, time_scale=args.scale)
+    emulator.start()
+    print(f"가상 아두이노 포트: {emulator.port}")
+    print(f"config.ARDUINO_PORT = '{emulator.port}' 로 설정 후 실행 (종료: Ctrl + C)")
+
+    try:
+        while True:
+            time.sleep(5)
+            stats = emulator.get_stats()
+            print(f"루프 {stats['loops']}회 (평균 {stats['loop_ms']:.1f}ms), "
+                  f"명령 {stats['command']} / 모터 {stats['motor_pwm']} / 조향 {stats['steering']}, "
+                  f"수신 명령 {stats['commands']}, 쓰기 막힘 {stats['write_stalls']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
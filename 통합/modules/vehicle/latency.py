@@ -0,0 +1,165 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: latency.py
+  명령 → 모터 동작 지연 시간 측정 모듈
+
+  기능:
+  1) 명령마다 순번(seq)과 전송 시각 기록
+  2) 아두이노 ACK (순번, 수신 millis, 모터 동작 millis)로 지연 시간 계산
+     - rtt     : PC 전송 → ACK 수신 (왕복)
+     - firmware: 아두이노 명령 수신 → 모터/서보 동작 완료 (아두이노 안에서 걸린 시간)
+  3) 고정 구간 히스토그램에 누적 (메모리 일정, p50/p95/max 계산)
+  4) ACK가 오지 않은 명령 수 (유실 또는 같은 루프에서 다음 명령으로 덮어씀)
+
+  ACK 형식 (firmware/motor_control/motor_control.ino):
+    텍스트 모드  : "A:<seq>,<수신 ms>,<동작 ms>"
+    바이너리 모드: ACK 프레임 (protocol.py)
+-------------------------------------------------------------------
+"""
+
+import time
+import threading
+
+BIN_MS = 1.0            # 히스토그램 구간 크기 (ms)
+MAX_MS = 1000           # 이보다 큰 값은 마지막 구간에 누적 (max는 따로 기록)
+PENDING_TIMEOUT = 2.0   # 이 시간 (초) 안에 ACK가 없으면 유실 처리
+
+
+# ==================== 히스토그램 ====================
+class LatencyHistogram(object):
+    """
+    지연 시간 히스토그램 (1ms 구간)
+
+    사용법:
+        hist = LatencyHistogram()
+        hist.add(12.3)
+        hist.percentile(95)
+    """
+
+    def __init__(self, bin_ms=BIN_MS, max_ms=MAX_MS):
+        self.bin_ms = bin_ms
+        self.counts = [0] * (int(max_ms / bin_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        """측정값 1개 추가 (ms)"""
+        index = min(max(int(ms / self.bin_ms), 0), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """
+        백분위 값 (ms, 구간 윗값 기준이라 최대 bin_ms 만큼 크게 나옴)
+
+        Returns:
+            float: 값 (측정값이 없으면 0.0)
+        """
+        if self.count == 0:
+            return 0.0
+        target = self.count * p / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min((index + 1) * self.bin_ms, self.max)
+        return self.max
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'count', 'mean', 'p50', 'p95', 'max'} (ms)
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'max': self.max
+        }
+
+
+# ==================== 명령 지연 측정 ====================
+class LatencyTracker(object):
+    """
+    명령 순번별 지연 시간 측정
+
+    사용법:
+        tracker = LatencyTracker()
+        link = ArduinoLink(arduino, tracker)           # 전송할 때 tracker.sent 호출
+        reader = UltrasonicReader(arduino, mode, tracker)   # ACK 받으면 tracker.acked 호출
+        print(tracker.summary())
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}               # {seq: 전송 시각} - ACK 대기 중
+        self.rtt = LatencyHistogram()
+        self.firmware = LatencyHistogram()
+        self.lost = 0                   # ACK 없이 시간 초과/덮어쓴 명령 수
+        self.unknown = 0                # 보낸 기록이 없는 ACK 수
+
+    def sent(self, seq, stamp=None):
+        """
+        명령 전송 기록
+
+        Args:
+            seq (int): 명령 순번 (0~255)
+            stamp (float): 전송 시각 (None이면 time.monotonic)
+        """
+        stamp = time.monotonic() if stamp is None else stamp
+        with self.lock:
+            if seq in self.pending:
+                self.lost += 1          # 순번이 한 바퀴 돌 때까지 ACK가 없었음
+            self.pending[seq] = stamp
+
+    def acked(self, seq, rx_ms, act_ms, stamp=None):
+        """
+        ACK 수신 처리
+
+        Args:
+            seq (int): ACK한 명령 순번
+            rx_ms (int): 아두이노 명령 수신 시각 (millis)
+            act_ms (int): 아두이노 모터/서보 동작 완료 시각 (millis)
+            stamp (float): PC ACK 수신 시각 (None이면 time.monotonic)
+        """
+        stamp = time.monotonic() if stamp is None else stamp
+        with self.lock:
+            sent = self.pending.pop(seq, None)
+            if sent is None:
+                self.unknown += 1
+                return
+            # 같은 루프에서 덮어써서 ACK를 못 받은 이전 명령 정리
+            for old in [s for s, t in self.pending.items() if t < sent or stamp - t > PENDING_TIMEOUT]:
+                del self.pending[old]
+                self.lost += 1
+            self.rtt.add((stamp - sent) * 1000)
+            self.firmware.add((act_ms - rx_ms) & 0xFFFFFFFF)
+
+    def get_stats(self):
+        """
+        지연 시간 통계
+
+        Returns:
+            dict: {'rtt': {...}, 'firmware': {...}, 'lost', 'unknown', 'pending'}
+                  rtt/firmware = {'count', 'mean', 'p50', 'p95', 'max'} (ms)
+        """
+        with self.lock:
+            return {
+                'rtt': self.rtt.get_stats(),
+                'firmware': self.firmware.get_stats(),
+                'lost': self.lost,
+                'unknown': self.unknown,
+                'pending': len(self.pending)
+            }
+
+    def summary(self):
+        """상태 출력용 한 줄 요약"""
+        stats = self.get_stats()
+        rtt, firmware = stats['rtt'], stats['firmware']
+        return (f"왕복 p50 {rtt['p50']:.0f}ms / p95 {rtt['p95']:.0f}ms / 최대 {rtt['max']:.0f}ms, "
+                f"아두이노 처리 p50 {firmware['p50']:.0f}ms / 최대 {firmware['max']:.0f}ms "
+                f"(ACK {rtt['count']}, 유실 {stats['lost']})")
@@ -0,0 +1,274 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: ports.py
+  시리얼 포트 자동 검색 모듈 (아두이노 / 라이다)
+
+  기능:
+  1) 연결된 시리얼 포트 목록에서 USB VID/PID로 후보 선택
+     - 아두이노 정품 (2341), CH340 호환 보드 (1A86:7523) → 아두이노 먼저 확인
+     - CP210x (10C4:EA60, RPLidar 어댑터) → 라이다 먼저 확인
+     - FTDI 등 알 수 없는 USB 시리얼 → 둘 다 확인
+  2) 후보 포트를 동시에 확인 (포트마다 스레드 1개)
+     - 아두이노: 포트를 열면 보드가 리셋되고 "Arduino Ready!" 배너 (또는 센서 줄) 수신
+     - 라이다: RPLidar get_info 응답
+     - 아두이노 확인을 먼저 함 (라이다 명령 바이트가 아두이노에 명령 문자로 들어가지 않게)
+  3) 찾은 결과를 캐시 파일에 저장 → 다음 실행에서는 같은 장치(VID/PID/시리얼 번호)면 확인 없이 사용
+     (Windows COM 번호, Linux ttyUSB 번호가 바뀌어도 장치로 찾음)
+
+  설정 (config.py):
+    ARDUINO_PORT / LIDAR_PORT = 'auto' 이면 자동 검색, 포트 이름이면 그대로 사용
+
+  실행 방법 (연결된 장치 확인):
+    python modules/vehicle/ports.py            # 캐시 사용
+    python modules/vehicle/ports.py --rescan   # 캐시 무시하고 다시 검색
+-------------------------------------------------------------------
+"""
+
+import sys
+import os
+# 프로젝트 루트 디렉토리를 파이썬 경로에 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+from serial.tools import list_ports
+
+from modules.vehicle.ultrasonic import parse_line
+
+AUTO = 'auto'
+ROLES = ('arduino', 'lidar')
+ARDUINO_BANNER = "Arduino Ready!"
+ARDUINO_TIMEOUT = 3.0       # 리셋 후 배너까지 대기 (부트로더 약 1.5초 + setup)
+LIDAR_TIMEOUT = 1.0         # get_info 응답 대기
+CACHE_VERSION = 1
+
+# USB (VID, PID) → 먼저 확인할 장치 (PID None = 같은 VID 전부)
+KNOWN_USB = {
+    (0x2341, None): 'arduino',      # Arduino 정품 (Uno, Mega 2560 ...)
+    (0x2A03, None): 'arduino',      # Arduino.org
+    (0x1A86, 0x7523): 'arduino',    # CH340 (호환 보드)
+    (0x10C4, 0xEA60): 'lidar',      # CP210x (RPLidar USB 어댑터)
+    (0x0403, 0x6001): None,         # FTDI (둘 다 가능)
+}
+
+resolved = None     # 이번 실행에서 찾은 결과 {'arduino': 포트, 'lidar': 포트}
+
+
+# ==================== 후보 포트 ====================
+def usb_hint(port):
+    """
+    포트 VID/PID → 먼저 확인할 장치
+
+    Returns:
+        tuple: (알려진 장치인지, 'arduino' / 'lidar' / None)
+    """
+    for (vid, pid), role in KNOWN_USB.items():
+        if port.vid == vid and pid in (None, port.pid):
+            return True, role
+    return False, None
+
+
+def list_candidates():
+    """
+    확인할 포트 목록 (알려진 VID/PID 먼저, USB가 아닌 포트는 제외)
+
+    Returns:
+        list: [(list_ports 포트 정보, 먼저 확인할 장치)]
+    """
+    known, unknown = [], []
+    for port in list_ports.comports():
+        if port.vid is None:
+            continue            # 보드 내장 시리얼 (/dev/ttyS0, COM1 등)
+        is_known, hint = usb_hint(port)
+        (known if is_known else unknown).append((port, hint))
+    return known + unknown
+
+
+def port_identity(port):
+    """캐시 비교용 장치 정보 (포트 이름은 바뀔 수 있으므로 VID/PID/시리얼 번호)"""
+    return {'vid': port.vid, 'pid': port.pid, 'serial_number': port.serial_number,
+            'location': port.location}
+
+
+# ==================== 장치 확인 ====================
+def probe_arduino(device, baudrate, timeout=ARDUINO_TIMEOUT):
+    """
+    아두이노인지 확인 (배너 또는 센서 줄 수신)
+
+    Returns:
+        bool: 아두이노면 True
+    """
+    try:
+        with serial.Serial(device, baudrate, timeout=0.1) as port:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                line = port.readline().decode('utf-8', 'replace').strip()
+                if ARDUINO_BANNER in line or (line and parse_line(line) is not None):
+                    return True
+    except (serial.SerialException, OSError):
+        pass
+    return False
+
+
+def probe_lidar(device, timeout=LIDAR_TIMEOUT):
+    """
+    RPLidar인지 확인 (get_info 응답)
+
+    Returns:
+        dict: get_info 결과 (model, firmware, hardware, serialnumber), 라이다가 아니면 None
+    """
+    from modules.lidar.rplidar import RPLidar, RPLidarException
+
+    lidar = None
+    try:
+        lidar = RPLidar(device, timeout=timeout)
+        lidar.clear_input()
+        return lidar.get_info()
+    except (RPLidarException, serial.SerialException, OSError):
+        return None
+    finally:
+        if lidar is not None:
+            try:
+                lidar.stop_motor()
+            except (serial.SerialException, OSError):
+                pass
+            lidar.disconnect()
+
+
+def probe(device, hint, baudrate, roles=ROLES):
+    """
+    포트 1개 확인 (hint 장치 먼저)
+
+    Returns:
+        str: 'arduino', 'lidar' 또는 None
+    """
+    order = sorted(roles, key=lambda role: role != hint)
+    # 라이다 명령을 아두이노에 보내지 않도록 hint가 없으면 아두이노 먼저
+    if hint is None and 'arduino' in order:
+        order.remove('arduino')
+        order.insert(0, 'arduino')
+    for role in order:
+        if role == 'arduino' and probe_arduino(device, baudrate):
+            return role
+        if role == 'lidar' and probe_lidar(device) is not None:
+            return role
+    return None
+
+
+# ==================== 캐시 ====================
+def load_cache(path):
+    """캐시 파일 → {'arduino': 장치 정보, ...} (없거나 버전이 다르면 빈 딕셔너리)"""
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('devices', {})
+
+
+def save_cache(path, devices):
+    """찾은 장치 정보 저장"""
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'devices': devices,
+                   'saved': time.strftime('%Y-%m-%d %H:%M:%S')}, f, indent=2)
+
+
+def match_cache(cached, candidates):
+    """
+    캐시한 장치가 지금도 연결돼 있으면 포트 이름
+
+    Returns:
+        dict: {'arduino': 포트, ...} (찾은 장치만)
+    """
+    found = {}
+    for role, identity in cached.items():
+        identity = {key: value for key, value in identity.items() if key != 'device'}
+        for port, _ in candidates:
+            if port_identity(port) == identity and port.device not in found.values():
+                found[role] = port.device
+                break
+    return found
+
+
+# ==================== 검색 ====================
+def discover(baudrate=115200, cache_path=None, rescan=False):
+    """
+    아두이노 / 라이다 포트 찾기
+
+    Args:
+        baudrate (int): 아두이노 통신 속도 (배너 확인용)
+        cache_path (str): 캐시 파일 경로 (None이면 캐시 사용 안 함)
+        rescan (bool): True면 캐시 무시하고 모든 후보 확인
+
+    Returns:
+        dict: {'arduino': 포트 또는 None, 'lidar': 포트 또는 None}
+    """
+    candidates = list_candidates()
+    found = {} if rescan else match_cache(load_cache(cache_path), candidates)
+
+    missing = [role for role in ROLES if role not in found]
+    pending = [(port, hint) for port, hint in candidates if port.device not in found.values()]
+    if missing and pending:
+        # 포트마다 스레드 1개 (아두이노 배너 대기 시간이 포트 수만큼 늘어나지 않게)
+        with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="port-probe") as executor:
+            results = list(executor.map(lambda item: probe(item[0].device, item[1], baudrate, missing),
+                                        pending))
+        for (port, _), role in zip(pending, results):
+            if role is not None and role not in found:
+                found[role] = port.device
+
+    ports = {port.device: port for port, _ in candidates}
+    devices = {role: dict(port_identity(ports[device]), device=device) for role, device in found.items()}
+    if devices:
+        save_cache(cache_path, devices)
+    return {role: found.get(role) for role in ROLES}
+
+
+def resolve(role, setting, baudrate=115200, cache_path=None):
+    """
+    설정 값 → 실제 포트 이름 ('auto'면 자동 검색, 한 번 찾으면 이번 실행 동안 재사용)
+
+    Args:
+        role (str): 'arduino' 또는 'lidar'
+        setting (str): config.ARDUINO_PORT / config.LIDAR_PORT
+
+    Returns:
+        str: 포트 이름, 찾지 못하면 None
+    """
+    global resolved
+
+    if setting != AUTO:
+        return setting
+    if resolved is None or resolved.get(role) is None:
+        resolved = discover(baudrate, cache_path)
+    return resolved[role]
+
+
+# ==================== 단독 실행 ====================
+if __name__ == "__main__":
+    import argparse
+    import config
+
+    parser = argparse.ArgumentParser(description="아두이노 / 라이다 시리얼 포트 자동 검색")
+    parser.add_argument('--rescan', action='store_true', help="캐시 무시하고 다시 검색")
+    args = parser.parse_args()
+
+    print("연결된 USB 시리얼 포트:")
+    for port, hint in list_candidates():
+        print(f"  {port.device}: {port.vid:04X}:{port.pid:04X} {port.description} (먼저 확인: {hint})")
+
+    start = time.monotonic()
+    result = discover(config.BAUDRATE, config.PORT_CACHE_FILE, args.rescan)
+    print(f"\n검색 결과 ({time.monotonic() - start:.1f}초):")
+    for role, device in result.items():
+        print(f"  {role}: {device or '찾지 못함'}")
@@ -0,0 +1,408 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: protocol.py
+  아두이노 바이너리 프레임 통신 모듈
+
+  기능:
+  1) 바이너리 프레임 인코딩 / 디코딩 (CRC16 검사, 깨진 프레임 재동기화)
+  2) 통신 방식 협상 (handshake)
+     - 바이너리 지원 펌웨어: HELLO에 HELLO_ACK로 응답 → 바이너리 모드
+     - 구버전 펌웨어: 응답 없음 → 텍스트 모드 ("F:25,..." 줄 / 명령 문자 1개)
+  3) 모드에 맞게 명령 전송 (ArduinoLink)
+
+  프레임 형식 (firmware/motor_control/motor_control.ino와 동일):
+    [0xAA][0x55][type][seq][len][payload (len 바이트)][CRC16 하위][CRC16 상위]
+    CRC16-CCITT (초기값 0xFFFF, 다항식 0x1021), type ~ payload 범위
+
+  메시지 종류:
+    PC → 아두이노: HELLO (버전 1바이트), COMMAND (명령 문자 1바이트),
+                   DRIVE (int16 PWM -255~255 + uint8 서보 각도), HEARTBEAT (내용 없음),
+                   PING (내용 없음, 시계 동기화),
+                   SENSOR_SET (측정할 센서 번호 1~6바이트, 측정 순서 = 우선순위)
+    아두이노 → PC: HELLO_ACK (버전 1바이트),
+                   SENSORS (uint16 x 6, cm, 리틀 엔디언 + 측정 millis uint32,
+                            측정하지 않은 센서는 0xFFFF),
+                   ACK (명령 seq uint8 + 수신 millis uint32 + 동작 millis uint32),
+                   PONG (PING seq uint8 + 수신 millis uint32 + 전송 millis uint32)
+
+  명령 순번 (ACK 요청):
+    바이너리 모드: COMMAND / DRIVE 프레임의 seq (항상 ACK)
+    텍스트 모드  : "C:<명령>,N:<seq>" / "V:<pwm>,S:<deg>,N:<seq>" 줄 → "A:<seq>,<수신 ms>,<동작 ms>"
+
+  시계 동기화 (clock_sync.py):
+    텍스트 모드  : "P:<seq>" → "Q:<seq>,<수신 ms>,<전송 ms>"
+    센서 줄 끝에 측정 millis ",T:<ms>"
+
+  측정 센서 선택:
+    텍스트 모드  : "U:<센서 번호들>" (예: "U:012" = F, FL, FR 순서) → 센서 줄에 측정한 센서만 포함
+-------------------------------------------------------------------
+"""
+
+import time
+import struct
+import threading
+
+# ==================== 프레임 상수 ====================
+SYNC = b'\xaa\x55'
+HEADER_SIZE = 5             # sync 2 + type + seq + len
+CRC_SIZE = 2
+MAX_PAYLOAD = 32
+PROTOCOL_VERSION = 1
+
+# 메시지 종류 (상위 비트 1 = 아두이노 → PC)
+MSG_HELLO = 0x01
+MSG_COMMAND = 0x02
+MSG_DRIVE = 0x03
+MSG_HEARTBEAT = 0x04
+MSG_PING = 0x05
+MSG_SENSOR_SET = 0x06
+HEARTBEAT_CHAR = b'H'       # 텍스트 모드 하트비트 (명령은 바꾸지 않음)
+MSG_HELLO_ACK = 0x81
+MSG_SENSORS = 0x82
+MSG_ACK = 0x83
+MSG_PONG = 0x84
+
+SENSOR_FORMAT = '<6H'       # F, FL, FR, R, RL, RR (cm)
+SENSOR_TIME_FORMAT = '<6HI' # + 측정 millis
+NOT_MEASURED = 0xFFFF       # 측정 센서 선택에서 빠진 센서
+SENSOR_KEYS = ('F', 'FL', 'FR', 'R', 'RL', 'RR')
+DRIVE_FORMAT = '<hB'        # PWM (음수 = 후진), 서보 각도
+ACK_FORMAT = '<BII'         # 명령 seq, 수신 millis, 동작 millis
+PONG_FORMAT = '<BII'        # PING seq, 수신 millis, 전송 millis
+
+MODE_TEXT = 'text'
+MODE_BINARY = 'binary'
+
+
+# ==================== CRC16 ====================
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+CRC_TABLE = _crc_table()
+
+
+def crc16(data, crc=0xFFFF):
+    """CRC16-CCITT (0xFFFF, 0x1021)"""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+# ==================== 인코딩 / 디코딩 ====================
+def encode(msg_type, seq, payload=b''):
+    """
+    프레임 1개 생성
+
+    Args:
+        msg_type (int): 메시지 종류 (MSG_*)
+        seq (int): 순번 (0~255)
+        payload (bytes): 내용 (MAX_PAYLOAD 바이트 이하)
+
+    Returns:
+        bytes: 전송할 프레임
+    """
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload가 너무 깁니다: {len(payload)} > {MAX_PAYLOAD}")
+    body = bytes((msg_type, seq & 0xFF, len(payload))) + bytes(payload)
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+def decode_sensors(payload):
+    """SENSORS payload → {'F': 25, ..., 'T': 측정 millis} (cm, 측정한 센서만, 'T'는 측정 시각이 있을 때만)"""
+    if len(payload) == struct.calcsize(SENSOR_TIME_FORMAT):
+        values = struct.unpack(SENSOR_TIME_FORMAT, payload)
+        reading = dict(zip(SENSOR_KEYS + ('T',), values))
+    else:
+        reading = dict(zip(SENSOR_KEYS, struct.unpack(SENSOR_FORMAT, payload)))
+    return {key: value for key, value in reading.items() if key == 'T' or value != NOT_MEASURED}
+
+
+def decode_ack(payload):
+    """ACK payload → (seq, 수신 ms, 동작 ms)"""
+    return struct.unpack(ACK_FORMAT, payload)
+
+
+def decode_pong(payload):
+    """PONG payload → (seq, 수신 ms, 전송 ms)"""
+    return struct.unpack(PONG_FORMAT, payload)
+
+
+def parse_reply_line(line, prefix):
+    """
+    텍스트 응답 줄 파싱 ("A:<seq>,<ms>,<ms>" / "Q:<seq>,<ms>,<ms>")
+
+    Args:
+        line (str): 받은 줄
+        prefix (str): 'A:' (ACK) 또는 'Q:' (PONG)
+
+    Returns:
+        tuple: (seq, ms, ms), 해당 줄이 아니면 None
+    """
+    if not line.startswith(prefix):
+        return None
+    try:
+        seq, first_ms, second_ms = (int(value) for value in line[len(prefix):].split(','))
+    except ValueError:
+        return None
+    return seq, first_ms, second_ms
+
+
+class FrameDecoder(object):
+    """
+    바이트 스트림 → 프레임 디코더
+
+    사용법:
+        decoder = FrameDecoder()
+        for msg_type, seq, payload in decoder.feed(port.read(n)):
+            ...
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.frames = 0             # 정상 프레임 수
+        self.crc_errors = 0         # CRC 불일치 프레임 수
+        self.skipped_bytes = 0      # 동기화하면서 버린 바이트 수
+
+    def feed(self, data):
+        """
+        받은 바이트 추가 후 완성된 프레임 모두 반환
+
+        Returns:
+            list: [(msg_type, seq, payload), ...]
+        """
+        self.buffer += data
+        frames = []
+
+        while True:
+            start = self.buffer.find(SYNC)
+            if start < 0:
+                # sync 첫 바이트로 끝나면 다음 조각과 이어질 수 있으므로 남김
+                keep = 1 if self.buffer.endswith(SYNC[:1]) else 0
+                self.skipped_bytes += len(self.buffer) - keep
+                del self.buffer[:len(self.buffer) - keep]
+                break
+            if start > 0:
+                self.skipped_bytes += start
+                del self.buffer[:start]
+
+            if len(self.buffer) < HEADER_SIZE:
+                break
+            length = self.buffer[4]
+            if length > MAX_PAYLOAD:
+                # 길이가 말이 안 되면 가짜 sync → 1바이트 버리고 다시 검색
+                self.skipped_bytes += 1
+                del self.buffer[:1]
+                continue
+
+            total = HEADER_SIZE + length + CRC_SIZE
+            if len(self.buffer) < total:
+                break
+
+            body = bytes(self.buffer[2:HEADER_SIZE + length])
+            (crc,) = struct.unpack_from('<H', self.buffer, HEADER_SIZE + length)
+            if crc != crc16(body):
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                del self.buffer[:1]
+                continue
+
+            del self.buffer[:total]
+            self.frames += 1
+            frames.append((body[0], body[1], body[3:]))
+
+        return frames
+
+
+# ==================== 아두이노 연결 ====================
+class ArduinoLink(object):
+    """
+    아두이노 시리얼 연결 (모드별 명령 전송 + 방식 협상)
+
+    사용법:
+        link = ArduinoLink(arduino)
+        link.handshake('auto')          # 'auto' / 'binary' / 'text'
+        link.send_command('F')
+    """
+
+    def __init__(self, port, tracker=None, text_ack=False):
+        """
+        Args:
+            port: 아두이노 시리얼 포트 객체 (libARDUINO.init 반환값)
+            tracker: latency.LatencyTracker (None이면 지연 측정 안 함)
+            text_ack (bool): 텍스트 모드에서도 순번 붙인 명령 줄 / PING / 센서 선택 사용 (구버전 펌웨어는 False)
+        """
+        self.port = port
+        self.mode = MODE_TEXT
+        self.tx_seq = 0
+        self.tracker = tracker
+        self.text_ack = text_ack
+        self.lock = threading.Lock()    # 여러 스레드에서 보내도 프레임이 섞이지 않게
+
+    def next_seq(self):
+        self.tx_seq = (self.tx_seq + 1) & 0xFF
+        return self.tx_seq
+
+    def write_frame(self, msg_type, payload=b'', track=False):
+        """바이너리 프레임 전송 (사용한 seq 반환, track이면 ACK 지연 측정)"""
+        with self.lock:
+            seq = self.next_seq()
+            if track and self.tracker is not None:
+                self.tracker.sent(seq)
+            self.port.write(encode(msg_type, seq, payload))
+        return seq
+
+    def write_line(self, line):
+        """
+        텍스트 명령 줄 전송 (지연 측정 중이면 ",N:<seq>" 추가)
+
+        Returns:
+            int: 사용한 seq (순번 없이 보냈으면 None)
+        """
+        with self.lock:
+            seq = None
+            if self.tracker is not None and self.text_ack:
+                seq = self.next_seq()
+                self.tracker.sent(seq)
+                line = f"{line},N:{seq}"
+            self.port.write(f"{line}\n".encode())
+        return seq
+
+    def send_command(self, command):
+        """
+        모터 명령 문자 전송 ('F', 'B', 'L', 'R', 'l', 'r', 'S')
+
+        바이너리 모드: COMMAND 프레임, 텍스트 모드: 문자 1바이트 (지연 측정 중이면 "C:<명령>,N:<seq>")
+        """
+        if self.mode == MODE_BINARY:
+            self.write_frame(MSG_COMMAND, command.encode(), track=True)
+        elif self.tracker is not None and self.text_ack:
+            self.write_line(f"C:{command}")
+        else:
+            with self.lock:
+                self.port.write(command.encode())
+
+    def send_drive(self, pwm, angle):
+        """
+        연속 속도/조향 명령 전송
+
+        Args:
+            pwm (int): 속도 (-255~255, 음수 = 후진)
+            angle (int): 서보 각도 (도)
+
+        바이너리 모드: DRIVE 프레임, 텍스트 모드: "V:<pwm>,S:<deg>\n"
+        """
+        if self.mode == MODE_BINARY:
+            self.write_frame(MSG_DRIVE, struct.pack(DRIVE_FORMAT, pwm, angle), track=True)
+        else:
+            self.write_line(f"V:{pwm},S:{angle}")
+
+    def send_heartbeat(self):
+        """
+        하트비트 전송 (아두이노 워치독 시간 초기화, 명령은 그대로)
+
+        바이너리 모드: HEARTBEAT 프레임, 텍스트 모드: 'H' 1바이트 (text_ack일 때만)
+        텍스트 모드 협상 = HELLO에 응답하지 않은 펌웨어 → 구버전이면 'H'를 모르는 명령으로 처리해서 정지하므로
+        새 펌웨어로 확인된 경우(text_ack)에만 보냄
+
+        Returns:
+            bool: 보냈으면 True
+        """
+        if self.mode == MODE_BINARY:
+            self.write_frame(MSG_HEARTBEAT)
+            return True
+        if not self.text_ack:
+            return False
+        with self.lock:
+            self.port.write(HEARTBEAT_CHAR)
+        return True
+
+    def send_ping(self, clock):
+        """
+        시계 동기화 PING 전송 (clock_sync.ClockSync에 전송 시각 기록)
+
+        바이너리 모드: PING 프레임, 텍스트 모드: "P:<seq>" (text_ack일 때만)
+
+        Returns:
+            bool: 보냈으면 True
+        """
+        if self.mode == MODE_BINARY:
+            with self.lock:
+                seq = self.next_seq()
+                clock.sent(seq)
+                self.port.write(encode(MSG_PING, seq))
+            return True
+        if not self.text_ack:
+            return False
+        with self.lock:
+            seq = self.next_seq()
+            clock.sent(seq)
+            self.port.write(f"P:{seq}\n".encode())
+        return True
+
+    def send_sensor_set(self, keys):
+        """
+        측정할 초음파 센서 선택 (아두이노는 이 센서만 이 순서대로 측정)
+
+        Args:
+            keys (tuple): 센서 이름 (예: ('F', 'FL', 'FR'), 앞쪽이 우선순위 높음)
+
+        바이너리 모드: SENSOR_SET 프레임, 텍스트 모드: "U:<센서 번호들>" (text_ack일 때만)
+
+        Returns:
+            bool: 보냈으면 True
+        """
+        indices = bytes(SENSOR_KEYS.index(key) for key in keys)
+        if self.mode == MODE_BINARY:
+            self.write_frame(MSG_SENSOR_SET, indices)
+            return True
+        if not self.text_ack:
+            return False
+        with self.lock:
+            self.port.write(("U:" + "".join(str(index) for index in indices) + "\n").encode())
+        return True
+
+    def handshake(self, protocol='auto', timeout=0.5, retries=3):
+        """
+        통신 방식 협상 (수신 스레드 시작 전에 호출)
+
+        Args:
+            protocol (str): 'auto' = 바이너리 시도 후 실패하면 텍스트
+                            'binary' = 바이너리 필수 (실패 시 예외)
+                            'text' = 협상 없이 텍스트
+            timeout (float): 시도 1회당 응답 대기 시간 (초)
+            retries (int): 시도 횟수
+
+        Returns:
+            str: 결정된 모드 ('binary' 또는 'text')
+        """
+        self.mode = MODE_TEXT
+        if protocol == MODE_TEXT:
+            return self.mode
+
+        decoder = FrameDecoder()
+        old_timeout = self.port.timeout
+        self.port.timeout = 0.05
+        try:
+            self.port.reset_input_buffer()
+            for _ in range(retries):
+                self.write_frame(MSG_HELLO, bytes((PROTOCOL_VERSION,)))
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    data = self.port.read(self.port.in_waiting or 1)
+                    for msg_type, seq, payload in decoder.feed(data):
+                        if msg_type == MSG_HELLO_ACK and payload[:1] == bytes((PROTOCOL_VERSION,)):
+                            self.mode = MODE_BINARY
+                            return self.mode
+        finally:
+            self.port.timeout = old_timeout
+
+        if protocol == MODE_BINARY:
+            raise RuntimeError("아두이노가 바이너리 프로토콜에 응답하지 않습니다 (펌웨어 버전 확인)")
+        return self.mode
@@ -20,23 +20,35 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 from utils import Function_Library as fl
 from modules.lidar.Lib_LiDAR import libLidar
+from modules.vision.traffic_light import TrafficLightDetector
+from modules.vision import calibration
+from modules.vision.lane_tracker import LaneTracker
+from modules.vision.lane_filter import LaneFilter
+from modules.vehicle.ultrasonic import UltrasonicReader
+from modules.vehicle.ultrasonic_state import UltrasonicState
+from modules.vehicle.protocol import ArduinoLink
+from modules.vehicle.latency import LatencyTracker
+from modules.vehicle.clock_sync import ClockSync
+from modules.vehicle import ports
+import cv2
+import math
 import config
 
 # ==================== 전역 변수 (센서 객체) ====================
 camera = None
+rear_camera = None  # 후방 카메라 인식용 (전방 인식 상태와 분리)
 lidar = None
 arduino = None
-ultrasonic_distance = 0  # 구버전 호환용 (단일 값)
-
-# 초음파 센서 6개 데이터 저장 딕셔너리
-ultrasonic_data = {
-    'F': 0,      # Front (전방)
-    'FL': 0,     # Front-Left (좌전방)
-    'FR': 0,     # Front-Right (우전방)
-    'R': 0,      # Rear (후방)
-    'RL': 0,     # Rear-Left (좌후방)
-    'RR': 0      # Rear-Right (우후방)
-}
+arduino_link = None         # 아두이노 통신 방식 (바이너리/텍스트) + 명령 전송
+ultrasonic_reader = None    # 초음파 백그라운드 수신 스레드
+ultrasonic_state = None     # 초음파 센서 상태 (중앙값 필터, 센서별 측정 시각)
+latency_tracker = None      # 명령 → 동작 지연 측정 (config.COMMAND_ACK)
+clock_sync = None           # 아두이노 millis ↔ PC 시각 동기화 (config.CLOCK_SYNC_ENABLE)
+traffic_light_detector = None
+bev = None          # 전방 카메라 BEV 변환기 (캘리브레이션 파일이 있을 때만)
+lane_tracker = None
+lane_filter = None  # 차선 상태 칼만 필터 (get_lane_direction)
+ultrasonic_active = None    # 아두이노에 마지막으로 보낸 측정 센서 선택 (None = 전체, 기본값)
 
 # ==================== 초기화 함수 ====================
 def initialize():
@@ -46,7 +58,7 @@ def initialize():
     Returns:
         ch0, ch1: 카메라 채널 객체
     """
-    global camera, lidar, arduino
+    global camera, rear_camera, lidar, arduino, arduino_link, ultrasonic_reader, ultrasonic_state, latency_tracker, clock_sync, traffic_light_detector, bev, lane_tracker, lane_filter
 
     print("=" * 50)
     print("자율주행 시스템 초기화 중...")
@@ -56,18 +68,54 @@ def initialize():
     print("\n[1/3] 카메라 초기화...")
     camera = fl.libCAMERA()
     ch0, ch1 = camera.initial_setting(capnum=config.CAMERA_COUNT)
+    rear_camera = fl.libCAMERA()
+    traffic_light_detector = make_traffic_light_detector(camera)
+
+    # 전방 카메라 캘리브레이션 (BEV 맵은 캐시 파일 재사용)
+    frame_size = get_frame_shape(ch0)[1::-1]
+    bev = calibration.load_bev(config.CALIBRATION_DIR, 0, frame_size,
+                               config.BEV_OUTPUT_SIZE, config.CACHE_DIR)
+    if bev is None:
+        print(f"⚠️  캘리브레이션 없음 ({frame_size[0]}x{frame_size[1]}) - utils/start_lib.py로 설정하세요")
+    lane_tracker = LaneTracker(
+        mm_per_pixel=config.BEV_MM_PER_PIXEL,
+        lane_width_mm=config.ROAD_WIDTH,
+        threshold=config.LANE_TRACK_THRESHOLD,
+        margin=config.LANE_TRACK_MARGIN,
+        min_pixels=config.LANE_TRACK_MIN_PIXELS
+    )
+    lane_filter = LaneFilter(
+        step=config.LANE_FILTER_STEP,
+        max_misses=config.LANE_FILTER_MAX_MISSES
+    )
     print("✓ 카메라 초기화 완료")
 
     # 2. 라이다 초기화
     print("\n[2/3] 라이다 초기화...")
-    lidar = libLidar(config.LIDAR_PORT)
+    lidar_port = ports.resolve('lidar', config.LIDAR_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if lidar_port is None:
+        raise RuntimeError("라이다 포트를 찾지 못했습니다 (config.LIDAR_PORT 직접 설정)")
+    print(f"  포트: {lidar_port}")
+    lidar = libLidar(lidar_port)
     lidar.init()
     print("✓ 라이다 초기화 완료")
 
     # 3. 아두이노 초기화
     print("\n[3/3] 아두이노 초기화...")
     arduino_lib = fl.libARDUINO()
-    arduino = arduino_lib.init(config.ARDUINO_PORT, config.BAUDRATE)
+    arduino_port = ports.resolve('arduino', config.ARDUINO_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if arduino_port is None:
+        raise RuntimeError("아두이노 포트를 찾지 못했습니다 (config.ARDUINO_PORT 직접 설정)")
+    print(f"  포트: {arduino_port}")
+    arduino = arduino_lib.init(arduino_port, config.BAUDRATE)
+    latency_tracker = LatencyTracker() if config.COMMAND_ACK else None
+    arduino_link = ArduinoLink(arduino, latency_tracker, config.COMMAND_ACK_TEXT)
+    mode = arduino_link.handshake(config.ARDUINO_PROTOCOL)
+    print(f"  통신 방식: {mode} ({config.BAUDRATE} baud)")
+    clock_sync = ClockSync(config.CLOCK_SYNC_INTERVAL) if config.CLOCK_SYNC_ENABLE else None
+    ultrasonic_state = UltrasonicState(config.ULTRASONIC_FILTER_WINDOW, config.ULTRASONIC_MAX_AGE)
+    ultrasonic_reader = UltrasonicReader(arduino, mode, latency_tracker, clock_sync, ultrasonic_state)
+    ultrasonic_reader.start()
     print("✓ 아두이노 초기화 완료")
 
     print("\n" + "=" * 50)
@@ -77,33 +125,328 @@ def initialize():
     return ch0, ch1
 
 
+def get_frame_shape(channel):
+    """
+    카메라 프레임 크기 (실제로 1장 읽어서 확인)
+
+    드라이버가 CAP_PROP 값을 실제 프레임과 다르게 (또는 0으로) 알려주는 경우가 있어서
+    프레임을 읽지 못할 때만 CAP_PROP 값 사용
+
+    Args:
+        channel: 카메라 채널 객체
+
+    Returns:
+        tuple: (row, col, dim) - OpenCV 프레임 shape과 같은 순서 (모르면 0)
+    """
+    ret, frame = channel.read()
+    if ret and frame is not None:
+        return frame.shape if frame.ndim == 3 else frame.shape + (1,)
+    return (int(channel.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(channel.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+
+
+def make_traffic_light_detector(light_camera):
+    """
+    config 설정으로 신호등 인식기 생성 (비전 작업 프로세스에서도 사용)
+
+    Args:
+        light_camera: libCAMERA 객체
+
+    Returns:
+        TrafficLightDetector: 신호등 인식기
+    """
+    if config.TRAFFIC_LIGHT_LABEL_MODE == 'lut':
+        light_camera.load_color_lut(cache_dir=config.CACHE_DIR)  # 신호등 색상 테이블 (캐시 파일 사용)
+    return TrafficLightDetector(
+        light_camera,
+        engine=config.TRAFFIC_LIGHT_ENGINE,
+        vote_frames=config.TRAFFIC_LIGHT_VOTE_FRAMES,
+        sample=config.TRAFFIC_LIGHT_SAMPLE,
+        label_mode=config.TRAFFIC_LIGHT_LABEL_MODE,
+        min_area=config.TRAFFIC_LIGHT_MIN_AREA,
+        max_area=config.TRAFFIC_LIGHT_MAX_AREA,
+        track_padding=config.TRAFFIC_LIGHT_TRACK_PADDING,
+        reacquire_frames=config.TRAFFIC_LIGHT_REACQUIRE_FRAMES
+    )
+
+
 # ==================== 카메라 센서 ====================
 def get_lane_direction(frame):
     """
     카메라로 차선 방향 감지
 
     Args:
-        frame: OpenCV 영상 프레임
+        frame: OpenCV 영상 프레임 또는 FrameContext (make_frame_context)
 
     Returns:
         int: FORWARD(0), LEFT(1), RIGHT(2) 또는 None
 
-    처리 과정:
+    처리 과정 (config.LANE_ENGINE = 'hough'):
         1) 그레이스케일 변환
         2) 히스토그램 평탄화
         3) Canny Edge 감지
         4) Hough Line Transform
         5) 차선 기울기 분석
+
+    처리 과정 (config.LANE_ENGINE = 'scanline'):
+        1) 설정한 가로줄 몇 개만 그레이스케일 변환
+        2) 가로 방향 밝기 변화로 차선 양쪽 경계 검색 (차선 폭 검사)
+        3) 차선 중심 직선 피팅 → 기울기 분석
+
+    차선 상태 필터 (config.LANE_FILTER_ENABLE = True):
+        - 인식 결과(기울기, 오프셋)를 칼만 필터로 보정해서 방향 결정
+        - 인식 실패 프레임은 예측값으로 방향 유지 (LANE_FILTER_MAX_MISSES 프레임까지)
+        - 추적 안정 시 hough 엔진은 아래쪽 ROI + 거친 해상도로 검색
+    """
+    direction, lane_center = detect_lane(camera, frame, lane_search_params())
+    return filter_lane(direction, lane_center)
+
+
+def get_lane_heading():
+    """
+    칼만 필터로 보정한 차선 기울기 (연속 조향 명령용)
+
+    Returns:
+        float: 위로 1픽셀당 가로 이동 픽셀 (오른쪽 +), 필터 미사용/추적 전이면 None
+    """
+    if not config.LANE_FILTER_ENABLE or lane_filter.x is None:
+        return None
+    return float(lane_filter.x[1])
+
+
+def lane_search_params():
+    """
+    이번 프레임 차선 인식 연산량 설정
+
+    Returns:
+        dict: {'roi': 검색 시작 높이 비율, 'rho': 픽셀, 'theta': 도}
+              칼만 필터 추적 안정 시 작은 ROI + 거친 Hough 해상도, 아니면 전체 영상 + 기본 해상도
+    """
+    if config.LANE_FILTER_ENABLE and lane_filter.confident():
+        return {'roi': config.LANE_FILTER_ROI,
+                'rho': config.LANE_FILTER_COARSE_RHO,
+                'theta': config.LANE_FILTER_COARSE_THETA}
+    return {'roi': 0.0, 'rho': 1, 'theta': 1}
+
+
+def lane_line_width(frame_width=None):
+    """
+    scanline 엔진 차선 폭 범위
+
+    Args:
+        frame_width (int): 원근 영상 가로 픽셀 (None이면 BEV 영상 기준)
+
+    Returns:
+        tuple: (최소, 최대) 픽셀
+               BEV: LANE_LINE_WIDTH mm / BEV_MM_PER_PIXEL 가로 값 x 허용 배율 (mm 크기가 일정)
+               원근 영상: LANE_SCAN_WIDTH를 해상도에 비례해서 조정 (줄마다 mm 크기가 달라서 규정 폭 사용 불가)
+    """
+    if frame_width is None:
+        pixels = config.LANE_LINE_WIDTH / config.BEV_MM_PER_PIXEL[0]
+        low, high = config.LANE_SCAN_WIDTH_TOLERANCE
+        return max(int(pixels * low), 1), int(math.ceil(pixels * high))
+    scale = frame_width / config.LANE_SCAN_REFERENCE_WIDTH
+    low, high = config.LANE_SCAN_WIDTH
+    return max(int(low * scale), 1), int(math.ceil(high * scale))
+
+
+def scanline_input(lane_camera, frame):
+    """
+    scanline 엔진 입력 영상 + 차선 폭 범위
+
+    캘리브레이션이 있으면 BEV 영상 (규정 차선 폭 mm를 그대로 픽셀로 변환 가능),
+    없으면 (후방 카메라, 비전 작업 프로세스 포함) 원근 영상 + 해상도 기준 픽셀 범위
+
+    Returns:
+        tuple: (영상 또는 FrameContext, (최소, 최대) 픽셀)
+    """
+    ctx = lane_camera.frame_context(frame)
+    if bev is not None and lane_camera is camera:
+        return get_bev_frame(ctx), lane_line_width()
+    return ctx, lane_line_width(ctx.img.shape[1])
+
+
+def detect_lane(lane_camera, frame, params):
+    """
+    차선 인식 1회 (필터 없음, 비전 작업 프로세스에서도 사용)
+
+    Args:
+        lane_camera: libCAMERA 객체
+        frame: OpenCV 영상 프레임 또는 FrameContext
+        params (dict): lane_search_params() 결과
+
+    Returns:
+        tuple: (방향 또는 None, lane_center (offset 또는 None, 기울기) 또는 None)
+    """
+    if config.LANE_ENGINE == 'scanline':
+        image, line_width = scanline_input(lane_camera, frame)
+        direction = lane_camera.scanline_detection(
+            image,
+            rows=config.LANE_SCAN_ROWS,
+            line_width=line_width,
+            threshold=config.LANE_SCAN_THRESHOLD,
+            print_enable=False
+        )
+    else:
+        direction = lane_camera.edge_detection(
+            frame,
+            width=config.LANE_WIDTH,
+            height=config.LANE_HEIGHT,
+            gap=config.LANE_GAP,
+            threshold=config.LANE_THRESHOLD,
+            samples=config.LANE_EDGE_SAMPLES,
+            roi=params['roi'],
+            resolution=(params['rho'], math.radians(params['theta'])),
+            print_enable=False
+        )
+    return direction, lane_camera.lane_center
+
+
+def new_lane_worker():
+    """비전 작업 프로세스용 차선 인식 상태 (detect_lane의 lane_camera)"""
+    return fl.libCAMERA()
+
+
+def new_traffic_light_worker():
+    """비전 작업 프로세스용 신호등 인식기 (detect_traffic_light의 detector)"""
+    return make_traffic_light_detector(fl.libCAMERA())
+
+
+def detect_traffic_light(detector, frame, params=None):
+    """비전 작업 프로세스용 신호등 인식 1회 (투표 포함) → 색상 또는 None"""
+    color, _ = detector.detect(frame)
+    return color
+
+
+def filter_lane(direction, lane_center):
+    """
+    차선 인식 결과를 칼만 필터로 보정해서 방향 결정
+
+    Args:
+        direction: detect_lane 방향 (필터 사용 안 하면 그대로 반환)
+        lane_center: detect_lane 측정값 (인식 실패면 None)
+
+    Returns:
+        int: FORWARD(0), LEFT(1), RIGHT(2) 또는 None
+    """
+    if not config.LANE_FILTER_ENABLE:
+        return direction
+
+    state = lane_filter.step(lane_center)
+    if state is None:
+        return None
+
+    heading = state[1]
+    if abs(heading) < fl.FORWARD_THRESHOLD:
+        return fl.FORWARD
+    return fl.RIGHT if heading > 0 else fl.LEFT
+
+
+def get_rear_lane_direction(frame):
     """
-    direction = camera.edge_detection(
-        frame,
-        width=config.LANE_WIDTH,
-        height=config.LANE_HEIGHT,
-        gap=config.LANE_GAP,
-        threshold=config.LANE_THRESHOLD,
+    후방 카메라로 차선 방향 감지 (후진/주차용)
+
+    Args:
+        frame: 후방 카메라 영상 프레임 또는 FrameContext
+
+    Returns:
+        int: FORWARD(0), LEFT(1), RIGHT(2) 또는 None (후방 카메라 영상 기준)
+
+    처리 과정:
+        scanline 엔진 (가로줄 몇 개만 검사) - 후방은 낮은 주기로 실행하므로 가벼운 엔진 사용
+    """
+    image, line_width = scanline_input(rear_camera, frame)
+    return rear_camera.scanline_detection(
+        image,
+        rows=config.LANE_SCAN_ROWS,
+        line_width=line_width,
+        threshold=config.LANE_SCAN_THRESHOLD,
         print_enable=False
     )
-    return direction
+
+
+def make_frame_context(frame):
+    """
+    프레임별 파생 영상 캐시 생성
+
+    같은 프레임을 여러 인식 함수에 넘길 때 그레이/HSV/색상 라벨/BEV 등
+    중간 결과를 한 번만 계산하고 공유
+
+    Args:
+        frame: OpenCV 영상 프레임
+
+    Returns:
+        FrameContext: 프레임 캐시 (이 모듈의 인식 함수 모두 frame 대신 사용 가능)
+    """
+    return fl.FrameContext(frame)
+
+
+def get_bev_frame(ctx):
+    """전방 카메라 BEV 영상 (프레임 캐시 공유: 차선 추적 + 정지선 검출 + scanline 엔진)"""
+    return ctx.product(("bev",), lambda: bev.warp(ctx.img))
+
+
+def get_bev_binary(ctx):
+    """BEV 영상 → 흰색 차선 이진 영상 (프레임 캐시 공유: 차선 추적 + 정지선 검출)"""
+    warped = get_bev_frame(ctx)
+    return ctx.product(("bev_binary", lane_tracker.threshold), lambda: lane_tracker.binarize(warped))
+
+
+def get_lane_state(frame):
+    """
+    BEV 슬라이딩 윈도우로 차선 상태 추적
+
+    Args:
+        frame: OpenCV 영상 프레임 (전방 카메라 원본) 또는 FrameContext
+
+    Returns:
+        dict: {'offset': mm, 'heading': rad, 'curvature': 1/m, ...}
+              캘리브레이션이 없거나 차선을 놓치면 None
+
+    처리 과정:
+        1) 캐시된 BEV remap 1회
+        2) 이전 차선 주변만 검색 (놓치면 히스토그램 + 슬라이딩 윈도우)
+        3) 2차 다항식 피팅 → 오프셋/방향 오차/곡률
+    """
+    if bev is None:
+        return None
+    ctx = camera.frame_context(frame)
+    binary = get_bev_binary(ctx)
+    return lane_tracker.update(ctx.products[("bev",)], binary)
+
+
+def get_crosswalk_distance(frame):
+    """
+    횡단보도(정지선)까지 거리 추정
+
+    Args:
+        frame: OpenCV 영상 프레임 (전방 카메라 원본) 또는 FrameContext
+
+    Returns:
+        int: 정지선까지 거리 (mm), 캘리브레이션이 없거나 못 찾으면 None
+
+    처리 과정:
+        1) BEV 이진 영상은 같은 FrameContext에서 get_lane_state(main.py 'lane_state', 매 프레임)가
+           먼저 만든 것을 재사용 (LANE_STATE_ENABLE = False면 여기서 BEV 변환 + 이진화)
+        2) 가로줄별 흰색 비율 (가로 투영) → 횡단보도 두께의 흰 띠 검색
+        3) 가장 가까운 띠의 아래쪽 줄 번호 → 거리 변환
+    """
+    if bev is None:
+        return None
+
+    binary = get_bev_binary(camera.frame_context(frame))
+
+    mm_y = config.BEV_MM_PER_PIXEL[1]
+    depth = config.CROSSWALK_DEPTH / mm_y
+    row = camera.crosswalk_detection(
+        None,
+        min_fill=config.CROSSWALK_MIN_FILL,
+        band=(max(int(depth * 0.5), 1), int(depth * 2) + 1),
+        binary=binary
+    )
+    if row is None:
+        return None
+
+    return int(config.BEV_BOTTOM_DISTANCE + (binary.shape[0] - 1 - row) * mm_y)
 
 
 def get_traffic_light(frame):
@@ -111,17 +454,21 @@ def get_traffic_light(frame):
     신호등 색상 감지
 
     Args:
-        frame: OpenCV 영상 프레임
+        frame: OpenCV 영상 프레임 또는 FrameContext
 
     Returns:
-        str: "RED", "GREEN", "YELLOW", "BLUE" 또는 None
+        str: "RED", "GREEN", "YELLOW" 또는 None
+             (최근 config.TRAFFIC_LIGHT_VOTE_FRAMES 프레임 투표 결과)
 
     처리 과정:
-        1) HSV 색상 필터링
-        2) Hough Circle Transform
-        3) 원 중심 주변 픽셀 색상 검증
+        1) 색상 라벨링 1회 (HSV 변환 또는 BGR 룩업 테이블)
+        2) config.TRAFFIC_LIGHT_ENGINE 엔진으로 신호등 후보 검색
+           - hough : 통합 색상 마스크에서 Hough Circle Transform 1회
+           - blob  : 연결 요소 + 면적/채움률/원형도 필터
+        3) 최근 프레임 투표
+        (한 번 찾으면 마지막 위치 주변만 검색, 주기적으로 전체 재검색)
     """
-    color = camera.object_detection(frame, sample=16, print_enable=False)
+    color, _ = traffic_light_detector.detect(frame)
     return color
 
 
@@ -181,58 +528,64 @@ def get_lidar_scanning():
 # ==================== 초음파 센서 ====================
 def read_ultrasonic():
     """
-    아두이노에서 6개 초음파 센서 거리 읽기
+    아두이노에서 받은 6개 초음파 센서 상태
+
+    Arduino 전송 형식: "F:25,FL:30,FR:28,R:50,RL:45,RR:48,T:123456"
+
+    Returns:
+        UltrasonicState: 센서 상태 (단위: cm)
+                         state.group_min('front') → (가장 가까운 거리, 센서 이름)
+                         state.get('F') → 센서 1개 값 (값 없음 = 0)
+
+    동작:
+        1) 수신 스레드(UltrasonicReader)가 시리얼 버퍼의 완성된 줄/프레임을 모두 읽어 상태에 반영
+        2) 여기서는 시리얼을 읽지 않음 (조회할 때 중앙값 필터 결과 + 오래된 값 제외)
+        3) 시계 동기화 PING 주기가 되면 PING 전송
+    """
+    if clock_sync is not None and clock_sync.due():
+        arduino_link.send_ping(clock_sync)
+
+    return ultrasonic_state
+
+
+def select_ultrasonic(keys, resend=False):
+    """
+    아두이노가 측정할 초음파 센서 선택 (바뀌었을 때만 전송)
 
-    Arduino 전송 형식: "F:25,FL:30,FR:28,R:50,RL:45,RR:48"
+    Args:
+        keys (tuple): 센서 이름 (앞쪽이 먼저 측정, 예: ('F', 'FL', 'FR'))
+        resend (bool): 바뀌지 않았어도 다시 전송 (하트비트마다 - 프레임 유실이나
+                       아두이노 리셋으로 보드가 다른 센서를 측정하고 있어도 다시 맞춤)
 
     Returns:
-        dict: 6개 센서 거리 딕셔너리 (단위: cm)
-              {'F': 25, 'FL': 30, 'FR': 28, 'R': 50, 'RL': 45, 'RR': 48}
-              데이터가 없으면 이전 값 반환
+        bool: 보냈으면 True
 
     동작:
-        1) 시리얼 포트에 데이터가 있는지 확인
-        2) 한 줄 읽기 (newline까지)
-        3) "key:value,key:value,..." 형식 파싱
-        4) 딕셔너리로 변환하여 전역 변수 업데이트
-        5) 구버전 호환 (단일 숫자만 오면 'F' 키에 저장)
-    """
-    global ultrasonic_data, ultrasonic_distance
-
-    # 시리얼 버퍼에 데이터가 있는지 확인
-    if arduino.in_waiting > 0:
-        try:
-            # 한 줄 읽기 (\n까지 읽고 디코딩)
-            line = arduino.readline().decode('utf-8').strip()
-
-            # 형식 1: "F:25,FL:30,..." (신규 6개 센서 형식)
-            if ':' in line and ',' in line:
-                # 쉼표로 분리: ["F:25", "FL:30", "FR:28", ...]
-                parts = line.split(',')
-
-                # 각 부분을 "key:value"로 분리하여 딕셔너리 생성
-                for part in parts:
-                    if ':' in part:  # 안전성 체크
-                        key, value = part.split(':')
-                        # 문자열을 정수로 변환하여 저장
-                        ultrasonic_data[key] = int(value)
-
-                # 구버전 호환: 전방 센서값을 단일 변수에도 저장
-                ultrasonic_distance = ultrasonic_data.get('F', 0)
-
-            # 형식 2: "123" (구버전 단일 숫자 - Exercise_1.ino 호환)
-            elif line.isdigit():
-                distance_value = int(line)
-                # 전방 센서로 간주
-                ultrasonic_data['F'] = distance_value
-                ultrasonic_distance = distance_value
-
-        except Exception as e:
-            # 파싱 오류 시 무시 (이전 값 유지)
-            pass
-
-    # 딕셔너리 반환 (6개 센서 데이터)
-    return ultrasonic_data
+        - 센서 수가 줄면 아두이노 loop가 짧아져서 선택한 센서 갱신 주기가 빨라짐
+          (센서 1개당 최대 30ms pulseIn 대기)
+        - 선택에서 빠진 센서는 ULTRASONIC_MAX_AGE가 지나면 값 없음으로 처리
+          (다시 선택하면 새 측정값부터 사용, 그동안 control.decide_action은 정지)
+    """
+    global ultrasonic_active
+
+    keys = tuple(keys)
+    if keys == ultrasonic_active and not resend:
+        return False
+    if not arduino_link.send_sensor_set(keys):
+        return False
+    ultrasonic_active = keys
+    return True
+
+
+def get_ultrasonic_sample():
+    """
+    초음파 최근 값 + 수신 정보
+
+    Returns:
+        tuple: (센서 딕셔너리 (cm), 측정 시각 (time.monotonic 기준, 시계 동기화 전이면 PC 수신 시각),
+                순번, 누적 dropped 수)
+    """
+    return ultrasonic_reader.snapshot()
 
 
 # ==================== 카메라 읽기 ====================
@@ -285,11 +638,13 @@ def cleanup():
 
     동작:
         1) 라이다 정지
-        2) 아두이노 포트 닫기
+        2) 초음파 수신 스레드 종료
+        3) 아두이노 포트 닫기
     """
     print("\n센서 시스템 종료 중...")
     try:
         lidar.stop()
+        ultrasonic_reader.stop()
         arduino.close()
     except:
         pass
@@ -0,0 +1,94 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: transmitter.py
+  모터 명령 전송 관리 모듈
+
+  기능:
+  1) 명령이 바뀌었을 때만 전송 (매 루프 같은 명령을 다시 보내지 않음)
+  2) 명령 변화와 관계없이 heartbeat 주기마다 하트비트 + 현재 명령 재전송
+     - 첫 명령과 함께 바로 하트비트 (워치독 시작)
+     - 아두이노 워치독: 하트비트를 한 번 받은 뒤로 WATCHDOG_MS 동안
+       아무 명령/하트비트가 없으면 모터 정지 (PC 멈춤, USB 끊김 대비)
+     - 연속 조향처럼 명령이 매 루프 바뀌어도 하트비트가 빠지지 않음
+     - 통신이 돌아오면 다음 하트비트의 명령으로 다시 주행
+  3) 전송/생략/하트비트 횟수 기록
+
+  명령 값:
+    명령 문자 ('F', 'S', ...) 또는 연속 속도/조향 (pwm, 서보 각도) - 비교 가능한 값이면 됨
+-------------------------------------------------------------------
+"""
+
+import time
+
+
+# ==================== 명령 전송 관리 ====================
+class CommandTransmitter(object):
+    """
+    변화 시에만 전송 + 하트비트
+
+    사용법:
+        tx = CommandTransmitter(control.transmit, control.transmit_heartbeat, heartbeat=0.2)
+        if tx.update(command):
+            print("명령 변경:", command)
+    """
+
+    def __init__(self, send, send_heartbeat, heartbeat=0.2):
+        """
+        Args:
+            send: 명령 값 1개를 전송하는 함수
+            send_heartbeat: 하트비트를 전송하는 함수 (인자: 현재 명령 값)
+            heartbeat (float): 하트비트 주기 (초, 0이면 하트비트 없음)
+                               아두이노 워치독 시간보다 충분히 짧아야 함
+        """
+        self.send = send
+        self.send_heartbeat = send_heartbeat
+        self.heartbeat = heartbeat
+
+        self.last_value = None      # 마지막으로 보낸 명령 값
+        self.last_heartbeat = None  # 마지막 하트비트 시각
+
+        self.sent = 0               # 명령 전송 횟수
+        self.suppressed = 0         # 바뀌지 않아서 생략한 횟수
+        self.heartbeats = 0         # 하트비트 전송 횟수
+
+    def update(self, value, force=False, now=None):
+        """
+        명령 값 처리
+
+        Args:
+            value: 이번 루프 명령 값
+            force (bool): 바뀌지 않았어도 전송 (긴급 정지)
+            now (float): 현재 시각 (None이면 time.monotonic)
+
+        Returns:
+            bool: 명령이 바뀌어서 전송했으면 True (하트비트만 보냈거나 생략이면 False)
+        """
+        now = time.monotonic() if now is None else now
+
+        changed = force or value != self.last_value
+        if changed:
+            self.send(value)
+            self.last_value = value
+            self.sent += 1
+        else:
+            self.suppressed += 1
+
+        # 명령이 계속 바뀌어도 주기마다 하트비트 (첫 명령 때 바로 보내서 워치독 시작)
+        if self.heartbeat > 0 and (self.last_heartbeat is None or now - self.last_heartbeat >= self.heartbeat):
+            self.send_heartbeat(value)
+            self.last_heartbeat = now
+            self.heartbeats += 1
+        return changed
+
+    def get_stats(self):
+        """
+        전송 통계
+
+        Returns:
+            dict: {'sent', 'suppressed', 'heartbeats'}
+        """
+        return {
+            'sent': self.sent,
+            'suppressed': self.suppressed,
+            'heartbeats': self.heartbeats
+        }
@@ -0,0 +1,239 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: ultrasonic.py
+  초음파 센서 백그라운드 수신 모듈
+
+  기능:
+  1) 별도 스레드에서 아두이노 시리얼 데이터를 계속 읽음
+     - 버퍼에 쌓인 완성된 줄을 모두 읽고 파싱
+     - 센서 상태(UltrasonicState)에 반영 (중앙값 필터, 센서별 측정 시각)
+     - 가장 최근 값만 공개 (제어 루프가 느려도 오래된 값으로 판단하지 않음)
+  2) 측정값마다 시각(time.monotonic 기준), 순번(seq) 기록
+     - 시계 동기화(ClockSync) 후: 아두이노 측정 millis를 PC 시각으로 변환한 실제 측정 시각
+     - 동기화 전 / 측정 시각이 없는 펌웨어: PC 수신 시각
+  3) 제어 루프가 읽기 전에 새 값으로 덮어쓴 줄 수(dropped), 파싱 오류 수 기록
+  4) snapshot()은 버퍼를 읽지 않고 필터 결과만 반환
+  5) 명령 ACK ("A:..." 줄 / ACK 프레임)는 지연 측정기(LatencyTracker)로 전달
+  6) PONG ("Q:..." 줄 / PONG 프레임)은 시계 동기화(ClockSync)로 전달
+
+  Arduino 전송 형식:
+    텍스트 모드  : "F:25,FL:30,FR:28,R:50,RL:45,RR:48,T:123456" (T = 측정 millis, 구버전은 없음)
+                   (구버전 "123" = 전방 센서)
+    바이너리 모드: SENSORS 프레임 (protocol.py, CRC 검사 + 순번으로 유실 프레임 계산)
+-------------------------------------------------------------------
+"""
+
+import time
+import threading
+
+from modules.vehicle import protocol
+from modules.vehicle.ultrasonic_state import UltrasonicState
+
+ULTRASONIC_KEYS = ('F', 'FL', 'FR', 'R', 'RL', 'RR')
+READ_TIMEOUT = 0.1      # 시리얼 읽기 대기 시간 (초, 종료 신호 확인 주기)
+
+
+# ==================== 파싱 ====================
+def parse_line(line):
+    """
+    초음파 데이터 한 줄 파싱
+
+    Args:
+        line (str): 시리얼로 받은 한 줄 (줄바꿈 제외)
+
+    Returns:
+        dict: {'F': 25, ..., 'T': 측정 millis} - 받은 값만 포함, 초음파 데이터가 아니면 None
+    """
+    # 형식 1: "F:25,FL:30,...,T:123456" (신규 6개 센서 형식)
+    if ':' in line and ',' in line:
+        reading = {}
+        for part in line.split(','):
+            key, _, value = part.partition(':')
+            if (key not in ULTRASONIC_KEYS and key != 'T') or not value.isdigit():
+                return None
+            reading[key] = int(value)
+        return reading
+
+    # 형식 2: "123" (구버전 단일 숫자 - Exercise_1.ino 호환)
+    if line.isdigit():
+        return {'F': int(line)}
+
+    return None
+
+
+# ==================== 수신 스레드 ====================
+class UltrasonicReader(object):
+    """
+    초음파 센서 백그라운드 수신기
+
+    사용법:
+        reader = UltrasonicReader(arduino)
+        reader.start()
+        data, stamp, seq, dropped = reader.snapshot()
+        reader.stop()
+    """
+
+    def __init__(self, port, mode=protocol.MODE_TEXT, tracker=None, clock=None, state=None):
+        """
+        Args:
+            port: 아두이노 시리얼 포트 객체 (libARDUINO.init 반환값)
+            mode (str): 'text' 또는 'binary' (ArduinoLink.handshake 결과)
+            tracker: latency.LatencyTracker (None이면 ACK 무시)
+            clock: clock_sync.ClockSync (None이면 PC 수신 시각 사용)
+            state: ultrasonic_state.UltrasonicState (None이면 기본 설정으로 생성)
+        """
+        self.port = port
+        self.mode = mode
+        self.tracker = tracker
+        self.clock = clock
+        self.state = state if state is not None else UltrasonicState()
+        self.decoder = protocol.FrameDecoder()
+        self.thread = None
+        self.running = False
+
+        # 공개 값: (측정 시각, 순번) - 튜플 하나를 통째로 교체 (센서 값은 self.state)
+        self.latest = (None, 0)
+
+        self.seq = 0            # 파싱 성공한 줄 순번
+        self.served_seq = 0     # snapshot으로 마지막에 읽어 간 순번
+        self.dropped = 0        # 읽히기 전에 새 값으로 덮어쓴 줄 수
+        self.errors = 0         # 파싱 실패 줄 수 (배너, 깨진 줄) 또는 CRC 오류 프레임 수
+        self.lost = 0           # 바이너리 모드: 순번이 건너뛴 프레임 수 (전송 중 유실)
+        self.rx_seq = None      # 바이너리 모드: 마지막 프레임 순번
+
+        # 측정 → PC 수신 지연 (시계 동기화 후, 아두이노 전송 + 시리얼 큐 대기)
+        self.delay_count = 0
+        self.delay_total = 0.0
+        self.delay_max = 0.0
+
+    def start(self):
+        """수신 스레드 시작"""
+        if self.thread is not None:
+            return
+        self.port.timeout = READ_TIMEOUT
+        if self.mode == protocol.MODE_TEXT:
+            self.port.reset_input_buffer()   # 연결 전에 쌓인 오래된 값 버림
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="ultrasonic", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """수신 스레드 종료 (포트를 닫기 전에 호출)"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def run(self):
+        """스레드 본체: 완성된 줄/프레임을 모두 읽어 가장 최근 값만 공개"""
+        buffer = bytearray()
+        while self.running:
+            try:
+                chunk = self.port.read(self.port.in_waiting or 1)
+            except Exception:
+                # 포트가 닫히거나 USB가 빠지면 종료
+                break
+            if not chunk:
+                continue
+
+            stamp = time.monotonic()
+            if self.mode == protocol.MODE_BINARY:
+                crc_errors = self.decoder.crc_errors
+                for msg_type, seq, payload in self.decoder.feed(chunk):
+                    self.handle_frame(msg_type, seq, payload, stamp)
+                self.errors += self.decoder.crc_errors - crc_errors
+                continue
+
+            buffer += chunk
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()   # 마지막 조각은 아직 줄바꿈 전
+
+            for raw in lines:
+                line = raw.decode('utf-8', 'replace').strip()
+                if not line:
+                    continue
+                reading = parse_line(line)
+                if reading is not None:
+                    self.publish(reading, stamp)
+                    continue
+                ack = protocol.parse_reply_line(line, 'A:')
+                pong = protocol.parse_reply_line(line, 'Q:') if ack is None else None
+                if ack is not None:
+                    if self.tracker is not None:
+                        self.tracker.acked(*ack, stamp)
+                elif pong is not None:
+                    if self.clock is not None:
+                        self.clock.pong(*pong, stamp)
+                else:
+                    self.errors += 1
+
+    def handle_frame(self, msg_type, seq, payload, stamp):
+        """바이너리 프레임 1개 처리 (순번은 모든 프레임이 공유 → 종류와 관계없이 유실 계산)"""
+        if self.rx_seq is not None:
+            self.lost += (seq - self.rx_seq - 1) & 0xFF
+        self.rx_seq = seq
+
+        if msg_type == protocol.MSG_ACK:
+            if self.tracker is not None:
+                self.tracker.acked(*protocol.decode_ack(payload), stamp)
+            return
+        if msg_type == protocol.MSG_PONG:
+            if self.clock is not None:
+                self.clock.pong(*protocol.decode_pong(payload), stamp)
+            return
+        if msg_type != protocol.MSG_SENSORS:
+            return
+        self.publish(protocol.decode_sensors(payload), stamp)
+
+    def publish(self, reading, stamp):
+        """측정값 1개를 센서 상태에 반영 (측정 millis가 있고 시계 동기화됐으면 측정 시각 사용)"""
+        capture_ms = reading.pop('T', None)
+        if capture_ms is not None and self.clock is not None:
+            capture = self.clock.to_host(capture_ms)
+            if capture is not None:
+                delay = stamp - capture
+                self.delay_count += 1
+                self.delay_total += delay
+                self.delay_max = max(self.delay_max, delay)
+                stamp = capture
+
+        self.state.update(reading, stamp)
+        self.seq += 1
+        self.latest = (stamp, self.seq)
+
+    # ==================== 읽기 ====================
+    def snapshot(self):
+        """
+        가장 최근 측정값 (버퍼를 읽지 않음)
+
+        Returns:
+            tuple: (센서 딕셔너리 (cm, 필터 결과, 값 없음 = 0),
+                    측정 시각 (time.monotonic 기준, 아직 없으면 None), 순번, 누적 dropped 수)
+        """
+        stamp, seq = self.latest
+        data = self.state.to_dict()
+        if seq > self.served_seq:
+            self.dropped += seq - self.served_seq - 1
+            self.served_seq = seq
+        return data, stamp, seq, self.dropped
+
+    def age(self):
+        """마지막 측정값 측정(또는 수신) 후 경과 시간 (초, 아직 없으면 None)"""
+        stamp = self.latest[0]
+        return None if stamp is None else time.monotonic() - stamp
+
+    def get_stats(self):
+        """
+        수신 통계
+
+        Returns:
+            dict: {'seq', 'dropped', 'errors', 'lost', 'delay_ms': 측정 → 수신 평균, 'delay_max_ms'}
+        """
+        return {
+            'seq': self.seq,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'lost': self.lost,
+            'delay_ms': self.delay_total / self.delay_count * 1000 if self.delay_count else None,
+            'delay_max_ms': self.delay_max * 1000
+        }
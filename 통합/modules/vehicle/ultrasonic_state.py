@@ -0,0 +1,228 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: ultrasonic_state.py
+  초음파 센서 상태 모듈 (고정 순서 배열)
+
+  기능:
+  1) 센서 6개 값을 고정 순서 배열로 저장 (F, FL, FR, R, RL, RR = protocol.SENSOR_KEYS)
+     - 센서별 최근 측정값 링 버퍼, 마지막 측정 시각, 마지막 유효 값 시각
+  2) 중앙값 필터로 튀는 값 제거
+     - 최근 window개 중 유효한 값이 과반이면 중앙값
+     - 과반이 안 되면 그중 가장 가까운 값 (에코가 띄엄띄엄 오는 장애물도 놓치지 않음)
+     - 유효 값이 하나도 없을 때만 "값 없음" (에코 없음 = 장애물 없음)
+     - 0 (측정 실패 = 에코 없음)은 유효 값에서 제외
+  3) 그룹 단위 계산 (배열 연산)
+     - group_min('front'): 전방 3개 중 가장 가까운 거리와 센서 이름
+     - covered('front'): 그룹 센서가 모두 max_age 안에 측정됐고 필터가 채워졌는지
+       (아니면 판단 불가 → 정지, 시작 직후 / 오래된 값 초기화 후 / 측정 센서 전환 직후 포함)
+     - freshest_age('front'): 가장 최근 유효 값의 나이
+     - max_age 안에 측정했는데 에코가 없으면 장애물 없음, 측정 자체가 오래됐으면 값 없음
+       (수신 스레드 종료, 통신 끊김, 측정 센서 선택으로 측정하지 않는 센서)
+-------------------------------------------------------------------
+"""
+
+import sys
+import os
+# 프로젝트 루트 디렉토리를 파이썬 경로에 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import time
+import threading
+import numpy as np
+
+from modules.vehicle.protocol import SENSOR_KEYS
+
+# 센서 그룹 (group_min / freshest_age에 이름 또는 센서 이름 튜플로 지정)
+GROUPS = {
+    'front': ('F', 'FL', 'FR'),
+    'rear': ('R', 'RL', 'RR'),
+    'all': SENSOR_KEYS,
+}
+
+SENSOR_NAMES = {
+    'F': "전방", 'FL': "좌전방", 'FR': "우전방",
+    'R': "후방", 'RL': "좌후방", 'RR': "우후방",
+}
+
+
+# ==================== 초음파 상태 ====================
+class UltrasonicState(object):
+    """
+    초음파 센서 6개 상태 (수신 스레드가 갱신, 메인 루프가 조회)
+
+    사용법:
+        state = UltrasonicState(window=5, max_age=0.5)
+        state.update({'F': 25, 'FL': 0}, stamp)        # UltrasonicReader가 호출
+        if not state.covered('front'):                  # 측정이 오래됨 → 판단 불가
+            ...
+        distance, key = state.group_min('front')        # 장애물이 없으면 (None, None)
+        state.freshest_age('front')
+    """
+
+    def __init__(self, window=5, max_age=0.5):
+        """
+        Args:
+            window (int): 중앙값 필터 크기 (측정 횟수, 센서별)
+            max_age (float): 이보다 오래 측정하지 않은 센서는 값 없음으로 처리 (초)
+        """
+        count = len(SENSOR_KEYS)
+        self.window = window
+        self.min_valid = window // 2 + 1
+        self.max_age = max_age
+        self.index = {key: i for i, key in enumerate(SENSOR_KEYS)}
+        self.groups = {}                                # {그룹: 센서 번호 배열} (캐시)
+        self.lock = threading.Lock()
+
+        self.history = np.full((count, window), np.nan) # 최근 측정값 링 버퍼 (cm, NaN = 실패)
+        self.head = np.zeros(count, dtype=np.intp)      # 센서별 다음에 쓸 위치
+        self.raw = np.zeros(count)                      # 마지막 측정값 (cm, 0 = 실패)
+        self.values = np.full(count, np.nan)            # 중앙값 필터 결과 (cm, NaN = 값 없음)
+        self.stamps = np.full(count, np.nan)            # 마지막 측정 시각 (실패 포함)
+        self.valid_stamps = np.full(count, np.nan)      # 마지막 유효 값 측정 시각
+        self.samples = np.zeros(count, dtype=np.intp)   # 마지막 초기화 이후 측정 횟수
+
+        self.updates = 0        # 받은 측정값 수 (센서별 합)
+        self.failures = 0       # 그중 측정 실패 (0) 수
+
+    # ==================== 갱신 ====================
+    def update(self, reading, stamp):
+        """
+        측정값 반영
+
+        Args:
+            reading (dict): {'F': 25, ...} (cm, 0 = 측정 실패, 측정한 센서만)
+            stamp (float): 측정 시각 (time.monotonic 기준)
+        """
+        with self.lock:
+            for key, cm in reading.items():
+                i = self.index.get(key)
+                if i is None:
+                    continue
+                if not stamp - self.stamps[i] <= self.max_age:
+                    self.history[i] = np.nan    # 오래 측정하지 않았던 센서는 이전 값을 섞지 않음
+                    self.samples[i] = 0
+                self.raw[i] = cm
+                self.history[i, self.head[i]] = cm if cm > 0 else np.nan
+                self.head[i] = (self.head[i] + 1) % self.window
+                self.stamps[i] = stamp
+                self.samples[i] += 1
+                self.updates += 1
+                if cm > 0:
+                    self.valid_stamps[i] = stamp
+                else:
+                    self.failures += 1
+            self.filter()
+
+    def filter(self):
+        """
+        센서별 중앙값 (NaN은 정렬하면 뒤로 가므로 유효 값 개수로 가운데 위치 계산)
+
+        유효 값이 과반이 안 되면 가장 가까운 값 (정렬 첫 번째), 하나도 없으면 NaN
+        """
+        counts = np.count_nonzero(~np.isnan(self.history), axis=1)
+        ordered = np.sort(self.history, axis=1)
+        low = np.take_along_axis(ordered, (np.maximum(counts, 1) - 1)[:, None] // 2, axis=1)[:, 0]
+        high = np.take_along_axis(ordered, (counts // 2)[:, None], axis=1)[:, 0]
+        self.values = np.where(counts >= self.min_valid, (low + high) / 2, ordered[:, 0])
+
+    # ==================== 조회 ====================
+    def indices(self, group):
+        """그룹 이름 또는 센서 이름 튜플 → 센서 번호 배열"""
+        found = self.groups.get(group)
+        if found is None:
+            keys = GROUPS[group] if isinstance(group, str) else group
+            found = np.array([self.index[key] for key in keys], dtype=np.intp)
+            self.groups[group] = found
+        return found
+
+    def fresh_values(self, group, now=None):
+        """그룹 센서 값 배열 (cm, 에코 없음 또는 max_age보다 오래 측정하지 않았으면 inf)"""
+        now = time.monotonic() if now is None else now
+        index = self.indices(group)
+        with self.lock:
+            values = self.values[index]
+            ages = now - self.stamps[index]
+        usable = ~np.isnan(values) & (ages <= self.max_age)     # NaN 시각은 비교 결과 False
+        return index, np.where(usable, values, np.inf)
+
+    def covered(self, group='front', now=None):
+        """
+        그룹 센서가 모두 최근(max_age 안)에 측정됐고 필터가 채워졌는지
+
+        한 번도 값을 보내지 않은 센서는 제외 (구버전 펌웨어는 전방 1개만 전송)
+        초기화 후 측정이 min_valid회 모이기 전에는 필터 결과를 믿을 수 없으므로 False
+
+        Returns:
+            bool: False면 거리 판단 불가 (값이 없거나 오래됐거나 아직 모이는 중)
+        """
+        now = time.monotonic() if now is None else now
+        index = self.indices(group)
+        with self.lock:
+            stamps = self.stamps[index]
+            samples = self.samples[index]
+        reported = ~np.isnan(stamps)
+        return bool(np.any(reported)
+                    and np.all(now - stamps[reported] <= self.max_age)
+                    and np.all(samples[reported] >= self.min_valid))
+
+    def group_min(self, group='front', now=None):
+        """
+        그룹에서 가장 가까운 거리 (covered로 측정이 최근인지 먼저 확인)
+
+        Returns:
+            tuple: (거리 cm, 센서 이름), 장애물이 없으면 (None, None)
+        """
+        index, values = self.fresh_values(group, now)
+        best = int(np.argmin(values))
+        if not np.isfinite(values[best]):
+            return None, None
+        return float(values[best]), SENSOR_KEYS[index[best]]
+
+    def freshest_age(self, group='all', now=None):
+        """
+        그룹에서 가장 최근 유효 값의 나이
+
+        Returns:
+            float: 초, 유효 값을 받은 적이 없으면 None
+        """
+        now = time.monotonic() if now is None else now
+        index = self.indices(group)
+        with self.lock:
+            stamps = self.valid_stamps[index]
+        if np.all(np.isnan(stamps)):
+            return None
+        return now - float(np.nanmax(stamps))
+
+    def get(self, key, default=0):
+        """센서 1개 필터 결과 (cm 정수, 값이 없거나 오래됐으면 default)"""
+        _, values = self.fresh_values((key,))
+        return int(round(values[0])) if np.isfinite(values[0]) else default
+
+    def to_dict(self, now=None):
+        """
+        {'F': 25, ...} 딕셔너리 (cm, 값이 없거나 오래됐으면 0 - 펌웨어 줄 형식과 같은 의미)
+        """
+        _, values = self.fresh_values('all', now)
+        return {key: int(round(value)) if np.isfinite(value) else 0
+                for key, value in zip(SENSOR_KEYS, values)}
+
+    def summary(self, group='all'):
+        """상태 출력용 한 줄 요약"""
+        _, values = self.fresh_values(group)
+        parts = [f"{key} {value:.0f}" if np.isfinite(value) else f"{key} -"
+                 for key, value in zip(GROUPS.get(group, group), values)]
+        age = self.freshest_age(group)
+        age_text = f"{age * 1000:.0f}ms" if age is not None else "없음"
+        return f"{' / '.join(parts)} cm (최근 값 {age_text} 전)"
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'updates', 'failures', 'failure_rate'}
+        """
+        with self.lock:
+            return {
+                'updates': self.updates,
+                'failures': self.failures,
+                'failure_rate': self.failures / self.updates if self.updates else 0.0
+            }
@@ -0,0 +1,141 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: bev.py
+  버드아이뷰(BEV) 변환 모듈
+
+  기능:
+  1) 렌즈 왜곡 보정 + 원근 변환(호모그래피)을 하나의 remap 맵으로 합성
+  2) 고정소수점 맵(CV_16SC2)으로 변환하여 프레임당 remap 1회로 처리
+  3) 카메라/해상도별 맵을 파일로 저장하여 다음 실행 시 재사용
+
+  기존 start_lib.get_bird_eye_view와 같은 꼭짓점 순서 사용:
+    points[0] = 좌하단, points[1] = 우하단, points[2] = 우상단, points[3] = 좌상단
+-------------------------------------------------------------------
+"""
+
+import os
+import hashlib
+import cv2
+import numpy as np
+
+
+# ==================== 맵 생성 ====================
+def build_bev_maps(points, input_size, output_size, camera_matrix=None, dist_coeffs=None):
+    """
+    BEV 출력 좌표 → 원본(왜곡된) 영상 좌표 맵 생성
+
+    Args:
+        points: 원본 영상 기준 BEV 영역 꼭짓점 4개 [(x, y), ...]
+                (왜곡 보정된 영상 기준 좌표)
+        input_size (tuple): 원본 영상 크기 (width, height)
+        output_size (tuple): BEV 영상 크기 (width, height)
+        camera_matrix: 3x3 카메라 행렬 (None이면 왜곡 보정 생략)
+        dist_coeffs: 렌즈 왜곡 계수 (k1, k2, p1, p2[, k3])
+
+    Returns:
+        tuple: (map1, map2) cv2.remap용 고정소수점 맵 (CV_16SC2, CV_16UC1)
+    """
+    width, height = output_size
+    src_points = np.float32([points[0], points[1], points[3], points[2]])
+    dst_points = np.float32([[0, height], [width, height], [0, 0], [width, 0]])
+
+    # BEV 좌표 → 보정된 원본 좌표 (역 호모그래피)
+    inverse = cv2.getPerspectiveTransform(dst_points, src_points)
+    u, v = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    grid = np.stack([u, v], axis=-1).reshape(-1, 1, 2)
+    undistorted = cv2.perspectiveTransform(grid, inverse).reshape(-1, 2)
+
+    if camera_matrix is not None:
+        # 보정된 좌표 → 정규화 좌표 → 렌즈 왜곡 적용 → 실제 원본 픽셀 좌표
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        dist_coeffs = np.zeros(5) if dist_coeffs is None else np.asarray(dist_coeffs, dtype=np.float64)
+        fx, fy = camera_matrix[0, 0], camera_matrix[1, 1]
+        cx, cy = camera_matrix[0, 2], camera_matrix[1, 2]
+        normalized = np.stack([(undistorted[:, 0] - cx) / fx,
+                               (undistorted[:, 1] - cy) / fy,
+                               np.ones(len(undistorted))], axis=-1)
+        distorted, _ = cv2.projectPoints(normalized, np.zeros(3), np.zeros(3), camera_matrix, dist_coeffs)
+        undistorted = distorted.reshape(-1, 2)
+
+    map_x = undistorted[:, 0].reshape(height, width).astype(np.float32)
+    map_y = undistorted[:, 1].reshape(height, width).astype(np.float32)
+
+    # 원본 영상 밖 좌표는 remap에서 검은색(0)으로 채워짐
+    outside = (map_x < 0) | (map_x > input_size[0] - 1) | (map_y < 0) | (map_y > input_size[1] - 1)
+    map_x[outside], map_y[outside] = -1, -1
+
+    return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+
+# ==================== BEV 변환기 ====================
+class BirdEyeView(object):
+    """
+    캐시된 BEV remap 변환기
+
+    사용법:
+        bev = BirdEyeView(points, (640, 480), (320, 240), camera_id=0)
+        top_view = bev.warp(frame)
+    """
+
+    def __init__(self, points, input_size, output_size=None, camera_matrix=None,
+                 dist_coeffs=None, camera_id=0, cache_dir=None):
+        """
+        Args:
+            points: 원본 영상 기준 BEV 영역 꼭짓점 4개
+            input_size (tuple): 원본 영상 크기 (width, height)
+            output_size (tuple): BEV 영상 크기 (None이면 원본과 같음, 작게 하면 더 빠름)
+            camera_matrix: 3x3 카메라 행렬 (None이면 왜곡 보정 생략)
+            dist_coeffs: 렌즈 왜곡 계수
+            camera_id (int): 카메라 번호 (캐시 파일 구분용)
+            cache_dir (str): 맵 저장 폴더 (None이면 저장 안 함)
+        """
+        self.points = [tuple(map(float, p)) for p in points]
+        self.input_size = tuple(input_size)
+        self.output_size = tuple(output_size or input_size)
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.camera_id = camera_id
+        self.cache_dir = cache_dir
+
+        self.map1, self.map2 = self.load_maps()
+
+    def cache_path(self):
+        """카메라/해상도/파라미터별 캐시 파일 경로"""
+        key = repr((self.points, self.input_size, self.output_size,
+                    None if self.camera_matrix is None else np.asarray(self.camera_matrix).tolist(),
+                    None if self.dist_coeffs is None else np.asarray(self.dist_coeffs).tolist()))
+        digest = hashlib.md5(key.encode()).hexdigest()[:10]
+        name = "bev_cam%d_%dx%d_%dx%d_%s.npz" % ((self.camera_id,) + self.input_size + self.output_size + (digest,))
+        return os.path.join(self.cache_dir, name)
+
+    def load_maps(self):
+        """
+        캐시 파일이 있으면 읽고, 없으면 생성 후 저장
+
+        Returns:
+            tuple: (map1, map2)
+        """
+        path = self.cache_path() if self.cache_dir else None
+        if path and os.path.exists(path):
+            with np.load(path) as cache:
+                return cache["map1"], cache["map2"]
+
+        map1, map2 = build_bev_maps(self.points, self.input_size, self.output_size,
+                                    self.camera_matrix, self.dist_coeffs)
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(path, map1=map1, map2=map2)
+        return map1, map2
+
+    def warp(self, frame, interpolation=cv2.INTER_LINEAR):
+        """
+        BEV 변환 (프레임당 remap 1회)
+
+        Args:
+            frame: 원본 영상 (input_size와 같은 크기)
+            interpolation: 보간 방법 (INTER_NEAREST로 하면 더 빠름)
+
+        Returns:
+            BEV 영상 (output_size 크기)
+        """
+        return cv2.remap(frame, self.map1, self.map2, interpolation)
@@ -0,0 +1,213 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: calibration.py
+  카메라 캘리브레이션 저장소 모듈
+
+  기능:
+  1) 카메라/해상도별 캘리브레이션 파일 저장 및 읽기 (JSON, 버전 관리)
+     - BEV 꼭짓점 4개 (start_lib.get_points로 클릭한 값)
+     - 카메라 행렬, 렌즈 왜곡 계수 (선택 사항)
+     - 미리 계산한 BEV 변환 행렬
+  2) 저장된 값으로 BirdEyeView 변환기 생성
+
+  파일 이름: cam<카메라번호>_<가로>x<세로>.json
+  카메라가 움직이면 start_lib.py로 꼭짓점만 다시 찍으면 됨 (코드 수정 불필요)
+-------------------------------------------------------------------
+"""
+
+import os
+import re
+import json
+import time
+import cv2
+import numpy as np
+
+from modules.vision.bev import BirdEyeView
+
+CALIBRATION_VERSION = 1
+
+
+# ==================== 파일 경로 ====================
+def calibration_path(directory, camera_id, size):
+    """
+    캘리브레이션 파일 경로
+
+    Args:
+        directory (str): 캘리브레이션 폴더
+        camera_id (int): 카메라 번호
+        size (tuple): 영상 크기 (width, height)
+    """
+    return os.path.join(directory, "cam%d_%dx%d.json" % (camera_id, size[0], size[1]))
+
+
+def find_other_size(directory, camera_id, size):
+    """
+    같은 카메라의 다른 해상도 캘리브레이션 파일 찾기
+
+    가로세로 비율이 같은 파일만 사용 (비율이 다르면 화각이 잘려서 꼭짓점 위치가 맞지 않음)
+    그중 픽셀 수가 가장 가까운 파일, 같으면 큰 해상도 (축소가 확대보다 정확)
+
+    Args:
+        directory (str): 캘리브레이션 폴더
+        camera_id (int): 카메라 번호
+        size (tuple): 현재 영상 크기 (width, height)
+
+    Returns:
+        str: 파일 경로, 없으면 None
+    """
+    if not os.path.isdir(directory) or size[0] <= 0 or size[1] <= 0:
+        return None
+
+    pattern = re.compile(r"cam%d_(\d+)x(\d+)\.json$" % camera_id)
+    matched, skipped = [], []
+    for name in sorted(os.listdir(directory)):
+        found = pattern.match(name)
+        if found is None:
+            continue
+        width, height = int(found.group(1)), int(found.group(2))
+        if width * size[1] == height * size[0]:
+            matched.append((abs(width * height - size[0] * size[1]), -width * height, name))
+        else:
+            skipped.append(name)
+
+    if not matched:
+        if skipped:
+            print(f"⚠️  캘리브레이션 {size[0]}x{size[1]} 없음 - 비율이 다른 파일만 있어 사용 안 함: "
+                  f"{', '.join(skipped)}")
+        return None
+    return os.path.join(directory, min(matched)[2])
+
+
+def bev_matrix(points, size):
+    """꼭짓점 4개 → BEV 변환 행렬 (같은 크기 출력 기준)"""
+    width, height = size
+    src_points = np.float32([points[0], points[1], points[3], points[2]])
+    dst_points = np.float32([[0, height], [width, height], [0, 0], [width, 0]])
+    return cv2.getPerspectiveTransform(src_points, dst_points)
+
+
+# ==================== 저장 / 읽기 ====================
+def save_calibration(directory, camera_id, size, points, camera_matrix=None, dist_coeffs=None):
+    """
+    캘리브레이션 저장
+
+    Args:
+        directory (str): 캘리브레이션 폴더
+        camera_id (int): 카메라 번호
+        size (tuple): 꼭짓점을 찍은 영상 크기 (width, height)
+        points: BEV 꼭짓점 4개 [(x, y), ...] (좌하단, 우하단, 우상단, 좌상단)
+        camera_matrix: 3x3 카메라 행렬 (선택 사항)
+        dist_coeffs: 렌즈 왜곡 계수 (선택 사항)
+
+    Returns:
+        str: 저장한 파일 경로
+    """
+    if len(points) != 4:
+        raise ValueError(f"BEV 꼭짓점은 4개여야 합니다 (현재 {len(points)}개)")
+
+    data = {
+        'version': CALIBRATION_VERSION,
+        'camera_id': camera_id,
+        'size': [int(size[0]), int(size[1])],
+        'points': [[float(x), float(y)] for x, y in points],
+        'camera_matrix': None if camera_matrix is None else np.asarray(camera_matrix, dtype=float).tolist(),
+        'dist_coeffs': None if dist_coeffs is None else np.asarray(dist_coeffs, dtype=float).reshape(-1).tolist(),
+        'bev_matrix': bev_matrix(points, size).tolist(),
+        'saved': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    path = calibration_path(directory, camera_id, size)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def load_calibration(directory, camera_id, size):
+    """
+    캘리브레이션 읽기
+
+    같은 해상도 파일이 없으면 같은 카메라의 비율이 같은 다른 해상도 파일을 찾아
+    (find_other_size) 꼭짓점과 카메라 행렬을 비율에 맞게 변환
+
+    Args:
+        directory (str): 캘리브레이션 폴더
+        camera_id (int): 카메라 번호
+        size (tuple): 현재 영상 크기 (width, height)
+
+    Returns:
+        dict: 캘리브레이션 값 (points, camera_matrix, dist_coeffs, bev_matrix, size)
+              없거나 영상 크기를 모르면 (0이면) None
+    """
+    if size[0] <= 0 or size[1] <= 0:
+        return None     # 카메라가 열리지 않음 (0x0이면 모든 파일이 같은 비율로 보임)
+
+    path = calibration_path(directory, camera_id, size)
+    if not os.path.exists(path):
+        path = find_other_size(directory, camera_id, size)
+        if path is None:
+            return None
+        print(f"⚠️  캘리브레이션 {size[0]}x{size[1]} 없음 - 다른 해상도 파일 변환해서 사용: {path}")
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    if data.get('version') != CALIBRATION_VERSION:
+        print(f"⚠️  캘리브레이션 버전 불일치: {path} (v{data.get('version')}, 필요 v{CALIBRATION_VERSION})")
+        return None
+
+    # 다른 해상도에서 찍은 값이면 비율 변환
+    scale_x, scale_y = size[0] / data['size'][0], size[1] / data['size'][1]
+    points = [(x * scale_x, y * scale_y) for x, y in data['points']]
+
+    camera_matrix = data.get('camera_matrix')
+    if camera_matrix is not None:
+        camera_matrix = np.array(camera_matrix)
+        camera_matrix[0] *= scale_x
+        camera_matrix[1] *= scale_y
+
+    dist_coeffs = data.get('dist_coeffs')
+    if dist_coeffs is not None:
+        dist_coeffs = np.array(dist_coeffs)
+
+    if (scale_x, scale_y) == (1.0, 1.0):
+        matrix = np.array(data['bev_matrix'])
+    else:
+        matrix = bev_matrix(points, size)
+
+    return {
+        'size': tuple(size),
+        'points': points,
+        'camera_matrix': camera_matrix,
+        'dist_coeffs': dist_coeffs,
+        'bev_matrix': matrix
+    }
+
+
+def load_bev(directory, camera_id, size, output_size=None, cache_dir=None):
+    """
+    저장된 캘리브레이션으로 BEV 변환기 생성
+
+    Args:
+        directory (str): 캘리브레이션 폴더
+        camera_id (int): 카메라 번호
+        size (tuple): 현재 영상 크기 (width, height)
+        output_size (tuple): BEV 영상 크기
+        cache_dir (str): BEV 맵 캐시 폴더
+
+    Returns:
+        BirdEyeView: 변환기, 캘리브레이션이 없으면 None
+    """
+    calibration = load_calibration(directory, camera_id, size)
+    if calibration is None:
+        return None
+
+    return BirdEyeView(
+        calibration['points'],
+        size,
+        output_size,
+        camera_matrix=calibration['camera_matrix'],
+        dist_coeffs=calibration['dist_coeffs'],
+        camera_id=camera_id,
+        cache_dir=cache_dir
+    )
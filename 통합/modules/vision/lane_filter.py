@@ -0,0 +1,174 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: lane_filter.py
+  차선 상태 칼만 필터 모듈
+
+  기능:
+  1) 차선 상태 (오프셋, 방향, 곡률)를 프레임 사이에 유지
+     - 예측: 한 프레임 동안 차량이 step 픽셀 전진했다고 가정
+     - 갱신: 인식 결과가 있으면 보정, 없으면 예측값으로 주행 유지
+  2) 튀는 인식 결과 제거 (마할라노비스 거리 게이트)
+  3) 추적 안정 여부 판단 → 차선 인식 연산량 조절에 사용
+     (안정: 작은 ROI + 거친 Hough 해상도, 실패 후: 전체 영상 + 기본 해상도)
+
+  상태 (영상 좌표, libCAMERA.lane_center와 같은 단위):
+    offset    : 영상 맨 아래 줄에서 차선 중심 - 영상 중심 (픽셀, 오른쪽 +)
+    heading   : 차선 기울기 (위로 1픽셀당 가로 이동 픽셀, 오른쪽 +)
+    curvature : 전진 1픽셀당 heading 변화량
+-------------------------------------------------------------------
+"""
+
+import numpy as np
+
+
+# ==================== 차선 상태 필터 ====================
+class LaneFilter(object):
+    """
+    차선 상태 칼만 필터
+
+    사용법:
+        lane_filter = LaneFilter(step=10, max_misses=5)
+        camera.edge_detection(frame, ...)
+        state = lane_filter.step(camera.lane_center)
+        if state is not None:
+            offset, heading, curvature = state
+    """
+
+    def __init__(self, step=10, max_misses=5, process_noise=(4.0, 1e-3, 1e-6),
+                 measurement_noise=(100.0, 0.01), gate=9.0,
+                 confident_hits=3, confident_heading_std=0.1):
+        """
+        Args:
+            step (float): 한 프레임 동안 전진 거리 (영상 세로 픽셀)
+            max_misses (int): 인식 실패를 예측값으로 버티는 최대 프레임 수
+            process_noise (tuple): 프레임당 상태 변화 분산 (offset, heading, curvature)
+            measurement_noise (tuple): 인식 결과 분산 (offset, heading)
+            gate (float): 이상치 판정 마할라노비스 거리 제곱 (이보다 크면 실패로 처리)
+            confident_hits (int): 추적 안정 판정에 필요한 연속 인식 성공 프레임 수
+            confident_heading_std (float): 추적 안정 판정 heading 표준편차 상한
+        """
+        self.transition = np.array([[1.0, step, 0.0],
+                                    [0.0, 1.0, step],
+                                    [0.0, 0.0, 1.0]])
+        self.process_noise = np.diag(process_noise)
+        self.measurement_noise = np.asarray(measurement_noise, dtype=float)
+        self.max_misses = max_misses
+        self.gate = gate
+        self.confident_hits = confident_hits
+        self.confident_heading_std = confident_heading_std
+
+        self.x = None       # 상태 벡터 [offset, heading, curvature] (추적 전이면 None)
+        self.P = None       # 상태 공분산
+        self.hits = 0       # 연속 인식 성공 프레임 수
+        self.misses = 0     # 연속 인식 실패 프레임 수
+
+        # 통계
+        self.frames = 0             # 전체 프레임 수
+        self.coasted_frames = 0     # 인식 실패를 예측값으로 버틴 프레임 수
+        self.rejected_frames = 0    # 이상치로 버린 프레임 수
+        self.confident_frames = 0   # 추적 안정 상태 프레임 수
+
+    # ==================== 추적 상태 ====================
+    def confident(self):
+        """추적 안정 여부 (True면 작은 ROI + 거친 해상도로 인식해도 됨)"""
+        return (self.x is not None
+                and self.hits >= self.confident_hits
+                and np.sqrt(self.P[1, 1]) < self.confident_heading_std)
+
+    def reset(self):
+        """상태 삭제 (다음 인식 결과로 다시 시작)"""
+        self.x, self.P = None, None
+        self.hits, self.misses = 0, 0
+
+    # ==================== 예측 / 갱신 ====================
+    def predict(self):
+        """한 프레임 전진 예측"""
+        if self.x is None:
+            return
+        self.x = self.transition @ self.x
+        self.P = self.transition @ self.P @ self.transition.T + self.process_noise
+
+    def update(self, measurement):
+        """
+        인식 결과로 상태 보정
+
+        Args:
+            measurement: (offset 또는 None, heading) - libCAMERA.lane_center
+                         인식 실패면 None
+
+        Returns:
+            bool: 측정값을 반영했으면 True (실패/이상치면 False)
+        """
+        if measurement is None:
+            return False
+
+        offset, heading = measurement
+        rows = [1] if offset is None else [0, 1]
+        z = np.array([heading] if offset is None else [offset, heading], dtype=float)
+        R = np.diag(self.measurement_noise[rows])
+
+        if self.x is None:
+            # 첫 측정: 관측된 값으로 시작, 관측 안 된 값은 큰 분산
+            self.x = np.zeros(3)
+            self.x[rows] = z
+            self.P = np.diag([self.measurement_noise[0] * 100, self.measurement_noise[1], 1e-4])
+            self.P[rows, rows] = self.measurement_noise[rows]
+            return True
+
+        H = np.eye(3)[rows]
+        innovation = z - H @ self.x
+        S = H @ self.P @ H.T + R
+        S_inv = np.linalg.inv(S)
+        if innovation @ S_inv @ innovation > self.gate:
+            self.rejected_frames += 1
+            return False
+
+        K = self.P @ H.T @ S_inv
+        self.x = self.x + K @ innovation
+        self.P = (np.eye(3) - K @ H) @ self.P
+        return True
+
+    def step(self, measurement):
+        """
+        한 프레임 처리 (예측 + 갱신)
+
+        Args:
+            measurement: (offset 또는 None, heading), 인식 실패면 None
+
+        Returns:
+            tuple: (offset, heading, curvature)
+                   추적 전이거나 max_misses 프레임 넘게 실패하면 None
+        """
+        self.frames += 1
+        self.predict()
+
+        if self.update(measurement):
+            self.hits += 1
+            self.misses = 0
+        else:
+            self.hits = 0
+            self.misses += 1
+            if self.misses > self.max_misses:
+                self.reset()
+            elif self.x is not None:
+                self.coasted_frames += 1
+
+        if self.x is None:
+            return None
+        if self.confident():
+            self.confident_frames += 1
+        return tuple(float(v) for v in self.x)
+
+    def get_stats(self):
+        """
+        필터 통계
+
+        Returns:
+            dict: {'frames', 'coasted_frames', 'rejected_frames', 'confident_frames'}
+        """
+        return {
+            'frames': self.frames,
+            'coasted_frames': self.coasted_frames,
+            'rejected_frames': self.rejected_frames,
+            'confident_frames': self.confident_frames
+        }
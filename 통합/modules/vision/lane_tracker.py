@@ -0,0 +1,187 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: lane_tracker.py
+  버드아이뷰(BEV) 슬라이딩 윈도우 차선 추적 모듈
+
+  기능:
+  1) 열 히스토그램으로 좌/우 차선 시작 위치 검색
+  2) 슬라이딩 윈도우로 차선 픽셀 수집 후 2차 다항식 피팅
+  3) 다음 프레임부터는 이전 피팅 주변(margin)만 검색
+     (차선을 놓치면 다시 전체 검색)
+  4) 출력: 차선 중심 대비 횡방향 오프셋, 방향 오차, 곡률
+
+  좌표계 (BEV 영상):
+    x = 오른쪽(+), y = 아래쪽(+), 차량 위치 = 영상 맨 아래 가운데
+-------------------------------------------------------------------
+"""
+
+import cv2
+import numpy as np
+
+
+# ==================== 차선 추적기 ====================
+class LaneTracker(object):
+    """
+    BEV 슬라이딩 윈도우 차선 추적기
+
+    사용법:
+        tracker = LaneTracker(mm_per_pixel=(3.0, 3.0), lane_width_mm=850)
+        state = tracker.update(bev_frame)
+        if state is not None:
+            print(state['offset'], state['heading'], state['curvature'])
+    """
+
+    def __init__(self, mm_per_pixel=(1.0, 1.0), lane_width_mm=850, threshold=180,
+                 n_windows=9, margin=40, min_pixels=50):
+        """
+        Args:
+            mm_per_pixel (tuple): BEV 픽셀당 실제 거리 (가로 mm, 세로 mm)
+            lane_width_mm (int): 차선 간격 (mm, 규정 도로 폭 850mm)
+                                 한쪽 차선만 보일 때 반대쪽 위치 추정에 사용
+            threshold (int): 흰색 차선 이진화 임계값 (0~255)
+            n_windows (int): 슬라이딩 윈도우 개수 (세로 방향)
+            margin (int): 윈도우/이전 피팅 주변 검색 폭 (픽셀, 한쪽)
+            min_pixels (int): 차선으로 인정할 최소 픽셀 수
+        """
+        self.mm_x, self.mm_y = mm_per_pixel
+        self.lane_width_px = lane_width_mm / self.mm_x
+        self.threshold = threshold
+        self.n_windows = n_windows
+        self.margin = margin
+        self.min_pixels = min_pixels
+
+        self.left_fit = None        # 이전 프레임 좌측 차선 다항식 (x = a*y^2 + b*y + c)
+        self.right_fit = None       # 이전 프레임 우측 차선 다항식
+        self.binary = None          # 마지막 프레임 이진 영상 (디버그 표시용)
+        self.full_searches = 0      # 전체 검색 횟수 (통계용)
+        self.margin_searches = 0    # 이전 피팅 주변 검색 횟수 (통계용)
+
+    # ==================== 전처리 ====================
+    def binarize(self, frame):
+        """BEV 영상 → 흰색 차선 이진 영상"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        _, binary = cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY)
+        return binary
+
+    # ==================== 차선 픽셀 검색 ====================
+    def full_search(self, binary, ys, xs):
+        """
+        히스토그램 + 슬라이딩 윈도우 전체 검색
+
+        Returns:
+            tuple: (좌측 픽셀 마스크, 우측 픽셀 마스크) - ys/xs와 같은 길이
+        """
+        height, width = binary.shape
+        self.full_searches += 1
+
+        # 아래쪽 절반 열 합계로 좌/우 차선 시작 위치 검색
+        histogram = np.count_nonzero(binary[height // 2:], axis=0)
+        middle = width // 2
+        bases = [int(np.argmax(histogram[:middle])), middle + int(np.argmax(histogram[middle:]))]
+
+        masks = []
+        window_height = height // self.n_windows
+        for base in bases:
+            mask = np.zeros(len(ys), dtype=bool)
+            current = base
+            for window in range(self.n_windows):
+                y_high = height - window * window_height
+                y_low = y_high - window_height
+                inside = (ys >= y_low) & (ys < y_high) & (np.abs(xs - current) < self.margin)
+                mask |= inside
+                if np.count_nonzero(inside) > self.min_pixels // self.n_windows:
+                    current = int(xs[inside].mean())
+            masks.append(mask)
+
+        return masks[0], masks[1]
+
+    def margin_search(self, ys, xs):
+        """
+        이전 피팅 주변(margin)만 검색
+
+        Returns:
+            tuple: (좌측 픽셀 마스크, 우측 픽셀 마스크)
+        """
+        self.margin_searches += 1
+        left = np.abs(xs - np.polyval(self.left_fit, ys)) < self.margin
+        right = np.abs(xs - np.polyval(self.right_fit, ys)) < self.margin
+        return left, right
+
+    def fit(self, ys, xs, mask):
+        """마스크 픽셀로 2차 다항식 피팅 (픽셀 부족 시 None)"""
+        if np.count_nonzero(mask) < self.min_pixels:
+            return None
+        return np.polyfit(ys[mask], xs[mask], 2)
+
+    # ==================== 추적 ====================
+    def update(self, frame, binary=None):
+        """
+        한 프레임 차선 추적
+
+        Args:
+            frame: BEV 영상 (컬러 또는 그레이)
+            binary: 미리 계산한 이진 영상 (None이면 내부에서 계산)
+
+        Returns:
+            dict: 차선 상태 (놓치면 None)
+                'offset'    : 차선 중심 대비 차량 횡방향 위치 (mm, 오른쪽 +)
+                'heading'   : 차선 방향 대비 차량 방향 오차 (rad, 차선이 오른쪽으로 향하면 +)
+                'curvature' : 차선 곡률 (1/m, 오른쪽으로 휘면 +)
+                'left_fit', 'right_fit' : 좌/우 차선 다항식 (픽셀 좌표)
+                'search'    : 'full' 또는 'margin'
+        """
+        if binary is None:
+            binary = self.binarize(frame)
+        self.binary = binary
+        height, width = binary.shape
+
+        ys, xs = np.nonzero(binary)
+
+        search = 'margin'
+        if self.left_fit is not None and self.right_fit is not None:
+            left_mask, right_mask = self.margin_search(ys, xs)
+            left_fit, right_fit = self.fit(ys, xs, left_mask), self.fit(ys, xs, right_mask)
+            if left_fit is None and right_fit is None:
+                search = 'full'
+        else:
+            search = 'full'
+
+        if search == 'full':
+            left_mask, right_mask = self.full_search(binary, ys, xs)
+            left_fit, right_fit = self.fit(ys, xs, left_mask), self.fit(ys, xs, right_mask)
+
+        # 한쪽만 보이면 차선 폭만큼 평행 이동해서 추정
+        if left_fit is None and right_fit is None:
+            self.left_fit, self.right_fit = None, None
+            return None
+        if left_fit is None:
+            left_fit = right_fit - np.array([0, 0, self.lane_width_px])
+        if right_fit is None:
+            right_fit = left_fit + np.array([0, 0, self.lane_width_px])
+
+        self.left_fit, self.right_fit = left_fit, right_fit
+
+        # 차량 위치(영상 맨 아래)에서 중심선 평가
+        center_fit = (left_fit + right_fit) / 2
+        y = height - 1
+        center_x = np.polyval(center_fit, y)
+        slope = 2 * center_fit[0] * y + center_fit[1]       # dx/dy (픽셀)
+
+        # 전방 = y 감소 방향
+        ratio = self.mm_x / self.mm_y
+        heading = float(np.arctan(-slope * ratio))
+        second = 2 * center_fit[0] * self.mm_x / (self.mm_y ** 2)   # d2X/dY2 (1/mm)
+        curvature = float(second / (1 + (slope * ratio) ** 2) ** 1.5 * 1000)
+
+        return {
+            'offset': float((width / 2 - center_x) * self.mm_x),
+            'heading': heading,
+            'curvature': curvature,
+            'left_fit': left_fit,
+            'right_fit': right_fit,
+            'search': search
+        }
+
+    def reset(self):
+        """이전 피팅 삭제 (다음 프레임 전체 검색)"""
+        self.left_fit, self.right_fit = None, None
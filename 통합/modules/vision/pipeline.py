@@ -0,0 +1,133 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: pipeline.py
+  카메라별 병렬 인식 파이프라인
+
+  기능:
+  1) 카메라마다 인식 작업을 스레드 풀에서 동시에 실행
+     - 전방(차선/신호등/정지선)과 후방 카메라 처리 시간이 더해지지 않고 겹침
+     - OpenCV 함수는 실행 중 GIL을 놓기 때문에 스레드로도 병렬 처리됨
+  2) 프레임 번호(seq)로 카메라별 결과를 모아서 반환
+  3) submit 후 collect 전까지 메인 스레드는 라이다/초음파 처리 가능
+  4) 예산 계산은 카메라별 인식 시간 중 최댓값 (메인 스레드 라이다/초음파 시간 제외)
+     submit ~ collect 시간은 별도 통계 (wall_ms)
+
+  인식 함수 주기/예산은 scheduler.DetectorScheduler 사용
+  (카메라별로 run_camera 호출, 예산도 카메라별로 계산)
+-------------------------------------------------------------------
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ==================== 카메라 파이프라인 ====================
+class CameraPipeline(object):
+    """
+    카메라별 스레드 풀 인식 파이프라인
+
+    사용법:
+        pipeline = CameraPipeline(scheduler, workers=2)
+        seq = pipeline.submit(frame_count, {0: ctx0, 1: ctx1})
+        ... (라이다, 초음파 처리)
+        results = pipeline.collect(seq)
+        pipeline.close()
+    """
+
+    def __init__(self, scheduler, workers=2):
+        """
+        Args:
+            scheduler: DetectorScheduler 객체 (인식 함수 등록 완료 상태)
+            workers (int): 스레드 수 (카메라 수 이상이면 모든 카메라 동시 처리)
+        """
+        self.scheduler = scheduler
+        self.executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="vision")
+        self.pending = {}           # {seq: (제출 시각, [Future, ...])}
+
+        # 통계
+        self.frames = 0
+        self.wall_total = 0.0       # submit ~ collect 누적 시간 (s, 메인 스레드 처리 포함)
+        self.vision_total = 0.0     # 카메라별 처리 시간 최댓값 누적 (s, 병렬 인식 시간)
+        self.camera_total = 0.0     # 카메라별 처리 시간 합계 누적 (s, 순차 실행했을 때 시간)
+
+    def run_camera(self, seq, camera, frame):
+        """스레드에서 실행: 카메라 1개 인식 (seq와 처리 시간을 같이 반환)"""
+        start = time.perf_counter()
+        results = self.scheduler.run_camera(seq, camera, frame)
+        return seq, results, time.perf_counter() - start
+
+    def submit(self, seq, frames):
+        """
+        한 프레임 인식 작업 제출 (바로 반환)
+
+        Args:
+            seq (int): 프레임 번호
+            frames (dict): {카메라 번호: 프레임 또는 FrameContext}
+
+        Returns:
+            int: seq (collect에 사용)
+        """
+        if seq in self.pending:
+            raise ValueError(f"이미 제출한 프레임 번호: {seq}")
+
+        futures = [self.executor.submit(self.run_camera, seq, camera, frames.get(camera))
+                   for camera in self.scheduler.cameras()]
+        self.pending[seq] = (time.perf_counter(), futures)
+        return seq
+
+    def collect(self, seq):
+        """
+        프레임 인식 결과 모으기 (모든 카메라 작업이 끝날 때까지 대기)
+
+        Args:
+            seq (int): submit에서 받은 프레임 번호
+
+        Returns:
+            dict: {이름: 결과} - 모든 카메라 인식 결과
+        """
+        start, futures = self.pending.pop(seq)
+
+        results = {}
+        busy = slowest = 0.0
+        for future in futures:
+            result_seq, camera_results, elapsed = future.result()
+            if result_seq != seq:
+                raise RuntimeError(f"프레임 번호 불일치: {result_seq} != {seq}")
+            results.update(camera_results)
+            busy += elapsed
+            slowest = max(slowest, elapsed)
+
+        # 예산은 인식 시간으로만 판단 (submit ~ collect 사이 메인 스레드 작업은 제외)
+        self.scheduler.finish_frame(slowest)
+        self.frames += 1
+        self.wall_total += time.perf_counter() - start
+        self.vision_total += slowest
+        self.camera_total += busy
+        return results
+
+    def process(self, seq, frames):
+        """submit + collect (한 번에 실행)"""
+        return self.collect(self.submit(seq, frames))
+
+    def get_stats(self):
+        """
+        병렬 처리 통계
+
+        Returns:
+            dict: {'frames', 'vision_ms': 프레임당 병렬 인식 시간 (가장 느린 카메라),
+                   'wall_ms': submit ~ collect 시간 (메인 스레드 처리 포함),
+                   'serial_ms': 순차 실행 시 예상 시간}
+        """
+        if self.frames == 0:
+            return {'frames': 0, 'vision_ms': 0.0, 'wall_ms': 0.0, 'serial_ms': 0.0}
+        return {
+            'frames': self.frames,
+            'vision_ms': self.vision_total / self.frames * 1000,
+            'wall_ms': self.wall_total / self.frames * 1000,
+            'serial_ms': self.camera_total / self.frames * 1000
+        }
+
+    def close(self):
+        """스레드 풀 종료 (진행 중인 작업은 끝날 때까지 대기)"""
+        self.executor.shutdown(wait=True)
+        self.pending.clear()
@@ -0,0 +1,232 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: scheduler.py
+  인식 함수 주기 실행 스케줄러
+
+  기능:
+  1) 인식 함수별 실행 주기(period)와 위상(phase) 설정
+     - 예: 차선 매 프레임, 신호등 3프레임마다, 정지선 2프레임마다
+     - 위상을 다르게 주면 느린 인식 함수가 같은 프레임에 몰리지 않음
+  2) 인식 함수별 처리 시간 측정 (지수 이동 평균)
+  3) 프레임 시간 예산 관리
+     - 필수(required) 함수는 항상 실행 (차선)
+     - 나머지는 우선순위 순으로, 예상 시간이 남은 예산을 넘으면 다음 프레임으로 미룸
+     - 미룬 함수가 다음 주기까지 실행되지 못하면 건너뜀(skip)으로 기록
+     - max_defer 프레임 연속으로 미룬 함수는 예산과 관계없이 강제 실행
+       (필수 함수만으로 예산이 차도 신호등/정지선 결과가 끝없이 오래되지 않게)
+  4) 예산 초과 통계
+  5) 카메라별 실행 (run_camera) - pipeline.CameraPipeline이 카메라마다 다른 스레드에서 호출
+-------------------------------------------------------------------
+"""
+
+import time
+
+
+# ==================== 인식 함수 정보 ====================
+class ScheduledDetector(object):
+    """스케줄러에 등록된 인식 함수 1개의 설정 + 통계"""
+
+    def __init__(self, name, func, camera=0, period=1, phase=0, priority=0, required=False):
+        self.name = name
+        self.func = func
+        self.camera = camera
+        self.period = max(int(period), 1)
+        self.phase = phase % self.period
+        self.priority = priority
+        self.required = required
+
+        self.pending = False        # 실행 시점이 됐지만 아직 실행 못 함 (미룸)
+        self.waited = 0             # 연속으로 미룬 프레임 수 (실행하면 0)
+        self.result = None          # 마지막 실행 결과
+        self.last_frame = None      # 마지막 실행 프레임 번호
+
+        # 통계
+        self.runs = 0               # 실행 횟수
+        self.deferred = 0           # 예산 부족으로 미룬 횟수
+        self.skipped = 0            # 미루다가 다음 주기가 와서 건너뛴 횟수
+        self.forced = 0             # max_defer 넘게 미뤄서 강제 실행한 횟수
+        self.total = 0.0            # 누적 처리 시간 (s)
+        self.worst = 0.0            # 최대 처리 시간 (s)
+        self.estimate = 0.0         # 예상 처리 시간 (s, 지수 이동 평균)
+
+    def due(self, frame_index):
+        """이번 프레임이 실행 주기인지 확인"""
+        return frame_index % self.period == self.phase
+
+
+# ==================== 스케줄러 ====================
+class DetectorScheduler(object):
+    """
+    프레임 예산 기반 다중 주기 스케줄러
+
+    사용법:
+        scheduler = DetectorScheduler(budget_ms=60)
+        scheduler.register('lane', sensors.get_lane_direction, required=True)
+        scheduler.register('traffic_light', sensors.get_traffic_light, period=3, priority=2)
+
+        results = scheduler.run(frame_count, {0: ctx0, 1: ctx1})
+        direction = results['lane']
+    """
+
+    def __init__(self, budget_ms=60, smoothing=0.2, max_defer=3):
+        """
+        Args:
+            budget_ms (float): 프레임당 인식 시간 예산 (ms)
+            smoothing (float): 처리 시간 이동 평균 가중치 (0~1, 클수록 최근 값 반영)
+            max_defer (int): 이 프레임 수만큼 연속으로 미룬 함수는 예산을 넘어도 실행
+        """
+        self.budget = budget_ms / 1000.0
+        self.smoothing = smoothing
+        self.max_defer = max_defer
+        self.detectors = []
+
+        # 통계
+        self.frames = 0             # 실행한 프레임 수
+        self.overrun_frames = 0     # 예산을 넘긴 프레임 수
+        self.overrun_total = 0.0    # 예산 초과 누적 시간 (s)
+        self.last_elapsed = 0.0     # 마지막 프레임 인식 시간 (s)
+
+    def register(self, name, func, camera=0, period=1, phase=0, priority=0, required=False):
+        """
+        인식 함수 등록
+
+        Args:
+            name (str): 결과 이름 (run 반환 딕셔너리 키)
+            func: 프레임 1개를 받아 결과를 반환하는 함수
+            camera (int): 입력 카메라 번호 (run의 frames 딕셔너리 키)
+            period (int): 실행 주기 (프레임)
+            phase (int): 실행 위상 (frame_index % period == phase인 프레임에 실행)
+            priority (int): 우선순위 (클수록 먼저 실행, 예산 부족 시 낮은 것부터 미룸)
+            required (bool): True면 예산과 관계없이 매 주기 실행
+
+        Returns:
+            ScheduledDetector: 등록 정보
+        """
+        detector = ScheduledDetector(name, func, camera, period, phase, priority, required)
+        self.detectors.append(detector)
+        # 필수 함수 먼저, 그다음 우선순위 높은 순
+        self.detectors.sort(key=lambda d: (not d.required, -d.priority))
+        return detector
+
+    def cameras(self):
+        """등록된 인식 함수가 사용하는 카메라 번호 목록"""
+        return sorted(set(detector.camera for detector in self.detectors))
+
+    def run(self, frame_index, frames):
+        """
+        한 프레임 스케줄 실행 (모든 카메라를 현재 스레드에서 순서대로)
+
+        Args:
+            frame_index (int): 프레임 번호
+            frames (dict): {카메라 번호: 프레임 또는 FrameContext}
+                           없는 카메라(None)의 인식 함수는 실행 안 함
+
+        Returns:
+            dict: {이름: 결과} - 이번 프레임에 실행하지 않은 함수는 마지막 결과
+        """
+        start = time.perf_counter()
+        results = {}
+        for camera in self.cameras():
+            results.update(self.run_camera(frame_index, camera, frames.get(camera), start))
+        self.finish_frame(time.perf_counter() - start)
+        return results
+
+    def run_camera(self, frame_index, camera, frame, start=None):
+        """
+        카메라 1개의 인식 함수만 실행 (카메라별 스레드에서 호출 가능)
+
+        Args:
+            frame_index (int): 프레임 번호
+            camera (int): 카메라 번호
+            frame: 해당 카메라 프레임 또는 FrameContext (None이면 실행 안 함)
+            start (float): 예산 계산 시작 시각 (None이면 지금부터, 카메라별 예산)
+
+        Returns:
+            dict: {이름: 결과} - 해당 카메라 인식 함수만
+        """
+        if start is None:
+            start = time.perf_counter()
+
+        results = {}
+        for detector in self.detectors:
+            if detector.camera != camera:
+                continue
+            results[detector.name] = detector.result
+
+            if detector.due(frame_index):
+                if detector.pending:
+                    detector.skipped += 1
+                detector.pending = True
+
+            if not detector.pending or frame is None:
+                continue
+
+            elapsed = time.perf_counter() - start
+            if not detector.required and elapsed + detector.estimate > self.budget:
+                if detector.waited < self.max_defer:
+                    detector.deferred += 1
+                    detector.waited += 1
+                    continue
+                detector.forced += 1
+
+            self.execute(detector, frame, frame_index)
+            results[detector.name] = detector.result
+
+        return results
+
+    def finish_frame(self, elapsed):
+        """프레임 인식 시간 기록 + 예산 초과 통계"""
+        self.last_elapsed = elapsed
+        self.frames += 1
+        if elapsed > self.budget:
+            self.overrun_frames += 1
+            self.overrun_total += elapsed - self.budget
+
+    def execute(self, detector, frame, frame_index):
+        """인식 함수 1개 실행 + 처리 시간 기록"""
+        begin = time.perf_counter()
+        detector.result = detector.func(frame)
+        cost = time.perf_counter() - begin
+
+        detector.pending = False
+        detector.waited = 0
+        detector.last_frame = frame_index
+        detector.runs += 1
+        detector.total += cost
+        detector.worst = max(detector.worst, cost)
+        if detector.runs == 1:
+            detector.estimate = cost
+        else:
+            detector.estimate += self.smoothing * (cost - detector.estimate)
+
+    def age(self, name, frame_index):
+        """결과가 몇 프레임 전에 계산됐는지 (한 번도 실행 안 했으면 None)"""
+        for detector in self.detectors:
+            if detector.name == name:
+                return None if detector.last_frame is None else frame_index - detector.last_frame
+        raise KeyError(name)
+
+    def get_stats(self):
+        """
+        스케줄러 통계
+
+        Returns:
+            dict: {'frames', 'overrun_frames', 'overrun_ms',
+                   'detectors': {이름: {'runs', 'deferred', 'skipped', 'forced', 'mean_ms', 'max_ms'}}}
+        """
+        return {
+            'frames': self.frames,
+            'overrun_frames': self.overrun_frames,
+            'overrun_ms': self.overrun_total * 1000,
+            'detectors': {
+                d.name: {
+                    'runs': d.runs,
+                    'deferred': d.deferred,
+                    'skipped': d.skipped,
+                    'forced': d.forced,
+                    'mean_ms': d.total / d.runs * 1000 if d.runs else 0.0,
+                    'max_ms': d.worst * 1000
+                }
+                for d in self.detectors
+            }
+        }
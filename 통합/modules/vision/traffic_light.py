@@ -0,0 +1,205 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: traffic_light.py
+  신호등 인식 엔진 모듈
+
+  기능:
+  1) 신호등 인식 엔진 선택 ('hough' / 'blob')
+     - hough : libCAMERA.object_detection (Hough Circle)
+     - blob  : libCAMERA.blob_detection (연결 요소 + 원형도 필터)
+  2) 최근 N 프레임 투표로 결과 안정화
+  3) 신호등 추적 (마지막 위치 주변만 검색, 주기적 전체 재검색)
+  4) 엔진별 처리 시간 통계 (벤치마크용)
+-------------------------------------------------------------------
+"""
+
+import time
+from collections import deque, Counter
+
+ENGINES = ('hough', 'blob')
+TRACK_MIN_PADDING = 50          # 추적 창 최소 여백 (픽셀, Hough 최소 반지름 40 이상)
+
+
+# ==================== 신호등 인식기 ====================
+class TrafficLightDetector(object):
+    """
+    신호등 인식 엔진 + 시간 투표
+
+    사용법:
+        detector = TrafficLightDetector(camera, engine='blob')
+        color, confidence = detector.detect(frame)
+    """
+
+    def __init__(self, camera, engine='hough', vote_frames=5, sample=16,
+                 label_mode='hsv', min_area=100, max_area=40000,
+                 track_padding=1.0, reacquire_frames=0):
+        """
+        Args:
+            camera: libCAMERA 객체
+            engine (str): 'hough' 또는 'blob'
+            vote_frames (int): 투표에 사용할 최근 프레임 수 (1이면 투표 없음)
+            sample (int): hough 엔진의 색상 검증 영역 크기 (픽셀)
+            label_mode (str): 색상 분류 방식 ('hsv' 또는 'lut')
+            min_area, max_area (int): blob 엔진의 신호등 면적 범위 (픽셀)
+            track_padding (float): 추적 창 여백 (신호등 크기 대비 배수)
+            reacquire_frames (int): 추적 중 전체 재검색 주기 (프레임, 0이면 추적 안 함)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"알 수 없는 신호등 엔진: {engine} (가능: {ENGINES})")
+
+        self.camera = camera
+        self.engine = engine
+        self.sample = sample
+        self.label_mode = label_mode
+        self.min_area = min_area
+        self.max_area = max_area
+
+        self.votes = deque(maxlen=max(vote_frames, 1))
+        self.color = None
+        self.confidence = 0.0
+
+        # 엔진별 처리 시간 통계 {engine: [프레임 수, 누적 시간(s), 최대 시간(s)]}
+        self.timing = {name: [0, 0.0, 0.0] for name in ENGINES}
+
+        # 추적 상태
+        self.track_padding = track_padding
+        self.reacquire_frames = reacquire_frames
+        self.box = None                 # 마지막 신호등 위치 (x, y, w, h), 전체 영상 기준
+        self.frames_since_full = 0      # 마지막 전체 검색 이후 프레임 수
+        self.roi_frames = 0             # 추적 창만 검색한 프레임 수
+
+    def search_window(self, shape):
+        """
+        이번 프레임 검색 영역 결정
+
+        Args:
+            shape: 영상 크기 (row, col, dim)
+
+        Returns:
+            tuple: (x0, y0, x1, y1) 추적 창, 전체 검색이면 None
+        """
+        if self.reacquire_frames <= 0 or self.box is None:
+            return None
+        if self.frames_since_full >= self.reacquire_frames:
+            return None
+
+        x, y, w, h = self.box
+        pad = max(int(max(w, h) * self.track_padding), TRACK_MIN_PADDING)
+        x0, y0 = max(x - pad, 0), max(y - pad, 0)
+        x1, y1 = min(x + w + pad, shape[1]), min(y + h + pad, shape[0])
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def detect_frame(self, frame, engine=None):
+        """
+        한 프레임만 인식 (투표 없음)
+
+        Args:
+            frame: OpenCV 영상 프레임 또는 FrameContext (전체 검색 시 색상 분류 결과 공유)
+            engine (str): 사용할 엔진 (None이면 기본 엔진)
+
+        Returns:
+            tuple: (색상 문자열 또는 None, 신뢰도 0.0~1.0)
+        """
+        engine = engine or self.engine
+        start = time.perf_counter()
+
+        # 추적 중이면 마지막 위치 주변만 검색
+        ctx = self.camera.frame_context(frame)
+        window = self.search_window(ctx.img.shape)
+        if window is None:
+            x0, y0 = 0, 0
+            frame = ctx
+            self.frames_since_full = 0
+        else:
+            x0, y0, x1, y1 = window
+            frame = ctx.img[y0:y1, x0:x1]
+            self.frames_since_full += 1
+            self.roi_frames += 1
+
+        if engine == 'blob':
+            color, confidence = self.camera.blob_detection(
+                frame,
+                min_area=self.min_area,
+                max_area=self.max_area,
+                label_mode=self.label_mode
+            )
+        else:
+            color = self.camera.object_detection(
+                frame,
+                sample=self.sample,
+                label_mode=self.label_mode
+            )
+            confidence = 1.0 if color is not None else 0.0
+
+        # 위치 갱신 (놓치면 다음 프레임 전체 재검색)
+        box = self.camera.detected_box
+        if color is not None and box is not None:
+            self.box = (box[0] + x0, box[1] + y0, box[2], box[3])
+        else:
+            self.box = None
+
+        elapsed = time.perf_counter() - start
+        stat = self.timing[engine]
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] = max(stat[2], elapsed)
+
+        return color, confidence
+
+    def detect(self, frame):
+        """
+        신호등 인식 + 최근 N 프레임 투표
+
+        Args:
+            frame: OpenCV 영상 프레임 또는 FrameContext
+
+        Returns:
+            tuple: (색상 문자열 또는 None, 신뢰도 0.0~1.0)
+                   신뢰도 = 투표 비율 x 평균 프레임 신뢰도
+        """
+        color, confidence = self.detect_frame(frame)
+        self.votes.append((color, confidence))
+
+        counter = Counter(c for c, _ in self.votes if c is not None)
+        if not counter:
+            self.color, self.confidence = None, 0.0
+            return self.color, self.confidence
+
+        winner, count = counter.most_common(1)[0]
+        if count * 2 < len(self.votes):
+            # 과반 미달이면 미확정
+            self.color, self.confidence = None, 0.0
+            return self.color, self.confidence
+
+        scores = [s for c, s in self.votes if c == winner]
+        self.color = winner
+        self.confidence = count / self.votes.maxlen * sum(scores) / len(scores)
+        return self.color, self.confidence
+
+    def reset(self):
+        """투표 기록 및 추적 상태 초기화 (신호등 구간 재진입 시)"""
+        self.votes.clear()
+        self.color, self.confidence = None, 0.0
+        self.box = None
+        self.frames_since_full = 0
+
+    def get_stats(self):
+        """
+        엔진별 처리 시간 통계
+
+        Returns:
+            dict: {engine: {'frames': int, 'mean_ms': float, 'max_ms': float}}
+                  'roi_frames': 추적 창만 검색한 프레임 수
+        """
+        stats = {}
+        for name, (frames, total, worst) in self.timing.items():
+            if frames > 0:
+                stats[name] = {
+                    'frames': frames,
+                    'mean_ms': total / frames * 1000,
+                    'max_ms': worst * 1000
+                }
+        stats['roi_frames'] = self.roi_frames
+        return stats
@@ -0,0 +1,294 @@
+"""
+-------------------------------------------------------------------
+  FILE NAME: workers.py
+  프로세스 기반 비전 작업 모듈
+
+  기능:
+  1) 인식 작업(차선, 신호등)을 각각 별도 프로세스에서 실행
+     - 파이썬 후처리(직선/원 반복문)가 GIL을 잡고 있어도
+       메인 프로세스의 시리얼 통신/제어는 멈추지 않음
+  2) 공유 메모리 링 버퍼로 프레임 전달 (pickle 복사 없음)
+     - 고정 크기 슬롯 N개, 슬롯마다 프레임 번호(seq) 기록
+     - 작업 프로세스는 처리 전후로 seq를 확인해서 덮어쓴 프레임 결과는 버림
+  3) 작업 지시/결과는 작은 튜플만 큐로 전달
+     - 지시: (seq, 파라미터), 결과: (이름, seq, 결과, 버림 여부, 밀린 작업 수, 처리 시간)
+     - 작업이 밀리면 가장 최근 프레임만 처리
+
+  작업 함수 조건 (spawn 방식이라 모듈 최상위 함수여야 함):
+    setup()                      → 작업 프로세스 안에서 1회 호출, 상태 객체 반환
+    process(state, frame, params) → 프레임 1개 처리 결과 반환
+-------------------------------------------------------------------
+"""
+
+import time
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+SEQ_BYTES = 8       # 슬롯별 프레임 번호 크기 (int64)
+EMPTY_SEQ = -1      # 비어 있거나 쓰는 중인 슬롯
+
+
+# ==================== 공유 메모리 링 버퍼 ====================
+class FrameRing(object):
+    """
+    고정 크기 프레임 슬롯 링 버퍼 (공유 메모리)
+
+    메모리 구조: [seq 0 .. seq N-1][프레임 0 .. 프레임 N-1]
+    프레임 seq는 슬롯 seq % N에 저장
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        """
+        Args:
+            shape (tuple): 프레임 크기 (row, col, dim), uint8
+            slots (int): 슬롯 개수
+            name (str): 공유 메모리 이름 (None이면 새로 생성, 있으면 연결)
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = name is None
+        frame_bytes = int(np.prod(self.shape))
+
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * (SEQ_BYTES + frame_bytes))
+        else:
+            # 연결만 함 (삭제는 생성한 프로세스가 close에서 처리)
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=slots * SEQ_BYTES)
+        if self.owner:
+            self.seqs[:] = EMPTY_SEQ
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, seq, frame):
+        """프레임 저장 (쓰는 동안 슬롯 seq = EMPTY_SEQ)"""
+        if frame.shape != self.shape:
+            # 그대로 대입하면 브로드캐스트 오류 또는 잘못된 영상 (그레이 → 컬러 등)
+            raise ValueError(f"프레임 크기가 링 버퍼와 다릅니다: {frame.shape} != {self.shape} "
+                             f"(카메라 해상도가 바뀌었거나 드라이버가 다른 크기를 보냄)")
+        slot = seq % self.slots
+        self.seqs[slot] = EMPTY_SEQ
+        self.frames[slot] = frame
+        self.seqs[slot] = seq
+
+    def read(self, seq):
+        """
+        프레임 읽기 (복사 없는 view)
+
+        Returns:
+            numpy.ndarray: 프레임 view, 이미 다른 프레임으로 덮어썼으면 None
+        """
+        if not self.valid(seq):
+            return None
+        return self.frames[seq % self.slots]
+
+    def valid(self, seq):
+        """슬롯에 아직 seq 프레임이 있는지 확인 (처리 후 다시 확인해서 덮어쓰기 감지)"""
+        return int(self.seqs[seq % self.slots]) == seq
+
+    def close(self):
+        """공유 메모리 연결 해제 (생성한 쪽이면 삭제)"""
+        self.seqs, self.frames = None, None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ==================== 작업 프로세스 ====================
+def worker_main(name, setup, process, ring_name, shape, slots, tasks, results):
+    """
+    작업 프로세스 본체
+
+    Args:
+        name (str): 작업 이름
+        setup, process: 작업 함수 (모듈 설명 참고)
+        ring_name (str): 공유 메모리 이름
+        shape (tuple), slots (int): 링 버퍼 구조
+        tasks: 작업 지시 큐 ((seq, params) 또는 종료 신호 None)
+        results: 결과 큐
+    """
+    ring = FrameRing(shape, slots, ring_name)
+    state = setup()
+
+    try:
+        while True:
+            task = tasks.get()
+
+            # 밀린 지시는 가장 최근 것만 처리
+            skipped = 0
+            while task is not None:
+                try:
+                    newer = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                task = newer
+                skipped += 1 if newer is not None else 0
+            if task is None:
+                break
+
+            seq, params = task
+            start = time.perf_counter()
+            result = None
+            frame = ring.read(seq)
+            stale = frame is None
+            if not stale:
+                result = process(state, frame, params)
+                stale = not ring.valid(seq)
+                frame = None
+            results.put((name, seq, None if stale else result, stale, skipped,
+                         time.perf_counter() - start))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+# ==================== 작업 프로세스 관리 ====================
+class VisionWorkers(object):
+    """
+    비전 작업 프로세스 관리자
+
+    사용법:
+        workers = VisionWorkers(frame.shape, slots=4)
+        workers.add('lane', sensors.new_lane_worker, sensors.detect_lane)
+        workers.submit(seq, frame, {'lane': params})
+        ... (라이다, 초음파 처리)
+        lane = workers.wait('lane', seq, timeout=0.1)
+        workers.close()
+    """
+
+    def __init__(self, shape, slots=4):
+        """
+        Args:
+            shape (tuple): 프레임 크기 (row, col, dim)
+            slots (int): 링 버퍼 슬롯 개수 (작업 프로세스가 밀려도 덮어쓰지 않을 만큼)
+        """
+        # Windows와 같은 spawn 방식 (카메라/시리얼 핸들이 작업 프로세스로 복제되지 않음)
+        self.context = mp.get_context('spawn')
+        self.ring = FrameRing(shape, slots)
+        self.results = self.context.Queue()
+        self.workers = {}           # {이름: (프로세스, 지시 큐)}
+        self.latest = {}            # {이름: (seq, 결과)} - 버리지 않은 마지막 결과
+        self.processed = {}         # {이름: seq} - 처리 끝난 마지막 프레임 번호 (버린 것 포함)
+        self.stats = {}             # {이름: [결과 수, 버린 프레임 수, 밀린 작업 수, 대기 시간 초과, 누적 처리 시간(s)]}
+
+    def add(self, name, setup, process):
+        """
+        작업 프로세스 시작
+
+        Args:
+            name (str): 작업 이름 (결과 이름)
+            setup: 작업 프로세스 안에서 상태 객체를 만드는 함수
+            process: 프레임 처리 함수 (state, frame, params) → 결과
+        """
+        tasks = self.context.Queue()
+        worker = self.context.Process(
+            target=worker_main,
+            args=(name, setup, process, self.ring.name, self.ring.shape, self.ring.slots, tasks, self.results),
+            name=f"vision-{name}",
+            daemon=True
+        )
+        worker.start()
+        self.workers[name] = (worker, tasks)
+        self.stats[name] = [0, 0, 0, 0, 0.0]
+
+    def submit(self, seq, frame, jobs):
+        """
+        프레임 전달 + 작업 지시
+
+        Args:
+            seq (int): 프레임 번호
+            frame: OpenCV 영상 프레임 (shape가 링 버퍼와 같아야 함)
+            jobs (dict): {작업 이름: 파라미터} - 이번 프레임을 처리할 작업만
+        """
+        self.ring.write(seq, frame)
+        for name, params in jobs.items():
+            self.workers[name][1].put((seq, params))
+
+    def poll(self, block=False, timeout=None):
+        """결과 큐 비우기 (block이면 결과 1개 이상 올 때까지 대기)"""
+        try:
+            while True:
+                name, seq, result, stale, skipped, elapsed = self.results.get(block, timeout)
+                block = False
+                stat = self.stats[name]
+                stat[0] += 1
+                stat[1] += stale
+                stat[2] += skipped
+                stat[4] += elapsed
+                self.processed[name] = max(seq, self.processed.get(name, -1))
+                if not stale and seq >= self.latest.get(name, (-1, None))[0]:
+                    self.latest[name] = (seq, result)
+        except queue.Empty:
+            pass
+
+    def wait(self, name, seq, timeout=None):
+        """
+        작업 결과 대기 (seq 프레임 이상 결과가 올 때까지)
+
+        Args:
+            name (str): 작업 이름
+            seq (int): 프레임 번호
+            timeout (float): 최대 대기 시간 (s, None이면 무한 대기)
+
+        Returns:
+            결과 (시간 초과이거나 프레임을 덮어써서 버렸으면 None)
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        self.poll()
+        while self.processed.get(name, -1) < seq:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                self.stats[name][3] += 1
+                return None
+            self.poll(block=True, timeout=remaining)
+
+        latest_seq, result = self.latest.get(name, (-1, None))
+        return result if latest_seq >= seq else None
+
+    def get(self, name):
+        """가장 최근 결과 (기다리지 않음, 아직 없으면 None)"""
+        self.poll()
+        return self.latest.get(name, (-1, None))[1]
+
+    def age(self, name, seq):
+        """결과가 몇 프레임 전 프레임으로 계산됐는지 (아직 결과가 없으면 None)"""
+        self.poll()
+        latest = self.latest.get(name)
+        return None if latest is None else seq - latest[0]
+
+    def get_stats(self):
+        """
+        작업별 통계
+
+        Returns:
+            dict: {이름: {'results', 'stale', 'skipped', 'timeouts', 'mean_ms'}}
+        """
+        return {
+            name: {
+                'results': count,
+                'stale': stale,
+                'skipped': skipped,
+                'timeouts': timeouts,
+                'mean_ms': total / count * 1000 if count else 0.0
+            }
+            for name, (count, stale, skipped, timeouts, total) in self.stats.items()
+        }
+
+    def close(self):
+        """작업 프로세스 종료 + 공유 메모리 삭제"""
+        for worker, tasks in self.workers.values():
+            tasks.put(None)
+        for worker, tasks in self.workers.values():
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers.clear()
+        self.ring.close()
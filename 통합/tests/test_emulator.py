@@ -0,0 +1,177 @@
+"""
+-------------------------------------------------------------------
+  아두이노 에뮬레이터 통신 테스트 프로그램
+
+  목적: 실제 보드 없이 (Linux) PC 쪽 시리얼 처리 성능 측정
+        - 통신 방식 협상 (텍스트 / 바이너리)
+        - 초음파 수신 처리량, 덮어쓴 값(dropped), 파싱 오류
+        - 명령 전송 → 아두이노 처리까지 지연 시간 (ACK 왕복 지연 포함)
+        - 전방 센서만 측정할 때 갱신 주기 (측정 센서 선택)
+        - 튀는 값이 섞일 때 중앙값 필터 효과
+        - PC가 읽지 않을 때 수신 버퍼 증가량
+        - 하트비트가 끊겼을 때 워치독 정지
+
+  실행 방법:
+    python tests/test_emulator.py
+
+  종료 방법:
+    Ctrl + C
+-------------------------------------------------------------------
+"""
+
+import sys
+import os
+import time
+import random
+import serial
+
+# 프로젝트 루트 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.vehicle.emulator import ArduinoEmulator
+from modules.vehicle.protocol import ArduinoLink, SENSOR_KEYS
+from modules.vehicle.ultrasonic import UltrasonicReader
+from modules.vehicle.latency import LatencyTracker
+import config
+
+TEST_SECONDS = 3            # 수신 처리량 측정 시간
+LATENCY_SAMPLES = 20        # 명령 지연 측정 횟수
+SPIKE_RATE = 0.2            # 튀는 값 확률 (중앙값 필터 테스트)
+SPIKE_ERROR = 20            # 이보다 크게 다르면 틀린 값 (cm)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run_protocol(protocol):
+    """통신 방식 1개 테스트"""
+    print("\n" + "=" * 60)
+    print(f"통신 방식: {protocol}")
+    print("=" * 60)
+
+    emulator = ArduinoEmulator(distances={'F': 30, 'R': 0}, noise=1.0, dropout=0.02, seed=1)
+    emulator.start()
+    arduino = serial.Serial(emulator.port, config.BAUDRATE, timeout=1)
+    reader = None
+
+    try:
+        # 1. 방식 협상
+        tracker = LatencyTracker()
+        link = ArduinoLink(arduino, tracker, text_ack=True)
+        mode = link.handshake(protocol)
+        print(f"[1] 협상 결과: {mode}")
+
+        # 2. 수신 처리량
+        reader = UltrasonicReader(arduino, mode, tracker)
+        reader.start()
+        time.sleep(TEST_SECONDS)
+        data, stamp, seq, dropped = reader.snapshot()
+        stats = emulator.get_stats()
+        print(f"[2] 수신 {seq}개 / {TEST_SECONDS}초 ({seq / TEST_SECONDS:.1f}Hz), "
+              f"아두이노 루프 평균 {stats['loop_ms']:.1f}ms")
+        print(f"    마지막 값: {data}")
+        print(f"    dropped {dropped}, 오류 {reader.errors}, 유실 {reader.lost}, "
+              f"값 나이 {reader.age() * 1000:.1f}ms")
+
+        # 3. 명령 지연 (PC 전송 → 아두이노 loop에서 처리)
+        latencies = []
+        for i in range(LATENCY_SAMPLES):
+            time.sleep(random.uniform(0, 0.15))   # 아두이노 루프와 시점을 어긋나게
+            count = emulator.commands
+            sent = time.monotonic()
+            link.send_command('F' if i % 2 == 0 else 'S')
+            while emulator.commands == count:
+                time.sleep(0.001)
+            latencies.append((emulator.last_command_stamp - sent) * 1000)
+        print(f"[3] 명령 지연: p50 {percentile(latencies, 50):.1f}ms, "
+              f"p95 {percentile(latencies, 95):.1f}ms, 최대 {max(latencies):.1f}ms")
+        time.sleep(0.3)   # 마지막 ACK 대기
+        print(f"    ACK: {tracker.summary()}")
+
+        # 4. 전방 센서만 측정 (측정 센서 선택)
+        link.send_sensor_set(('F', 'FL', 'FR'))
+        time.sleep(0.3)
+        _, _, start_seq, _ = reader.snapshot()
+        loops = emulator.loops
+        time.sleep(TEST_SECONDS)
+        data, _, seq, _ = reader.snapshot()
+        print(f"[4] 전방 센서만 측정 ({', '.join(emulator.get_stats()['active'])}): "
+              f"{(seq - start_seq) / TEST_SECONDS:.1f}Hz, "
+              f"아두이노 루프 {TEST_SECONDS * 1000 / max(emulator.loops - loops, 1):.1f}ms")
+        print(f"    마지막 값: {data}, 전방 측정 {'최근' if reader.state.covered('front') else '없음'} / "
+              f"후방 측정 {'최근' if reader.state.covered('rear') else '오래됨 (판단 불가)'}")
+
+        # 5. 튀는 값 걸러내기 (전방 센서 값이 실제 거리와 SPIKE_ERROR 넘게 다른 비율)
+        emulator.spikes = SPIKE_RATE
+        truth = [emulator.distances[key] for key in ('F', 'FL', 'FR')]
+        samples = raw_errors = filtered_errors = 0
+        last_seq = reader.snapshot()[2]
+        end = time.monotonic() + TEST_SECONDS
+        while time.monotonic() < end:
+            time.sleep(0.005)
+            seq = reader.snapshot()[2]
+            if seq == last_seq:
+                continue
+            last_seq = seq
+            _, filtered = reader.state.fresh_values('front')
+            raw = reader.state.raw[:3]
+            samples += 1
+            raw_errors += any(cm > 0 and abs(cm - real) > SPIKE_ERROR for cm, real in zip(raw, truth))
+            filtered_errors += any(cm != float('inf') and abs(cm - real) > SPIKE_ERROR
+                                   for cm, real in zip(filtered, truth))
+        emulator.spikes = 0.0
+        distance, sensor = reader.state.group_min('front')
+        print(f"[5] 튀는 값 {SPIKE_RATE * 100:.0f}%: 틀린 값 비율 원래 값 {raw_errors / max(samples, 1) * 100:.0f}% → "
+              f"중앙값 필터 {filtered_errors / max(samples, 1) * 100:.0f}% ({samples}회)")
+        print(f"    전방 최소 {distance}cm ({sensor}), {reader.state.summary('front')}")
+        link.send_sensor_set(SENSOR_KEYS)
+
+        # 6. PC가 읽지 않을 때 버퍼 증가
+        reader.stop()
+        arduino.reset_input_buffer()
+        time.sleep(1.0)
+        waiting = arduino.in_waiting
+        print(f"[6] 1초 동안 읽지 않으면 수신 버퍼 {waiting} 바이트 증가 "
+              f"(쓰기 막힘 {emulator.get_stats()['write_stalls']})")
+
+        # 7. 워치독 (하트비트 1번 후 끊김)
+        link.send_command('F')
+        link.send_heartbeat()
+        time.sleep(1.0)
+        stats = emulator.get_stats()
+        result = "✓ 정지" if stats['command'] == 'S' and stats['watchdog_trips'] > 0 else "❌ 정지 안 됨"
+        print(f"[7] 하트비트 끊김 후 워치독: {result} (명령 {stats['command']})")
+
+    finally:
+        if reader is not None:
+            reader.stop()
+        arduino.close()
+        emulator.stop()
+
+
+def emulator_test():
+    print("=" * 60)
+    print("아두이노 에뮬레이터 통신 테스트")
+    print("=" * 60)
+
+    try:
+        for protocol in ('text', 'binary'):
+            run_protocol(protocol)
+
+        print("\n" + "=" * 60)
+        print("🎉 에뮬레이터 테스트 완료!")
+        print("=" * 60)
+
+    except KeyboardInterrupt:
+        print("\n\n⚠️ 사용자가 중단했습니다 (Ctrl+C)")
+
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    emulator_test()
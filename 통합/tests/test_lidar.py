@@ -20,11 +20,11 @@
 """
 
 from modules.lidar.Lib_LiDAR import libLidar
+from modules.vehicle import ports
+import config
 import time
 
 # ==================== 설정 ====================
-LIDAR_PORT = 'COM3'  # 라이다 포트 (장치 관리자에서 확인)
-
 # 장애물 감지 설정
 OBSTACLE_ANGLE_MIN = 350    # 전방 감지 시작 각도
 OBSTACLE_ANGLE_MAX = 10     # 전방 감지 끝 각도
@@ -37,14 +37,20 @@ SHOW_ALL_POINTS = False     # True면 모든 포인트 출력, False면 요약
 # ==================== 라이다 초기화 ====================
 def initialize_lidar():
     """라이다 센서 초기화"""
+    # 라이다 포트 (config.LIDAR_PORT, 'auto' = 자동 검색)
+    port = ports.resolve('lidar', config.LIDAR_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if port is None:
+        print("❌ 라이다 포트를 찾지 못했습니다 (config.LIDAR_PORT 직접 설정)")
+        return None
+
     print("=" * 60)
     print("🛰️  라이다 센서 테스트 프로그램")
     print("=" * 60)
-    print(f"\n라이다 포트: {LIDAR_PORT}")
+    print(f"\n라이다 포트: {port}")
     print("초기화 중...\n")
 
     try:
-        lidar = libLidar(LIDAR_PORT)
+        lidar = libLidar(port)
         lidar.init()
 
         # 라이다 모터 시작 (중요!)
@@ -61,7 +67,7 @@ def initialize_lidar():
         print(f"\n❌ 라이다 초기화 실패: {e}")
         print("\n해결 방법:")
         print("1. 라이다가 USB에 연결되어 있는지 확인")
-        print("2. 장치 관리자에서 포트 번호 확인 (COM3, COM4 등)")
+        print("2. 포트 다시 검색: python modules/vehicle/ports.py --rescan (또는 config.LIDAR_PORT 직접 설정)")
         print("3. 다른 프로그램에서 라이다를 사용 중인지 확인")
         return None
 
@@ -18,6 +18,8 @@
 """
 
 from modules.lidar.Lib_LiDAR import libLidar
+from modules.vehicle import ports
+import config
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -25,8 +27,6 @@ from matplotlib.patches import Wedge
 import time
 
 # ==================== 설정 ====================
-LIDAR_PORT = 'COM3'  # 라이다 포트
-
 # 장애물 감지 설정 (180도를 정면으로 설정)
 OBSTACLE_ANGLE_MIN = 170    # 전방 감지 시작 (180도 기준 좌측 10도)
 OBSTACLE_ANGLE_MAX = 190    # 전방 감지 끝 (180도 기준 우측 10도)
@@ -45,18 +45,18 @@ obstacle_detected = False
 nearest_obstacle = 0
 
 # ==================== 라이다 초기화 ====================
-def initialize_lidar():
+def initialize_lidar(port):
     """라이다 센서 초기화"""
     global lidar
 
     print("=" * 60)
     print("🛰️  라이다 센서 실시간 시각화")
     print("=" * 60)
-    print(f"\n라이다 포트: {LIDAR_PORT}")
+    print(f"\n라이다 포트: {port}")
     print("초기화 중...\n")
 
     try:
-        lidar = libLidar(LIDAR_PORT)
+        lidar = libLidar(port)
         lidar.init()
 
         print("\n✅ 라이다 초기화 완료!")
@@ -66,12 +66,12 @@ def initialize_lidar():
         print(f"\n❌ 라이다 초기화 실패: {e}")
         print("\n해결 방법:")
         print("1. 라이다가 USB에 연결되어 있는지 확인")
-        print("2. 장치 관리자에서 포트 번호 확인")
+        print("2. 포트 다시 검색: python modules/vehicle/ports.py --rescan (또는 config.LIDAR_PORT 직접 설정)")
         print("3. 다른 프로그램에서 라이다 사용 중인지 확인")
         return False
 
 # ==================== 스캔 데이터 수집 ====================
-def scan_worker():
+def scan_worker(port):
     """백그라운드에서 스캔 데이터 수집"""
     global scan_data, obstacle_detected, nearest_obstacle
 
@@ -80,7 +80,7 @@ def scan_worker():
 
         # 이 스레드에서 직접 라이다 초기화 (test_lidar.py 방식)
         print("라이다 초기화 중...")
-        lidar_local = libLidar(LIDAR_PORT)
+        lidar_local = libLidar(port)
         lidar_local.init()
         print("✅ 라이다 초기화 완료!")
 
@@ -224,15 +224,21 @@ def update_plot(frame, ax, scatter, obstacle_wedge, text_box):
 def main():
     """메인 함수"""
 
+    # 라이다 포트 (config.LIDAR_PORT, 'auto' = 자동 검색)
+    port = ports.resolve('lidar', config.LIDAR_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if port is None:
+        print("❌ 라이다 포트를 찾지 못했습니다 (config.LIDAR_PORT 직접 설정)")
+        return
+
     print("=" * 60)
     print("🛰️  라이다 센서 실시간 시각화")
     print("=" * 60)
-    print(f"\n라이다 포트: {LIDAR_PORT}")
+    print(f"\n라이다 포트: {port}")
     print("=" * 60)
 
     # 스캔 시작 (백그라운드)
     import threading
-    scan_thread = threading.Thread(target=scan_worker, daemon=True)
+    scan_thread = threading.Thread(target=scan_worker, args=(port,), daemon=True)
     scan_thread.start()
 
     # 시각화 준비
@@ -23,13 +23,20 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 # 프로젝트 루트 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import config
+from modules.vehicle import ports
 
 def test_sensor_debug():
     """센서 디버깅"""
+    # 아두이노 포트 (config.ARDUINO_PORT, 'auto' = 자동 검색)
+    port = ports.resolve('arduino', config.ARDUINO_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if port is None:
+        print("❌ 아두이노 포트를 찾지 못했습니다 (config.ARDUINO_PORT 직접 설정)")
+        return
+
     print("=" * 70)
     print("초음파 센서 6개 디버깅 프로그램")
     print("=" * 70)
-    print(f"포트: {config.ARDUINO_PORT}")
+    print(f"포트: {port}")
     print(f"통신 속도: {config.BAUDRATE}")
     print("=" * 70)
     print("\n이 프로그램은 아두이노에서 받는 원시 데이터를 그대로 출력합니다.")
@@ -39,7 +46,7 @@ def test_sensor_debug():
     try:
         # 아두이노 연결
         print("\n아두이노 연결 중...")
-        arduino = serial.Serial(config.ARDUINO_PORT, config.BAUDRATE, timeout=1)
+        arduino = serial.Serial(port, config.BAUDRATE, timeout=1)
         time.sleep(2)
         print("✓ 아두이노 연결 완료\n")
 
@@ -107,7 +114,7 @@ def test_sensor_debug():
 
     except serial.SerialException as e:
         print(f"\n❌ 시리얼 포트 오류: {e}")
-        print(f"   - 포트 '{config.ARDUINO_PORT}'가 올바른지 확인하세요")
+        print(f"   - 포트 '{port}'가 올바른지 확인하세요")
 
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
@@ -0,0 +1,126 @@
+"""
+-------------------------------------------------------------------
+  신호등 인식 엔진 비교 테스트 프로그램
+
+  목적: 녹화된 영상(또는 이미지 폴더)으로 hough / blob 두 엔진의
+        인식 결과와 처리 시간을 나란히 비교
+
+  실행 방법:
+    python tests/test_traffic_light.py <영상 파일 또는 이미지 폴더>
+
+  종료 방법:
+    'q' 키 입력 (영상 표시 중) 또는 Ctrl + C
+-------------------------------------------------------------------
+"""
+
+import cv2
+import sys
+import os
+
+# 프로젝트 루트 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils import Function_Library as fl
+from modules.vision.traffic_light import TrafficLightDetector, ENGINES
+import config
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def read_frames(source):
+    """영상 파일 또는 이미지 폴더에서 프레임을 순서대로 생성"""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(source, name))
+                if frame is not None:
+                    yield frame
+    else:
+        capture = cv2.VideoCapture(source)
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            yield frame
+        capture.release()
+
+
+def test_traffic_light(source):
+    """신호등 엔진 비교 테스트"""
+    print("=" * 60)
+    print("신호등 인식 엔진 비교 테스트 프로그램")
+    print("=" * 60)
+    print(f"입력: {source}")
+    print(f"색상 분류: {config.TRAFFIC_LIGHT_LABEL_MODE}")
+    print("-" * 60)
+
+    camera = fl.libCAMERA()
+    detectors = {}
+    for engine in ENGINES:
+        detectors[engine] = TrafficLightDetector(
+            camera,
+            engine=engine,
+            vote_frames=config.TRAFFIC_LIGHT_VOTE_FRAMES,
+            sample=config.TRAFFIC_LIGHT_SAMPLE,
+            label_mode=config.TRAFFIC_LIGHT_LABEL_MODE,
+            min_area=config.TRAFFIC_LIGHT_MIN_AREA,
+            max_area=config.TRAFFIC_LIGHT_MAX_AREA,
+            track_padding=config.TRAFFIC_LIGHT_TRACK_PADDING,
+            reacquire_frames=config.TRAFFIC_LIGHT_REACQUIRE_FRAMES
+        )
+
+    agree_count = 0
+    frame_count = 0
+
+    try:
+        for frame in read_frames(source):
+            frame_count += 1
+
+            results = {}
+            for engine, detector in detectors.items():
+                results[engine] = detector.detect(frame)
+
+            if results['hough'][0] == results['blob'][0]:
+                agree_count += 1
+
+            # 프레임에 결과 표시
+            for idx, (engine, (color, confidence)) in enumerate(results.items()):
+                cv2.putText(frame, f"{engine}: {color} ({confidence:.2f})", (10, 30 + 30 * idx),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+            if config.SHOW_VIDEO:
+                camera.image_show(frame)
+                if camera.loop_break():
+                    print("\n사용자가 종료했습니다 ('q' 키)")
+                    break
+
+            if frame_count % config.DEBUG_PRINT_INTERVAL == 0:
+                summary = ", ".join(f"{e}={c}" for e, (c, _) in results.items())
+                print(f"[프레임 {frame_count}] {summary}")
+
+    except KeyboardInterrupt:
+        print("\n\n사용자가 종료했습니다 (Ctrl+C)")
+
+    finally:
+        if config.SHOW_VIDEO:
+            cv2.destroyAllWindows()
+
+    # 결과 요약
+    print("\n" + "=" * 60)
+    print("엔진별 처리 시간")
+    print("=" * 60)
+    for engine, detector in detectors.items():
+        stats = detector.get_stats().get(engine)
+        if stats is None:
+            continue
+        print(f"  {engine:6s}: 평균 {stats['mean_ms']:6.2f} ms, 최대 {stats['max_ms']:6.2f} ms "
+              f"({stats['frames']} 프레임, 추적 창 검색 {detector.roi_frames} 프레임)")
+    if frame_count > 0:
+        print(f"\n  결과 일치율: {agree_count}/{frame_count} ({agree_count / frame_count * 100:.1f}%)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python tests/test_traffic_light.py <영상 파일 또는 이미지 폴더>")
+        sys.exit(1)
+    test_traffic_light(sys.argv[1])
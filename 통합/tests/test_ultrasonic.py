@@ -26,13 +26,20 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 # 프로젝트 루트 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import config
+from modules.vehicle import ports
 
 def test_ultrasonic():
     """초음파 센서 6개 테스트"""
+    # 아두이노 포트 (config.ARDUINO_PORT, 'auto' = 자동 검색)
+    port = ports.resolve('arduino', config.ARDUINO_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if port is None:
+        print("❌ 아두이노 포트를 찾지 못했습니다 (config.ARDUINO_PORT 직접 설정)")
+        return
+
     print("=" * 60)
     print("초음파 센서 6개 테스트 프로그램")
     print("=" * 60)
-    print(f"포트: {config.ARDUINO_PORT}")
+    print(f"포트: {port}")
     print(f"통신 속도: {config.BAUDRATE}")
     print("종료: Ctrl + C")
     print("-" * 60)
@@ -40,7 +47,7 @@ def test_ultrasonic():
     try:
         # 아두이노 연결
         print("\n아두이노 연결 중...")
-        arduino = serial.Serial(config.ARDUINO_PORT, config.BAUDRATE, timeout=1)
+        arduino = serial.Serial(port, config.BAUDRATE, timeout=1)
         time.sleep(2)  # 아두이노 초기화 대기
         print("✓ 아두이노 연결 완료\n")
 
@@ -109,7 +116,7 @@ def test_ultrasonic():
 
     except serial.SerialException as e:
         print(f"\n❌ 시리얼 포트 오류: {e}")
-        print(f"   - 포트 '{config.ARDUINO_PORT}'가 올바른지 확인하세요 (장치 관리자)")
+        print(f"   - 포트 '{port}'가 올바른지 확인하세요 (python modules/vehicle/ports.py --rescan)")
         print(f"   - 아두이노가 연결되어 있는지 확인하세요")
         print(f"   - 다른 프로그램이 포트를 사용 중이지 않은지 확인하세요")
 
@@ -31,6 +31,7 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 # 프로젝트 루트 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import config
+from modules.vehicle import ports
 
 # 초음파 센서 데이터 저장
 ultrasonic_data = {
@@ -153,10 +154,16 @@ def decide_motor_command(sensor_data, safe_distance_cm):
 
 def test_ultrasonic_motor():
     """초음파 센서 + 모터 통합 테스트"""
+    # 아두이노 포트 (config.ARDUINO_PORT, 'auto' = 자동 검색)
+    port = ports.resolve('arduino', config.ARDUINO_PORT, config.BAUDRATE, config.PORT_CACHE_FILE)
+    if port is None:
+        print("❌ 아두이노 포트를 찾지 못했습니다 (config.ARDUINO_PORT 직접 설정)")
+        return
+
     print("=" * 70)
     print("초음파 센서 → 모터 제어 통합 테스트")
     print("=" * 70)
-    print(f"포트: {config.ARDUINO_PORT}")
+    print(f"포트: {port}")
     print(f"통신 속도: {config.BAUDRATE}")
     print(f"안전 거리: {config.ULTRASONIC_SAFE_DISTANCE / 10:.0f} cm")
     print("=" * 70)
@@ -181,7 +188,7 @@ def test_ultrasonic_motor():
     try:
         # 아두이노 연결
         print("\n아두이노 연결 중...")
-        arduino = serial.Serial(config.ARDUINO_PORT, config.BAUDRATE, timeout=1)
+        arduino = serial.Serial(port, config.BAUDRATE, timeout=1)
         time.sleep(2)  # 아두이노 초기화 대기
         print("✓ 아두이노 연결 완료\n")
 
@@ -251,7 +258,7 @@ def test_ultrasonic_motor():
 
     except serial.SerialException as e:
         print(f"\n❌ 시리얼 포트 오류: {e}")
-        print(f"   - 포트 '{config.ARDUINO_PORT}'가 올바른지 확인하세요")
+        print(f"   - 포트 '{port}'가 올바른지 확인하세요")
         print(f"   - 아두이노가 연결되어 있는지 확인하세요")
         print(f"   - 다른 프로그램이 포트를 사용 중이지 않은지 확인하세요")
 
@@ -19,6 +19,7 @@
 -------------------------------------------------------------------
 """
 
+import os
 import sys
 import cv2                           # pip install opencv
 import time
@@ -53,6 +54,7 @@ FORWARD, LEFT, RIGHT = (0, 1, 2)
 COLOR = ("RED", "GREEN", "BLUE", "YELLOW")
 DIRECTION = ("FORWARD", "LEFT", "RIGHT")
 HUE_THRESHOLD = ([4, 176], [40, 80], [110, 130], [20, 40])
+LUT_BITS = 5
 """-----------------------------------------------------"""
 
 
@@ -140,6 +142,34 @@ class libLIDAR(object):
         return data[condition]
 
 
+"""
+-------------------------------------------------------------------
+  CLASS PURPOSE: Per-frame cache of derived images
+                 Each product (gray, hsv, labels, ...) is computed
+                 at most once per frame and shared by every detector
+-------------------------------------------------------------------
+"""
+class FrameContext(object):
+    def __init__(self, img):
+        self.img = img
+        self.products = {}
+
+    def product(self, key, build):
+        # key : (product name, parameters ...)
+        if key not in self.products:
+            self.products[key] = build()
+        return self.products[key]
+
+    def gray(self):
+        return self.product(("gray",), lambda: cv2.cvtColor(self.img, cv2.COLOR_BGR2GRAY))
+
+    def hsv(self):
+        return self.product(("hsv",), lambda: cv2.cvtColor(self.img, cv2.COLOR_BGR2HSV))
+
+    def rgb(self):
+        return self.product(("rgb",), lambda: cv2.cvtColor(self.img, cv2.COLOR_BGR2RGB))
+
+
 """
 -------------------------------------------------------------------
   CLASS PURPOSE: Camera Sensor Exercise Library
@@ -152,6 +182,8 @@ class libCAMERA(object):
     def __init__(self):
         self.capnum = 0
         self.row, self.col, self.dim = (0, 0, 0)
+        self.detected_box = None
+        self.lane_center = None
 
     def loop_break(self):
         if cv2.waitKey(10) & 0xFF == ord('q'):
@@ -160,6 +192,10 @@ class libCAMERA(object):
         else:
             return False
 
+    def frame_context(self, img):
+        # Every detector accepts either a raw frame or a shared FrameContext
+        return img if isinstance(img, FrameContext) else FrameContext(img)
+
     def file_read(self, img_path):
         return np.array(cv2.imread(img_path))
 
@@ -182,9 +218,10 @@ class libCAMERA(object):
         return result
 
     def extract_rgb(self, img, print_enable=False):
-        self.row, self.col, self.dim = img.shape
+        ctx = self.frame_context(img)
+        self.row, self.col, self.dim = ctx.img.shape
 
-        img = self.rgb_conversion(img)
+        img = ctx.rgb()
 
         # Image Color Separating
         img_red = self.color_extract(img, RED)
@@ -243,10 +280,10 @@ class libCAMERA(object):
             cv2.imshow('frame1', frame1)
 
     def color_filtering(self, img, roi=None, print_enable=False):
-        self.row, self.col, self.dim = img.shape
+        ctx = self.frame_context(img)
+        self.row, self.col, self.dim = ctx.img.shape
 
-        hsv_img = self.hsv_conversion(img)
-        h, s, v = cv2.split(hsv_img)
+        h, s, v = cv2.split(ctx.hsv())
 
         s_cond = s > SATURATION
         if roi is RED:
@@ -294,84 +331,320 @@ class libCAMERA(object):
         elif mode == "gradient":
             return cv2.morphologyEx(img.copy(), cv2.MORPH_GRADIENT, kernel)
 
-    def point_analyze(self, gray, line, point_gap, len_threshold):
-        disparity = [0, 0]
-
-        for idx in range(2):
-            yplus = line[idx + 1] + point_gap if line[idx + 1] + point_gap < self.row else self.row - 1
-            yminus = line[idx + 1] - point_gap if line[idx + 1] - point_gap >= 0 else 0
+    def point_analyze_batch(self, gray, lines, point_gap, len_threshold, samples=2):
+        # lines : (N, 4) array of [xa, ya, xb, yb], every candidate verified at once
+        lines = np.asarray(lines, dtype=np.int32).reshape(-1, 4)
+        if len(lines) == 0:
+            return np.zeros(0, dtype=bool)
+        row, col = gray.shape[:2]
+
+        # Sampling points along each segment (samples=2 : both end points)
+        ratio = np.linspace(0.0, 1.0, max(samples, 1), dtype=np.float32)
+        xs = lines[:, [0]] + (lines[:, [2]] - lines[:, [0]]) * ratio
+        ys = lines[:, [1]] + (lines[:, [3]] - lines[:, [1]]) * ratio
+        xs = np.clip(np.rint(xs).astype(np.intp), 0, col - 1)
+        ys = np.rint(ys).astype(np.intp)
+
+        yplus = np.clip(ys + point_gap, 0, row - 1)
+        yminus = np.clip(ys - point_gap, 0, row - 1)
+
+        disparity = np.abs(gray[yplus, xs].astype(np.int16) - gray[yminus, xs].astype(np.int16))
+        return disparity.mean(axis=1) > len_threshold
+
+    def color_labeling(self, hsv_img):
+        # Hue class table : one lookup labels every pixel as COLOR index + 1 (NULL : no color)
+        hue = np.arange(180)
+        hue_table = np.full(180, NULL, dtype=np.uint8)
+        for color in (RED, GREEN, BLUE, YELLOW):
+            if color is RED:
+                h_cond = (hue < HUE_THRESHOLD[color][0]) | (hue > HUE_THRESHOLD[color][1])
+            else:
+                h_cond = (hue > HUE_THRESHOLD[color][0]) & (hue < HUE_THRESHOLD[color][1])
+            hue_table[h_cond] = color + 1
+
+        labels = hue_table[hsv_img[:, :, 0]]
+        labels[hsv_img[:, :, 1] <= SATURATION] = NULL
+        return labels
+
+    def build_color_lut(self, bits=LUT_BITS):
+        # Quantized BGR cube (2^bits per axis) labeled by the same HSV rule as color_labeling
+        shift = 8 - bits
+        level = (np.arange(1 << bits, dtype=np.uint16) << shift) + ((1 << shift) >> 1)
+        b, g, r = np.meshgrid(level, level, level, indexing="ij")
+        cube = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3).astype(np.uint8)
+        return self.color_labeling(self.hsv_conversion(cube)).reshape(-1)
+
+    def load_color_lut(self, bits=LUT_BITS, cache_dir=None):
+        # Cached on disk (cache_dir : config.CACHE_DIR, None : no file), rebuilt only if the thresholds have changed
+        path = os.path.join(cache_dir, "color_lut_%d.npz" % bits) if cache_dir else None
+        key = np.array(HUE_THRESHOLD + ([SATURATION, bits],)).reshape(-1)
+
+        if path and os.path.exists(path):
+            with np.load(path) as cache:
+                if np.array_equal(cache["key"], key):
+                    self.color_lut, self.lut_bits = cache["table"], bits
+                    return self.color_lut
+
+        self.color_lut, self.lut_bits = self.build_color_lut(bits), bits
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez(path, table=self.color_lut, key=key)
+        return self.color_lut
+
+    def lut_labeling(self, img):
+        # One gather per frame : BGR -> COLOR index + 1 (NULL : no color)
+        if getattr(self, "color_lut", None) is None:
+            self.load_color_lut()
+        bits = self.lut_bits
+        dtype = np.uint16 if 3 * bits <= 16 else np.uint32
+        q = img >> (8 - bits)
+        index = (q[:, :, 0].astype(dtype) << (2 * bits)) | (q[:, :, 1].astype(dtype) << bits) | q[:, :, 2]
+        return np.take(self.color_lut, index)
+
+    def window_count(self, integral, center, size):
+        # Number of mask pixels inside the (size x size) window around center, O(1)
+        x0, y0 = max(center[0] - size // 2, 0), max(center[1] - size // 2, 0)
+        x1, y1 = min(x0 + size, self.col), min(y0 + size, self.row)
+        return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+
+    def light_labels(self, ctx, label_mode="hsv"):
+        if label_mode == "lut":
+            return ctx.product(("labels", "lut"), lambda: self.lut_labeling(ctx.img))
+        return ctx.product(("labels", "hsv"), lambda: self.color_labeling(ctx.hsv()))
+
+    def object_detection(self, img, sample=0, mode="circle", label_mode="hsv", print_enable=False):
+        result = None
+        ctx = self.frame_context(img)
+        self.row, self.col, self.dim = ctx.img.shape
+        self.detected_box = None
 
-            if yplus < 0 or yminus >= self.row:
-                break
-            elif yplus >= self.row or yminus < 0:
-                break
+        # Single color labeling for every traffic light color
+        labels = self.light_labels(ctx, label_mode)
 
-            disparity[idx] = np.abs(gray[yplus][line[idx]] - gray[yminus][line[idx]])
+        integrals = {}
+        for color in (RED, YELLOW, GREEN):
+            integrals[color] = cv2.integral((labels == color + 1).astype(np.uint8))
 
-        if np.average(disparity) > len_threshold:
-            return True
+        # One circle search on the combined color mask
+        light_mask = (labels == RED + 1) | (labels == YELLOW + 1) | (labels == GREEN + 1)
+        if label_mode == "lut":
+            extract = light_mask.astype(np.uint8) * 255
         else:
-            return False
+            extract = np.where(light_mask, ctx.hsv()[:, :, 2], 0).astype(np.uint8)
+        circles = self.hough_transform(extract, mode=mode)
+        accepted = []
 
-    def object_detection(self, img, sample=0, mode="circle", print_enable=False):
-        result = None
-        replica = img.copy()
+        if circles is not None:
+            for circle in circles.reshape(-1, 3):
+                center = (int(circle[0]), int(circle[1]))
 
-        for color in (RED, YELLOW, GREEN):
-            extract = self.color_filtering(img, roi=color, print_enable=True)
-            gray = self.gray_conversion(extract)
-            circles = self.hough_transform(gray, mode=mode)
-            if circles is not None:
-                for circle in circles[0]:
-                    center, count = (int(circle[0]), int(circle[1])), 0
-
-                    hsv_img = self.hsv_conversion(img)
-                    h, s, v = cv2.split(hsv_img)
-
-                    # Searching the surrounding pixels
-                    for res in range(sample):
-                        x, y = int(center[1] - sample / 2), int(center[0] - sample / 2)
-                        s_cond = s[x][y] > SATURATION
-                        if color is RED:
-                            h_cond = (h[x][y] < HUE_THRESHOLD[color][0]) | (h[x][y] > HUE_THRESHOLD[color][1])
-                            count += 1 if h_cond and s_cond else count
-                        else:
-                            h_cond = (h[x][y] > HUE_THRESHOLD[color][0]) & (h[x][y] < HUE_THRESHOLD[color][1])
-                            count += 1 if h_cond and s_cond else count
-
-                    if count > sample / 2:
-                        result = COLOR[color]
-                        cv2.circle(replica, center, int(circle[2]), (0, 0, 255), 2)
+                # Searching the surrounding pixels
+                counts = [self.window_count(integrals[color], center, sample) for color in (RED, YELLOW, GREEN)]
+                color = (RED, YELLOW, GREEN)[int(np.argmax(counts))]
+
+                if max(counts) > sample * sample / 2:
+                    result = COLOR[color]
+                    radius = int(circle[2])
+                    self.detected_box = (center[0] - radius, center[1] - radius, 2 * radius, 2 * radius)
+                    accepted.append((center, radius))
 
         if print_enable:
+            replica = ctx.img.copy()
             if result is not None:
                 print("Traffic Light: ", result)
+            # Every accepted circle, not only the last one
+            for center, radius in accepted:
+                cv2.circle(replica, center, radius, (0, 0, 255), 2)
             self.image_show(replica)
 
         return result
 
-    def edge_detection(self, img, width=0, height=0, gap=0, threshold=0, print_enable=False):
+    def blob_detection(self, img, min_area=100, max_area=40000, min_fill=0.5, max_fill=0.9, min_aspect=0.6,
+                       min_circularity=0.85, label_mode="hsv", print_enable=False):
+        result, confidence = None, 0.0
+        ctx = self.frame_context(img)
+        self.row, self.col, self.dim = ctx.img.shape
+        self.detected_box = None
+
+        labels = self.light_labels(ctx, label_mode)
+
+        light_mask = (labels == RED + 1) | (labels == YELLOW + 1) | (labels == GREEN + 1)
+        count, components, stats, _ = cv2.connectedComponentsWithStats(light_mask.astype(np.uint8), connectivity=8)
+
+        # Area / fill ratio / aspect ratio filters for every component at once (label 0 : background)
+        # A disc fills pi/4 (~0.785) of its bounding box, a square fills 1.0 : max_fill rejects square panels
+        w, h, area = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT], stats[1:, cv2.CC_STAT_AREA]
+        fill = area / (w * h)
+        aspect = np.minimum(w, h) / np.maximum(w, h)
+        candidates = np.flatnonzero((area >= min_area) & (area <= max_area) & (fill >= min_fill) & (fill <= max_fill)
+                                    & (aspect >= min_aspect)) + 1
+
+        for idx in candidates:
+            x, y, w, h, area = stats[idx]
+            blob = components[y:y + h, x:x + w] == idx
+
+            # Circularity (4 * pi * area / perimeter^2) only for the surviving few
+            contours, _ = cv2.findContours(blob.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            perimeter = cv2.arcLength(max(contours, key=cv2.contourArea), True)
+            circularity = min(4 * np.pi * area / (perimeter * perimeter), 1.0) if perimeter > 0 else 0.0
+            if circularity < min_circularity:
+                continue
+
+            # Dominant color inside the blob
+            votes = np.bincount(labels[y:y + h, x:x + w][blob], minlength=len(COLOR) + 1)
+            color = max((RED, YELLOW, GREEN), key=lambda c: votes[c + 1])
+            score = circularity * votes[color + 1] / area
+
+            if score > confidence:
+                result, confidence = COLOR[color], float(score)
+                self.detected_box = (int(x), int(y), int(w), int(h))
+
+        if print_enable:
+            replica = ctx.img.copy()
+            if result is not None:
+                print("Traffic Light: ", result, "(%.2f)" % confidence)
+                x, y, w, h = self.detected_box
+                cv2.rectangle(replica, (x, y), (x + w, y + h), (0, 0, 255), 2)
+            self.image_show(replica)
+
+        return result, confidence
+
+    def scanline_detection(self, img, rows=(0.9, 0.8, 0.7, 0.6), line_width=(3, 40), threshold=40, print_enable=False):
         prediction = None
-        replica = img.copy()
-        self.row, self.col, self.dim = img.shape
+        ctx = self.frame_context(img)
+        img = ctx.img
+        self.row, self.col = img.shape[:2]
+        self.lane_center = None
+
+        ys = (np.asarray(rows) * (self.row - 1)).astype(np.intp)
+
+        # Gray conversion and 1-D gradient of the sampled rows only : O(K x width)
+        if img.ndim == 2 or ("gray",) in ctx.products:
+            gray = (ctx.gray() if img.ndim == 3 else img)[ys]
+        else:
+            gray = cv2.cvtColor(img[ys], cv2.COLOR_BGR2GRAY)
+        grad = np.diff(gray.astype(np.int16), axis=1)
+        rise_r, rise_x = np.nonzero(grad > threshold)
+        fall_r, fall_x = np.nonzero(grad < -threshold)
+
+        # Pair every rising edge with the next falling edge on the same row (white line of valid width)
+        # line_width : pixel range of the 50 mm rule line (sensors.lane_line_width)
+        rise_key, fall_key = rise_r * self.col + rise_x, fall_r * self.col + fall_x
+        pair = np.searchsorted(fall_key, rise_key)
+        valid = pair < len(fall_key)
+        pair = np.minimum(pair, max(len(fall_key) - 1, 0))
+        if len(fall_key) > 0:
+            # A rise at the right border must not pair with a fall on the next sampled row
+            width = fall_key[pair] - rise_key
+            valid &= (fall_r[pair] == rise_r) & (width >= line_width[0]) & (width <= line_width[1])
+        else:
+            valid[:] = False
+        line_r, line_x = rise_r[valid], (rise_x[valid] + fall_x[pair[valid]]) / 2
+
+        # Nearest line on each side of the image center, per sampled row
+        middle = self.col / 2
+        left = np.full(len(ys), np.nan)
+        right = np.full(len(ys), np.nan)
+        for idx in range(len(ys)):
+            xs = line_x[line_r == idx]
+            if np.any(xs < middle):
+                left[idx] = xs[xs < middle].max()
+            if np.any(xs >= middle):
+                right[idx] = xs[xs >= middle].min()
+
+        # Rows with only one side : shift by the median lane width of the complete rows
+        both = ~np.isnan(left) & ~np.isnan(right)
+        if np.any(both):
+            half = np.median(right[both] - left[both]) / 2
+            center = np.where(both, (left + right) / 2, np.where(np.isnan(left), right - half, left + half))
+            found = ~np.isnan(center)
+
+            if np.count_nonzero(found) >= 2:
+                slope, intercept = np.polyfit(ys[found], center[found], 1)
+                grad = -slope  # x change per upward pixel
+
+                if np.abs(grad) < FORWARD_THRESHOLD:
+                    prediction = FORWARD
+                elif grad > 0:
+                    prediction = RIGHT
+                elif grad < 0:
+                    prediction = LEFT
+
+                bottom = slope * (self.row - 1) + intercept
+                self.lane_center = (float(bottom - middle), float(grad))
+
+        if print_enable:
+            replica = img.copy()
+            if self.lane_center is not None:
+                top = slope * ys.min() + intercept
+                cv2.line(replica, (int(bottom), self.row - 1), (int(top), int(ys.min())), color=[0, 0, 255], thickness=2)
+            if prediction is not None:
+                print("Vehicle Direction: ", DIRECTION[prediction])
+            self.image_show(replica)
+
+        return prediction
 
-        gray_scale = self.gray_conversion(img)
-        hist = self.histogram_equalization(gray_scale)
+    def crosswalk_detection(self, img, threshold=180, min_fill=0.5, band=(5, 60), binary=None, print_enable=False):
+        # binary : threshold image already computed for lane detection (shared, not recomputed)
+        if binary is None:
+            ctx = self.frame_context(img)
+            gray = ctx.gray() if ctx.img.ndim == 3 else ctx.img
+            binary = ctx.product(("threshold", threshold), lambda: cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)[1])
+        self.row, self.col = binary.shape[:2]
+
+        # Horizontal projection : white ratio of every row
+        fill = cv2.reduce(binary, 1, cv2.REDUCE_AVG, dtype=cv2.CV_32F).reshape(-1) / 255
+        rows = np.concatenate(([False], fill > min_fill, [False]))
+
+        # Runs of consecutive white rows = horizontal bands across the road
+        edges = np.flatnonzero(np.diff(rows.astype(np.int8)))
+        starts, ends = edges[0::2], edges[1::2]
+        height = ends - starts
+        valid = (height >= band[0]) & (height <= band[1])
+
+        # The nearest band (largest row index) is the stop line in front of the vehicle
+        result = int(ends[valid].max()) - 1 if np.any(valid) else None
+
+        if print_enable:
+            replica = cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+            if result is not None:
+                print("Crosswalk Row: ", result)
+                cv2.line(replica, (0, result), (self.col - 1, result), color=[0, 0, 255], thickness=2)
+            self.image_show(replica)
+
+        return result
+
+    def edge_detection(self, img, width=0, height=0, gap=0, threshold=0, samples=2,
+                       roi=0.0, resolution=(1, np.pi/180), print_enable=False):
+        prediction = None
+        ctx = self.frame_context(img)
+        replica = ctx.img.copy()
+        self.row, self.col, self.dim = ctx.img.shape
+        self.lane_center = None
+
+        # roi : top of the searched band as a fraction of the height (0.0 = whole frame)
+        top = int(roi * self.row)
+        gray_scale = ctx.gray()[top:]
+        hist = ctx.product(("equalized", top), lambda: self.histogram_equalization(gray_scale))
         dst = self.morphology(hist, (2, 2), mode="opening")
 
         blurring = self.gaussian_blurring(dst, (5, 5))
         canny = self.canny_edge(blurring, 100, 200)
 
-        lines = self.hough_transform(canny, 1, np.pi/180, 50, 10, 20, mode="lineP")
+        # resolution : (rho in pixels, theta in radians), coarser is faster
+        lines = self.hough_transform(canny, resolution[0], resolution[1], 50, 10, 20, mode="lineP")
 
         if lines is not None:
             new_lines, real_lines = [], []
-            for line in lines:
-                xa, ya, xb, yb = line[0]
+            lines = lines.reshape(-1, 4)
+            verified = self.point_analyze_batch(blurring, lines, gap, threshold, samples)
+            lines = lines + np.array([0, top, 0, top], dtype=lines.dtype)
+            for line, valid in zip(lines, verified):
+                xa, ya, xb, yb = line
 
                 # x range : 0 ~ self.col / y range : 0 ~ self.row
                 if np.abs(yb - ya) > height and np.abs(xb - xa) < width:
-                    if self.point_analyze(blurring, line[0], gap, threshold):
+                    if valid:
                         for idx in range(len(new_lines)):
                             if np.abs(new_lines[:][idx][1] - ya) < VARIANCE:
                                 if np.abs(new_lines[:][idx][3] - yb) < VARIANCE:
@@ -384,6 +657,7 @@ class libCAMERA(object):
                                         prediction = RIGHT
                                     elif grad < 0:
                                         prediction = LEFT
+                                    self.lane_center = (None, float(grad))
 
                                     # real_lines.append([xa, ya, xb, yb])
                                     cv2.line(replica, (xa, ya), (xb, yb), color=[0, 0, 255], thickness=2)
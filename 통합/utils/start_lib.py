@@ -3,19 +3,31 @@ import sys
 import cv2
 import numpy as np
 
+# 프로젝트 루트 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from modules.vision import calibration
+import config
+
+# 같은 꼭짓점/크기면 변환 행렬 재사용
+_matrix_cache = {}
+
 def get_bird_eye_view(image, output_size, points):
     height, width = output_size[1], output_size[0]
     scaled_points = [(int(p[0] * width / image.shape[1]), int(p[1] * height / image.shape[0])) for p in points]
-    
-    src_points = np.float32([scaled_points[0], scaled_points[1], scaled_points[3], scaled_points[2]])
-    dst_points = np.float32([[0, height], [width, height], [0, 0], [width, 0]])
-    
-    matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+
+    key = (tuple(scaled_points), (width, height))
+    matrix = _matrix_cache.get(key)
+    if matrix is None:
+        src_points = np.float32([scaled_points[0], scaled_points[1], scaled_points[3], scaled_points[2]])
+        dst_points = np.float32([[0, height], [width, height], [0, 0], [width, 0]])
+        matrix = _matrix_cache[key] = cv2.getPerspectiveTransform(src_points, dst_points)
+
     bird_eye_view = cv2.warpPerspective(image, matrix, output_size)
     return bird_eye_view
 
-def get_points(image):
+def get_points(image, camera_id=0, save=True):
     points = []
+    saved_points = None
     mask = None
     is_masking = False
     
@@ -61,6 +73,16 @@ def get_points(image):
             mask = np.zeros(resized_image.shape[:2], dtype=np.uint8)
             update_mask(resized_image)
             print(f"points: {points}")
+
+            # 원본 해상도 기준으로 캘리브레이션 파일에 저장
+            if save and len(points) == 4:
+                scale = 100 / scale_percent
+                saved_points = [(x * scale, y * scale) for x, y in points]
+                path = calibration.save_calibration(
+                    config.CALIBRATION_DIR, camera_id,
+                    (image.shape[1], image.shape[0]), saved_points
+                )
+                print(f"캘리브레이션 저장: {path}")
             
             # BEV 변환 수행
             bev = get_bird_eye_view(resized_image, (resized_image.shape[1], resized_image.shape[0]), points)
@@ -88,6 +110,7 @@ def get_points(image):
             sys.exit()
 
     cv2.destroyAllWindows()
+    return saved_points
 
 def bev_main():
     dataset_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), "."))
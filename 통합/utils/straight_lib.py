@@ -2,6 +2,14 @@ import os
 import sys
 import cv2
 import numpy as np
+
+# 프로젝트 루트 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from modules.vision import calibration
+import config
+
+# 캘리브레이션 파일이 없을 때 사용하는 기본 ROI 다각형
+DEFAULT_POLYGON = [(12, 718), (718, 705), (582, 389), (103, 414)]
            
 def point_in_polygon(point, polygon):
     x, y = point
@@ -40,7 +48,6 @@ def hough_transform(image, polygon):
 def hough_main():
     dataset_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), "."))
     image_files = ["steering_4.jpg"]
-    polygon = [(12, 718), (718, 705), (582, 389), (103, 414)]
 
     for image_file in image_files:
         image_path = os.path.join(dataset_directory, image_file)
@@ -50,6 +57,10 @@ def hough_main():
             print(f"Error: Could not open or find the image {image_file}.")
             continue
 
+        # start_lib.get_points로 저장한 꼭짓점 사용 (없으면 기본값)
+        saved = calibration.load_calibration(config.CALIBRATION_DIR, 0, (image.shape[1], image.shape[0]))
+        polygon = [tuple(map(int, p)) for p in saved['points']] if saved else DEFAULT_POLYGON
+
         result_image = hough_transform(image, polygon)
 
         cv2.imshow("Detected Lines - " + image_file, result_image)